@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Error against wall time for the CRR, BBS and BBSR modes
+# of option_binomial.binomial_option. European contracts
+# are measured against Black-Scholes; the American put is
+# measured against a 20000 step BBSR reference value.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+from derpy import option_binomial as bn
+from derpy import option_bsm as bsm
+
+CONTRACT = dict(call_put='p', stock_price=100., strike=105., volatility=0.3, time_to_maturity=1., interest_rate=0.05)
+STEPS = [25, 50, 100, 200, 400, 800, 1600, 3200]
+METHODS = ['crr', 'bbs', 'bbsr']
+
+
+def error_curve(flag, reference):
+    print('{:>6} {:>8} {:>12} {:>10}'.format('method', 'step', 'abs error', 'time (ms)'))
+    for method in METHODS:
+        for step in STEPS:
+            price = bn.binomial_option(flag, step=step, method=method, **CONTRACT)
+            elapsed = min(timeit.repeat(lambda: bn.binomial_option(flag, step=step, method=method, **CONTRACT),
+                                        number=1, repeat=3))
+            print('{:>6} {:>8} {:>12.2e} {:>10.2f}'.format(method, step, abs(price - reference), elapsed * 1e3))
+
+
+def main():
+    print('European put')
+    error_curve('e', bsm.euro_option(**CONTRACT))
+    print('\nAmerican put')
+    error_curve('a', bn.binomial_option('a', step=20000, method='bbsr', **CONTRACT))
+
+
+if __name__ == '__main__':
+    main()
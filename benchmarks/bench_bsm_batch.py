@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Throughput of option_bsm.euro_option_batch against a
+# Python loop over the scalar option_bsm.euro_option.
+# The scalar loop is timed on a sample of rows and scaled
+# up, since looping 10M contracts takes far too long.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy import option_bsm as bsm
+
+SCALAR_SAMPLE = 2000
+
+
+def make_book(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    return dict(call_put=np.where(rng.random(rows) < 0.5, 1.0, -1.0),
+                stock_price=rng.uniform(50, 150, rows),
+                strike=rng.uniform(50, 150, rows),
+                volatility=rng.uniform(0.05, 0.8, rows),
+                time_to_maturity=rng.uniform(0.01, 5, rows),
+                interest_rate=rng.uniform(0, 0.1, rows),
+                div_yield=rng.uniform(0, 0.05, rows))
+
+
+def scalar_loop(book, rows):
+    flags = np.where(book['call_put'] > 0, 'c', 'p')
+    for i in range(rows):
+        bsm.euro_option(flags[i], book['stock_price'][i], book['strike'][i], book['volatility'][i],
+                        book['time_to_maturity'][i], book['interest_rate'][i], book['div_yield'][i])
+
+
+def main():
+    print('{:>10} {:>14} {:>14} {:>10}'.format('rows', 'loop (s)', 'batch (s)', 'speedup'))
+    for rows in [1000, 100000, 10000000]:
+        book = make_book(rows)
+        sample = min(rows, SCALAR_SAMPLE)
+        loop_time = min(timeit.repeat(lambda: scalar_loop(book, sample), number=1, repeat=3)) * rows / sample
+        batch_time = min(timeit.repeat(lambda: bsm.euro_option_batch(**book), number=1, repeat=3))
+        print('{:>10} {:>14.4f} {:>14.4f} {:>9.0f}x'.format(rows, loop_time, batch_time, loop_time / batch_time))
+
+
+if __name__ == '__main__':
+    main()
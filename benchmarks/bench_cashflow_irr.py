@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# IRR of bond cash flows: derpy.cashflow.cf_irr against the
+# companion matrix eigenvalue approach of the removed
+# numpy.irr (reproduced here with numpy.roots). Times are
+# totals in ms over BONDS level coupon bonds. At 10 periods
+# the per bond cf_irr loop is slower than the eigenvalue
+# solve, the batch solve is faster at every length.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy import cashflow as cf
+
+BONDS = 1000
+
+
+def eigen_irr(values):
+    # numpy.irr as of NumPy 1.17
+    roots = np.roots(values[::-1])
+    roots = roots[(roots.imag == 0) & (roots.real > 0)].real
+    rates = 1 / roots - 1
+    return rates[np.argmin(np.abs(rates))]
+
+
+def make_flows(periods, seed=7):
+    rng = np.random.default_rng(seed)
+    coupons = rng.uniform(0.5, 4, BONDS)
+    flows = np.repeat(coupons[:, None], periods + 1, axis=1)
+    flows[:, 0] = -1 * rng.uniform(80, 120, BONDS)
+    flows[:, -1] += 100
+    return flows
+
+
+def main():
+    print('{:>8} {:>14} {:>14} {:>14} {:>10}'.format('periods', 'eigen (ms)', 'cf_irr loop', 'cf_irr batch',
+                                                     'max diff'))
+    for periods in [10, 60, 360]:
+        flows = make_flows(periods)
+        eigen_time = min(timeit.repeat(lambda: [eigen_irr(row) for row in flows], number=1, repeat=3))
+        loop_time = min(timeit.repeat(lambda: [cf.cf_irr(row) for row in flows], number=1, repeat=3))
+        batch_time = min(timeit.repeat(lambda: cf.cf_irr(flows), number=1, repeat=3))
+        diff = np.max(np.abs(cf.cf_irr(flows) - np.array([eigen_irr(row) for row in flows])))
+        print('{:>8} {:>14.2f} {:>14.2f} {:>14.2f} {:>10.1e}'.format(periods, eigen_time * 1e3, loop_time * 1e3,
+                                                                      batch_time * 1e3, diff))
+
+
+if __name__ == '__main__':
+    main()
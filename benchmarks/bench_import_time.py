@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Import time of derpy modules in fresh interpreters, from
+# python -X importtime, split into numpy (paid by every
+# module) and the rest, with the heavy optional
+# dependencies each import pulled in. Run from the
+# repository root.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+
+MODULES = ['derpy', 'derpy.option', 'derpy.option_bsm', 'derpy.bond', 'derpy.bond_book', 'derpy.portfolio',
+           'derpy.portfolio_stream', 'derpy.option_book', 'derpy.scenario', 'derpy.vol_surface',
+           'derpy.yield_curve']
+HEAVY = ['scipy', 'pandas', 'concurrent.futures']
+REPEAT = 5
+
+
+def import_times(module):
+    """
+    :return: (cumulative import time of module, of numpy) in microseconds, and the heavy modules loaded
+    """
+    code = "import {}, sys; print(','.join(m for m in {!r} if m in sys.modules))".format(module, HEAVY)
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                            env=env, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        # a module imported twice at different depths reports its first, complete, import
+        cumulative.setdefault(name.strip(), int(cumulative_us))
+
+    return cumulative.get(module, 0), cumulative.get('numpy', 0), result.stdout.strip()
+
+
+def main():
+    print('{:<24} {:>10} {:>10} {:>10}  {}'.format('module', 'total ms', 'numpy ms', 'own ms', 'heavy imports'))
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(REPEAT)]
+        total, numpy_us, heavy = min(runs)
+        print('{:<24} {:>10.1f} {:>10.1f} {:>10.1f}  {}'.format(module, total / 1e3, numpy_us / 1e3,
+                                                               (total - numpy_us) / 1e3, heavy or '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Per call latency of scalar BSM pricing with the normal
+# cdf / pdf taken from scipy.stats.norm (as option_bsm did
+# before derpy.special) against the special module kernels.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import timeit
+
+import numpy as np
+from scipy.stats import norm
+
+from derpy import option_bsm as bsm
+from derpy import special
+
+CONTRACT = ('c', 100., 105., 0.25, 0.75, 0.03, 0.01)
+NUMBER = 20000
+
+
+def stats_euro_option(call_put, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield=0):
+    # the previous euro_option body, on scipy.stats.norm and np.exp
+    d1 = (math.log(stock_price / strike)
+          + (interest_rate - div_yield + (volatility ** 2) / 2)
+          * time_to_maturity) / (volatility * (time_to_maturity ** 0.5))
+    d2 = d1 - volatility * (time_to_maturity ** 0.5)
+    return stock_price * np.exp(-1 * div_yield * time_to_maturity) * norm.cdf(d1) \
+        - strike * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(d2)
+
+
+def stats_vega(call_put, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield=0):
+    d1 = (math.log(stock_price / strike)
+          + (interest_rate - div_yield + (volatility ** 2) / 2)
+          * time_to_maturity) / (volatility * (time_to_maturity ** 0.5))
+    return stock_price * norm.pdf(d1) * (time_to_maturity ** 0.5)
+
+
+def per_call(func, *args):
+    return min(timeit.repeat(lambda: func(*args), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def main():
+    print('{:<22} {:>12} {:>12} {:>8}'.format('call', 'before (us)', 'after (us)', 'speedup'))
+    rows = [('norm cdf', (norm.cdf, 0.3), (special.norm_cdf, 0.3)),
+            ('norm pdf', (norm.pdf, 0.3), (special.norm_pdf, 0.3)),
+            ('euro_option', (stats_euro_option,) + CONTRACT, (bsm.euro_option,) + CONTRACT),
+            ('vega', (stats_vega,) + CONTRACT, (bsm.vega,) + CONTRACT)]
+    for name, before, after in rows:
+        before_us, after_us = per_call(*before), per_call(*after)
+        print('{:<22} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(name, before_us, after_us, before_us / after_us))
+
+    assert abs(stats_euro_option(*CONTRACT) - bsm.euro_option(*CONTRACT)) < 1e-12
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Book level greeks on a spot tick: OptionBook.update_spots
+# (all underlyings and a single underlying) against a fresh
+# option_bsm.greeks pass with a bincount aggregation.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy import option_book as ob
+from derpy import option_bsm as bsm
+
+LINES = [5000, 50000, 500000]
+UNDERLYINGS = 200
+
+
+def make_book(lines, seed=7):
+    rng = np.random.default_rng(seed)
+    labels = np.array(['UND{:03d}'.format(i) for i in range(UNDERLYINGS)])
+    spots = dict(zip(labels, rng.uniform(50, 150, UNDERLYINGS)))
+    return ob.OptionBook(underlying=labels[rng.integers(0, UNDERLYINGS, lines)],
+                         call_put=np.where(rng.random(lines) < 0.5, 'c', 'p'),
+                         strike=rng.uniform(50, 150, lines),
+                         time_to_maturity=rng.uniform(0.05, 2, lines),
+                         volatility=rng.uniform(0.1, 0.5, lines),
+                         quantity=rng.integers(-50, 50, lines),
+                         spots=spots,
+                         interest_rate=0.03,
+                         multiplier=100)
+
+
+def main():
+    print('{:>8} {:>14} {:>14} {:>14}'.format('lines', 'greeks (ms)', 'all spots', 'one spot'))
+    for lines in LINES:
+        book = make_book(lines)
+        weight = book.quantity * book.multiplier
+        new_spots = book.spots * 1.01
+
+        def full_pass():
+            g = bsm.greeks(book.sign, book.spots[book._codes], book.strike, book.volatility, book.time_to_maturity,
+                           book.interest_rate)
+            return [np.bincount(book._codes, weights=g[name] * weight) for name in ob.BOOK_GREEKS]
+
+        timings = [min(timeit.repeat(func, number=10, repeat=3)) / 10
+                   for func in (full_pass,
+                                lambda: book.update_spots(new_spots),
+                                lambda: book.update_spots({book.underlyings[0]: 101.0}))]
+        print('{:>8} {:>14.2f} {:>14.2f} {:>14.2f}'.format(lines, *[t * 1e3 for t in timings]))
+
+
+if __name__ == '__main__':
+    main()
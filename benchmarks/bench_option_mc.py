@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Monte Carlo run time and peak traced memory as the path
+# count grows, for a European call (antithetic + control
+# variate) and a 12 date arithmetic Asian call.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+import tracemalloc
+
+from derpy import option_mc as mc
+
+ARGS = dict(stock_price=100, volatility=0.2, time_to_maturity=1.0, interest_rate=0.05, seed=1)
+
+
+def run(payoff, n_paths, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    price, std_err = mc.mc_price(payoff, n_paths=n_paths, **dict(ARGS, **kwargs))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return price, std_err, elapsed, peak / 2 ** 20
+
+
+def main():
+    print('{:>10} {:>10} {:>10} {:>10} {:>10} {:>10}'.format('payoff', 'paths', 'price', 'std err', 'time (s)',
+                                                             'peak (MB)'))
+    for n_paths in [10 ** 5, 10 ** 6, 10 ** 7]:
+        row = run(mc.european_payoff('c', 105), n_paths, antithetic=True, control_variate=True)
+        print('{:>10} {:>10} {:>10.4f} {:>10.6f} {:>10.2f} {:>10.1f}'.format('european', n_paths, *row))
+    for n_paths in [10 ** 5, 10 ** 6]:
+        row = run(mc.asian_payoff('c', 100), n_paths, n_steps=12, antithetic=True)
+        print('{:>10} {:>10} {:>10.4f} {:>10.6f} {:>10.2f} {:>10.1f}'.format('asian', n_paths, *row))
+
+
+if __name__ == '__main__':
+    main()
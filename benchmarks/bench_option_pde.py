@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Error against wall time for the Crank-Nicolson PDE engine
+# and CRR trees on an American put, measured against a
+# 20000 step BBSR reference value, plus the cost of a
+# strike strip priced on one grid against one grid per
+# strike.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy import option_binomial as bn
+from derpy import option_pde as pde
+
+CONTRACT = dict(call_put='p', stock_price=100., strike=105., volatility=0.3, time_to_maturity=1., interest_rate=0.05)
+SPACE_STEPS = [100, 200, 400, 800, 1600, 3200]
+TREE_STEPS = [100, 400, 1600, 6400]
+STRIKES = np.linspace(70., 130., 25)
+
+
+def best_time(func):
+    return min(timeit.repeat(func, number=1, repeat=3))
+
+
+def main():
+    reference = bn.binomial_option('a', step=20000, method='bbsr', **CONTRACT)
+    print('{:>6} {:>8} {:>12} {:>10}'.format('method', 'step', 'abs error', 'time (ms)'))
+    for n_space in SPACE_STEPS:
+        price = pde.pde_option('a', n_space=n_space, **CONTRACT)
+        elapsed = best_time(lambda: pde.pde_option('a', n_space=n_space, **CONTRACT))
+        print('{:>6} {:>8} {:>12.2e} {:>10.2f}'.format('pde', n_space, abs(price - reference), elapsed * 1e3))
+    for step in TREE_STEPS:
+        price = bn.binomial_option('a', step=step, **CONTRACT)
+        elapsed = best_time(lambda: bn.binomial_option('a', step=step, **CONTRACT))
+        print('{:>6} {:>8} {:>12.2e} {:>10.2f}'.format('crr', step, abs(price - reference), elapsed * 1e3))
+
+    strip = dict(CONTRACT, strike=STRIKES)
+    single = dict(CONTRACT)
+    del single['strike']
+    strip_time = best_time(lambda: pde.pde_option('a', **strip))
+    loop_time = best_time(lambda: [pde.pde_option('a', strike=strike, **single) for strike in STRIKES])
+    print('\n{} strikes: one grid {:.1f} ms, one grid per strike {:.1f} ms'.format(STRIKES.size, strip_time * 1e3,
+                                                                                 loop_time * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Process pool scaling from 1 to N workers: American
+# binomial batch and bond yield solve over a large book.
+# Usage: python benchmarks/bench_parallel_scaling.py [max_workers]
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from derpy import bond as bd
+from derpy import option_binomial as bn
+
+OPTIONS = 5000
+STEPS = 500
+BONDS = 2000000
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    rng = np.random.default_rng(7)
+    strikes = rng.uniform(60, 140, OPTIONS)
+    vols = rng.uniform(0.1, 0.5, OPTIONS)
+    prices = rng.uniform(80, 120, BONDS)
+    maturities = rng.uniform(1, 30, BONDS)
+
+    print('{:>8} {:>16} {:>10} {:>16} {:>10}'.format('workers', 'binomial (s)', 'speedup', 'bond ytm (s)',
+                                                     'speedup'))
+    base = None
+    for n_workers in worker_counts(max_workers):
+        binomial_time = timed(lambda: bn.binomial_option_batch('american', 'p', 100, strikes, vols, 1.0, 0.03,
+                                                               STEPS, n_workers=n_workers))
+        ytm_time = timed(lambda: bd.bond_ytm_batch(prices, 100, maturities, 4.0, 2, n_workers=n_workers))
+        base = base or (binomial_time, ytm_time)
+        print('{:>8} {:>16.2f} {:>9.1f}x {:>16.2f} {:>9.1f}x'.format(n_workers, binomial_time,
+                                                                    base[0] / binomial_time, ytm_time,
+                                                                    base[1] / ytm_time))
+
+
+if __name__ == '__main__':
+    main()
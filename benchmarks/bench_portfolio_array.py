@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Weights and returns of a book: the pandas Portfolio (cache
+# cleared each call) against ArrayPortfolio with and without
+# preallocated output buffers.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from derpy import portfolio as pt
+from derpy import portfolio_array as pa
+
+SIZES = [(250, 100), (1000, 1000), (5000, 2000)]
+
+
+def make_portfolio(dates, securities, seed=7):
+    rng = np.random.default_rng(seed)
+    names = ['SEC{}'.format(i) for i in range(securities)]
+    positions = pd.DataFrame(rng.integers(1, 1000, (dates, securities)).astype(np.float64), columns=names)
+    prices = pd.DataFrame(10 * np.exp(np.cumsum(rng.normal(0, 0.01, (dates, securities)), axis=0)),
+                          columns=names)
+    return pt.Portfolio(names, positions, prices)
+
+
+def main():
+    print('{:>6} {:>6} {:>12} {:>12} {:>12} {:>8}'.format('dates', 'secs', 'pandas (ms)', 'array', 'array out',
+                                                          'speedup'))
+    for dates, securities in SIZES:
+        port = make_portfolio(dates, securities)
+        array_port = pa.ArrayPortfolio.from_portfolio(port)
+        weights = np.empty(array_port.shape)
+        returns = np.empty((dates, len(pa.RETURN_COLUMNS)))
+
+        def pandas_path():
+            port.invalidate()
+            port.sec_weights()
+            port.portfolio_returns()
+
+        def array_path():
+            array_port.sec_weights()
+            array_port.portfolio_returns()
+
+        def array_out_path():
+            array_port.sec_weights(out=weights)
+            array_port.portfolio_returns(out=returns)
+
+        timings = [min(timeit.repeat(func, number=5, repeat=3)) / 5
+                   for func in (pandas_path, array_path, array_out_path)]
+        print('{:>6} {:>6} {:>12.2f} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(dates, securities,
+                                                                          *[t * 1e3 for t in timings],
+                                                                          timings[0] / timings[2]))
+
+
+if __name__ == '__main__':
+    main()
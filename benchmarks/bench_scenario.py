@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# 21 x 11 x 5 scenario grid: nested euro_option loops against
+# the broadcast scenario engine, single and multi threaded.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import itertools
+import time
+
+import numpy as np
+
+from derpy import option_book as ob
+from derpy import option_bsm as bsm
+from derpy import scenario as sc
+
+SPOT_SHOCKS = np.linspace(-0.2, 0.2, 21)
+VOL_SHOCKS = np.linspace(-0.1, 0.1, 11)
+RATE_SHOCKS = np.linspace(-0.02, 0.02, 5)
+
+
+def make_book(lines, seed=7):
+    rng = np.random.default_rng(seed)
+    labels = np.array(['UND{:02d}'.format(i) for i in range(20)])
+    return ob.OptionBook(underlying=labels[rng.integers(0, 20, lines)],
+                         call_put=np.where(rng.random(lines) < 0.5, 'c', 'p'),
+                         strike=rng.uniform(50, 150, lines),
+                         time_to_maturity=rng.uniform(0.05, 2, lines),
+                         volatility=rng.uniform(0.15, 0.5, lines),
+                         quantity=rng.integers(-50, 50, lines),
+                         spots=dict(zip(labels, rng.uniform(50, 150, 20))),
+                         interest_rate=0.03)
+
+
+def nested_loops(book):
+    spots = book.spots[book._codes]
+    for i, ds, dv, dr in itertools.product(range(len(book)), SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS):
+        bsm.euro_option('c' if book.sign[i] > 0 else 'p', spots[i] * (1 + ds), book.strike[i],
+                        book.volatility[i] + dv, book.time_to_maturity[i], book.interest_rate[i] + dr)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    print('{:>8} {:>14} {:>14} {:>14}'.format('lines', 'loops (s)', 'engine (s)', '4 threads (s)'))
+    for lines in [10, 1000, 10000]:
+        book = make_book(lines)
+        loop_time = timed(lambda: nested_loops(book)) if lines <= 10 else float('nan')
+        engine_time = timed(lambda: sc.scenario_pnl(book, None, SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS))
+        thread_time = timed(lambda: sc.scenario_pnl(book, None, SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS,
+                                                    n_threads=4))
+        print('{:>8} {:>14.3f} {:>14.3f} {:>14.3f}'.format(lines, loop_time, engine_time, thread_time))
+
+
+if __name__ == '__main__':
+    main()
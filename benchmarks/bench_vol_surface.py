@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Batch lookups on VolSurface against one lookup per
+# contract, and the cost of requoting a single expiry
+# (one slice rebuilt) on a surface that is already built.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy.vol_surface import VolSurface
+
+EXPIRIES = np.array([1 / 52, 1 / 12, 0.25, 0.5, 0.75, 1., 1.5, 2., 3., 5.])
+STRIKES = np.linspace(50., 150., 41)
+CONTRACTS = 100000
+
+
+def main():
+    expiry, strike = [a.ravel() for a in np.meshgrid(EXPIRIES, STRIKES, indexing='ij')]
+    vols = 0.2 + 0.1 * np.log(strike / 100.) ** 2 / expiry ** 0.5
+    surface = VolSurface(expiry, strike, vols, 100., 0.03, 0.01)
+
+    rng = np.random.default_rng(0)
+    mat = rng.uniform(0.01, 6., CONTRACTS)
+    strikes = rng.uniform(40., 160., CONTRACTS)
+    surface.vol(mat, strikes)
+
+    batch = min(timeit.repeat(lambda: surface.vol(mat, strikes), number=1, repeat=5))
+    loop = min(timeit.repeat(lambda: [surface.vol(mat[i], strikes[i]) for i in range(1000)], number=1, repeat=3))
+    print('{} contracts: batch {:.1f} ms ({:.0f} ns / contract), scalar loop {:.0f} us / contract'.format(
+        CONTRACTS, batch * 1e3, batch / CONTRACTS * 1e9, loop / 1000 * 1e6))
+
+    def requote():
+        surface.set_quotes(1., STRIKES, vols[expiry == 1.] + 0.01)
+        surface.vol(mat, strikes)
+
+    print('requote one expiry and relookup: {:.1f} ms'.format(min(timeit.repeat(requote, number=1, repeat=5)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Pricing a bond inventory off one bootstrapped YieldCurve:
+# the bulk bond_price call (one discount() evaluation over
+# the distinct coupon grids) against discounting each bond's
+# cash flows in a Python loop.
+# --------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import timeit
+
+import numpy as np
+
+from derpy.yield_curve import YieldCurve
+
+BONDS = 100000
+LOOP_BONDS = 2000
+
+
+def loop_price(curve, face_value, maturity, cpn_rate, cpn_freq):
+    prices = []
+    for face, mat, cpn, freq in zip(face_value, maturity, cpn_rate, cpn_freq):
+        times = np.arange(1, int(mat * freq) + 1) / freq
+        prices.append(cpn / 100. * face / freq * curve.discount(times).sum() + face * curve.discount(mat))
+    return np.array(prices)
+
+
+def main():
+    curve = YieldCurve.bootstrap(deposits=[(0.25, 0.021), (0.5, 0.022)],
+                                 swaps=[(1., 0.024, 2), (2., 0.026, 2), (5., 0.031, 2), (10., 0.034, 2),
+                                        (30., 0.037, 2)])
+    rng = np.random.default_rng(0)
+    # maturities on a quarterly grid, as in a typical inventory sharing coupon dates
+    maturity = rng.integers(1, 120, BONDS) / 4.
+    cpn_freq = rng.choice([1., 2., 4.], BONDS)
+    cpn_rate = rng.uniform(0., 8., BONDS)
+    face_value = np.full(BONDS, 100.)
+
+    bulk = curve.bond_price(face_value, maturity, cpn_rate, cpn_freq)
+    looped = loop_price(curve, face_value[:LOOP_BONDS], maturity[:LOOP_BONDS], cpn_rate[:LOOP_BONDS],
+                        cpn_freq[:LOOP_BONDS])
+    print('max difference {:.2e}'.format(np.max(np.abs(bulk[:LOOP_BONDS] - looped))))
+
+    bulk_time = min(timeit.repeat(lambda: curve.bond_price(face_value, maturity, cpn_rate, cpn_freq),
+                                  number=1, repeat=5))
+    loop_time = min(timeit.repeat(lambda: loop_price(curve, face_value[:LOOP_BONDS], maturity[:LOOP_BONDS],
+                                                     cpn_rate[:LOOP_BONDS], cpn_freq[:LOOP_BONDS]),
+                                  number=1, repeat=3))
+    print('{} bonds: bulk {:.1f} ms ({:.0f} ns / bond), loop {:.1f} us / bond'.format(
+        BONDS, bulk_time * 1e3, bulk_time / BONDS * 1e9, loop_time / LOOP_BONDS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
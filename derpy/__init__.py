@@ -21,3 +21,22 @@ __version__ = '0.1.1'
 # IMPORTS
 
 # Local application/library specific imports
+
+# submodules are imported on first attribute access (derpy.option_bsm, ...), so
+# `import derpy` stays cheap and scipy / pandas load only with the modules that use them
+_SUBMODULES = ('bond', 'bond_book', 'bond_calcs', 'cashflow', 'option', 'option_binomial', 'option_book',
+               'option_bsm', 'option_mc', 'option_pde', 'parallel', 'portfolio', 'portfolio_array',
+               'portfolio_store', 'portfolio_stream', 'scenario', 'schedule', 'special', 'vol_surface',
+               'yield_curve')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        import importlib
+
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
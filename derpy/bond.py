@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
-import scipy.optimize as optimize
+
+from derpy.parallel import process_map
 
 
 def bond_convexity(price, face_value, time_to_mat, cpn_rate, cpn_freq, dy=0.01):
@@ -13,20 +14,10 @@ def bond_convexity(price, face_value, time_to_mat, cpn_rate, cpn_freq, dy=0.01):
     :param time_to_mat: time to maturity
     :param cpn_rate: coupon rate
     :param cpn_freq: coupon freq
-    :param dy:
+    :param dy: unused, kept for backwards compatibility (convexity is analytic)
     :return: convexity
     '''
-    ytm = bond_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq)
-
-    ytm_minus = ytm - dy
-    price_minus = bond_price(face_value, time_to_mat, ytm_minus, cpn_rate, cpn_freq)
-
-    ytm_plus = ytm + dy
-    price_plus = bond_price(face_value, time_to_mat, ytm_plus, cpn_rate, cpn_freq)
-
-    convexity = (price_minus + price_plus - 2 * price) / (price * dy ** 2)
-
-    return convexity
+    return bond_analytics(price, face_value, time_to_mat, cpn_rate, cpn_freq)[3]
 
 
 def bond_duration(price, face_value, time_to_mat, cpn_rate, cpn_freq, dy=0.01):
@@ -37,63 +28,262 @@ def bond_duration(price, face_value, time_to_mat, cpn_rate, cpn_freq, dy=0.01):
     :param time_to_mat: float >= 0 (e.g. 9.20)
     :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
     :param cpn_freq: float >= 0 (e.g. 99.90)
-    :param dy: float >= 0 (e.g. 0.01)
+    :param dy: unused, kept for backwards compatibility (duration is analytic)
     :return: float: mod_dur, mac_dir
     '''
-
-    ytm = bond_ytm(price=price, face_value=face_value, time_to_mat=time_to_mat, cpn_rate=cpn_rate, cpn_freq=cpn_freq)
-    ytm_minus = ytm - dy
-    price_minus = bond_price(face_value=face_value, time_to_mat=time_to_mat, yld_to_mat=ytm_minus, cpn_rate=cpn_rate,
-                             cpn_freq=cpn_freq)
-    ytm_plus = ytm + dy
-    price_plus = bond_price(face_value=face_value, time_to_mat=time_to_mat, yld_to_mat=ytm_plus, cpn_rate=cpn_rate,
-                            cpn_freq=cpn_freq)
-    mac_dur = (price_minus - price_plus)
-    mod_dur = mac_dur / (2. * price * dy)
+    ytm, mod_dur, mac_dur, convexity = bond_analytics(price, face_value, time_to_mat, cpn_rate, cpn_freq)
 
     return mod_dur, mac_dur
 
 
+def bond_analytics(price, face_value, time_to_mat, cpn_rate, cpn_freq=2, guess=None):
+    '''
+    Yield to maturity, durations and convexity from a single yield solve.
+    All inputs may be arrays of bonds.
+    :param price: float >= 0 (e.g. 99.90)
+    :param face_value: float >= 0 (e.g. 100.0)
+    :param time_to_mat: float >= 0 (e.g. 9.20)
+    :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
+    :param cpn_freq: int >= 0 (1 = annual, 2 = semi-annual, 4 = quarterly)
+    :param guess: starting yield (e.g. 0.05 to represent 5%), see bond_ytm
+    :return: ytm (e.g. 0.05 to represent 5%), mod_dur, mac_dur, convexity
+    '''
+    ytm = bond_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq, guess)
+    mod_dur, mac_dur, convexity = bond_yield_risk(face_value, time_to_mat, ytm, cpn_rate, cpn_freq)
+
+    return ytm, mod_dur, mac_dur, convexity
+
+
+def bond_yield_risk(face_value, time_to_mat, ytm, cpn_rate, cpn_freq=2):
+    '''
+    Analytic durations and convexity at a known yield to maturity
+    :param face_value: float >= 0 (e.g. 100.0)
+    :param time_to_mat: float >= 0 (e.g. 9.20)
+    :param ytm: yield to maturity (e.g. 0.05 to represent 5%)
+    :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
+    :param cpn_freq: int >= 0 (1 = annual, 2 = semi-annual, 4 = quarterly)
+    :return: mod_dur, mac_dur, convexity
+    '''
+    model_px, d_price, d2_price = _bond_price_derivs(face_value, time_to_mat, ytm, cpn_rate, cpn_freq)
+
+    mod_dur = -1 * d_price / model_px
+    mac_dur = mod_dur * (1 + ytm / np.asarray(cpn_freq, dtype=np.float64))
+    convexity = d2_price / model_px
+
+    return mod_dur, mac_dur, convexity
+
+
 def bond_price(face_value, time_to_mat, yld_to_mat, cpn_rate, cpn_freq=2):
     '''
     Calculates bond price from yield to mat
     :param face_value: float >= 0 (e.g. 99.90)
     :param time_to_mat: float >= 0 (e.g 12.5)
-    :param yld_to_mat: float >= 0 (e.g. 2.5 to represent 2.5%)
+    :param yld_to_mat: float >= 0 (e.g. 2.5 to represent 2.5%), or a YieldCurve to discount each
+                       cash flow off
     :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
     :param cpn_freq: int >= 0 (1 = annual, 2 = semi-annual, 4 = quarterly)
     :return:
     '''
-    cpn_freq = float(cpn_freq)
-    periods = time_to_mat * cpn_freq
-    coupon = cpn_rate / 100. * face_value / cpn_freq
-    dt = [(i + 1) / cpn_freq for i in range(int(periods))]
-    price = sum([coupon / (1 + yld_to_mat / 100.0 / cpn_freq) ** (cpn_freq * t) for t in dt]) + \
-                 face_value / (1 + yld_to_mat / 100.0 / cpn_freq) ** (cpn_freq * time_to_mat)
+    if hasattr(yld_to_mat, 'bond_price'):
+        return yld_to_mat.bond_price(face_value, time_to_mat, cpn_rate, cpn_freq)
+
+    yld_to_mat = np.asarray(yld_to_mat, dtype=np.float64) / 100.0
 
-    return price
+    return _bond_price_derivs(face_value, time_to_mat, yld_to_mat, cpn_rate, cpn_freq)[0]
 
 
-def bond_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq=2, guess=0.05):
+def bond_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq=2, guess=None):
     '''
+    Solves the yield to maturity with exact Newton steps on the analytic price
+    :param price: float >= 0 (e.g. 99.90)
+    :param face_value: float >= 0 (e.g. 100.0)
+    :param time_to_mat: float >= 0 (e.g. 9.20)
+    :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
+    :param cpn_freq: int >= 0 (1 = annual, 2 = semi-annual, 4 = quarterly)
+    :param guess: starting yield (e.g. 0.05 to represent 5%), defaults to
+                  the approximate yield (coupon + pull to par) / average price
+    :return: yield to maturity (e.g. 0.05 to represent 5%)
 
-    :param price:
-    :param face_value:
-    :param time_to_mat:
-    :param cpn_rate:
-    :param cpn_freq:
-    :param guess:
-    :return:
+    Unlike bond_price, which takes the yield in percent, the yield here is a
+    decimal. Raises RuntimeError if any bond fails to solve, use
+    bond_ytm_batch to have failures flagged instead.
     '''
-    cpn_freq = float(cpn_freq)
-    periods = time_to_mat * cpn_freq
-    coupon = cpn_rate / 100. * face_value / cpn_freq
-    dt = [(i + 1) / cpn_freq for i in range(int(periods))]
-    ytm_func = lambda y: \
-        sum([coupon / (1 + y / cpn_freq) ** (cpn_freq * t) for t in dt]) + \
-        face_value / (1 + y / cpn_freq) ** (cpn_freq * max(dt)) - price
+    ytm, iterations, converged = bond_ytm_batch(price, face_value, time_to_mat, cpn_rate, cpn_freq, guess)
+
+    if not np.all(converged):
+        raise RuntimeError("Failed to converge for {} of {} bonds, value is {}".format(
+            np.size(converged) - np.count_nonzero(converged), np.size(converged), ytm))
+
+    return ytm
+
+
+def bond_ytm_batch(price, face_value, time_to_mat, cpn_rate, cpn_freq=2, guess=None, tol=1e-13, max_iter=100,
+                   bracket=(-0.5, 5.0), chunk_size=None, n_workers=1):
+    '''
+    Solves yields to maturity for arrays of bonds simultaneously.
+
+    Every row takes exact Newton steps on the analytic price inside its own
+    yield bracket, which tightens on each iteration since price is decreasing
+    in yield. Steps that leave the bracket, or have no usable derivative, fall
+    back to bisection. Converged rows drop out of the working set. Rows whose
+    price lies outside the bracket, or with invalid inputs, are flagged rather
+    than raising.
+
+    :param price: float >= 0 (e.g. 99.90)
+    :param face_value: float >= 0 (e.g. 100.0)
+    :param time_to_mat: float >= 0 (e.g. 9.20)
+    :param cpn_rate: float >= 0 (e.g. 2.5 to represent 2.5%)
+    :param cpn_freq: int >= 0 (1 = annual, 2 = semi-annual, 4 = quarterly)
+    :param guess: starting yield (e.g. 0.05 to represent 5%), see bond_ytm
+    :param tol: convergence tolerance on the yield step
+    :param max_iter: iteration cap per row
+    :param bracket: (lowest, highest) yield searched (e.g. 0.05 to represent 5%)
+    :param chunk_size: bonds per worker task when n_workers != 1
+    :param n_workers: number of worker processes sharding the bonds, None for one per CPU
+    :return: ytm (NaN where not converged), iterations, converged mask
+    '''
+    if guess is None:
+        guess = _approx_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq)
+
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=np.float64)
+                                   for a in (price, face_value, time_to_mat, cpn_rate, cpn_freq, guess)])
+    shape = arrays[0].shape
+
+    if n_workers != 1:
+        ytm, iterations, converged = process_map(bond_ytm_batch, [a.ravel() for a in arrays], chunk_size, n_workers,
+                                                 tol=tol, max_iter=max_iter, bracket=bracket)
+        return ytm.reshape(shape)[()], iterations.reshape(shape)[()], converged.reshape(shape)[()]
+
+    price, face_value, time_to_mat, cpn_rate, cpn_freq, ytm = [a.ravel() for a in arrays]
+
+    result = np.full(price.size, np.nan)
+    iterations = np.zeros(price.size, dtype=np.int64)
+    converged = np.zeros(price.size, dtype=bool)
+
+    valid = np.isfinite(price) & (price > 0) & np.isfinite(face_value) & (time_to_mat > 0) & (cpn_freq > 0) \
+        & np.isfinite(cpn_rate)
+    active = np.flatnonzero(valid)
+
+    # keep rows whose price is bracketed, P(lo) >= price >= P(hi)
+    lo = np.full(active.size, float(bracket[0]))
+    hi = np.full(active.size, float(bracket[1]))
+    px_lo = _bond_price_derivs(face_value[active], time_to_mat[active], lo, cpn_rate[active], cpn_freq[active],
+                               order=1)[0]
+    px_hi = _bond_price_derivs(face_value[active], time_to_mat[active], hi, cpn_rate[active], cpn_freq[active],
+                               order=1)[0]
+    inside = (px_lo >= price[active]) & (px_hi <= price[active])
+    active, lo, hi = active[inside], lo[inside], hi[inside]
+
+    ytm = ytm[active]
+    ytm = np.where(np.isfinite(ytm) & (ytm > lo) & (ytm < hi), ytm, (lo + hi) / 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            if not active.size:
+                break
+            iterations[active] += 1
+
+            model_px, d_price, _ = _bond_price_derivs(face_value[active], time_to_mat[active], ytm,
+                                                      cpn_rate[active], cpn_freq[active], order=1)
+            diff = model_px - price[active]
+            lo = np.where(diff > 0, ytm, lo)
+            hi = np.where(diff < 0, ytm, hi)
+
+            # converged rows accept the raw Newton step, a sub-ulp step can land on the
+            # bracket edge and must not send a solved row into bisection
+            new_ytm = ytm - diff / d_price
+            done = (diff == 0) | (np.abs(new_ytm - ytm) < tol)
+            new_ytm = np.where(diff == 0, ytm, new_ytm)
+            bisect = ~done & (~np.isfinite(new_ytm) | (new_ytm <= lo) | (new_ytm >= hi))
+            new_ytm = np.where(bisect, (lo + hi) / 2, new_ytm)
+
+            result[active[done]] = new_ytm[done]
+            converged[active[done]] = True
+
+            keep = ~done
+            active, ytm, lo, hi = active[keep], new_ytm[keep], lo[keep], hi[keep]
+
+    return result.reshape(shape)[()], iterations.reshape(shape)[()], converged.reshape(shape)[()]
+
+
+def _approx_ytm(price, face_value, time_to_mat, cpn_rate, cpn_freq):
+    '''
+    :return: textbook yield approximation, used as a Newton starting point
+    '''
+    price = np.asarray(price, dtype=np.float64)
+    face_value = np.asarray(face_value, dtype=np.float64)
+    annual_cpn = np.asarray(cpn_rate, dtype=np.float64) / 100. * face_value
+    # pull to par over at least one coupon period, a bond at maturity would divide by zero
+    with np.errstate(divide='ignore'):
+        years = np.maximum(np.asarray(time_to_mat, dtype=np.float64), 1. / np.asarray(cpn_freq, dtype=np.float64))
 
-    return optimize.newton(ytm_func, guess)
+    return (annual_cpn + (face_value - price) / years) / ((face_value + price) / 2)
+
+
+def _bond_price_derivs(face_value, time_to_mat, ytm, cpn_rate, cpn_freq, order=2):
+    '''
+    Closed form bond price and its first and second derivatives in yield.
+    Coupons are paid every 1 / cpn_freq years for int(time_to_mat * cpn_freq)
+    periods and the face value is discounted from time_to_mat, as in the
+    original cash flow sum. The coupon leg is the annuity
+    A(i) = (1 - (1 + i)^-n) / i at the periodic yield i = ytm / cpn_freq.
+    :param ytm: yield to maturity as a decimal (e.g. 0.05 to represent 5%)
+    :param order: highest derivative needed, the second derivative is None for order < 2
+    :return: price, d(price)/d(ytm), d2(price)/d(ytm)2
+    '''
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=np.float64)
+                                   for a in (face_value, time_to_mat, ytm, cpn_rate, cpn_freq)])
+    shape = arrays[0].shape
+    face_value, time_to_mat, ytm, cpn_rate, cpn_freq = [a.ravel() for a in arrays]
+    face_periods = time_to_mat * cpn_freq
+    periods = np.floor(face_periods)
+    coupon = cpn_rate / 100. * face_value / cpn_freq
+    rate = ytm / cpn_freq
+    log_growth = np.log1p(rate)
+    inv_growth = 1 / (1 + rate)
+
+    disc_n = np.exp(-1 * periods * log_growth)
+    d_disc_n = -1 * periods * disc_n * inv_growth
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = (1 - disc_n) / rate
+        d_annuity = (-1 * d_disc_n - annuity) / rate
+        if order >= 2:
+            d2_annuity = ((periods + 1) * d_disc_n * inv_growth - 2 * d_annuity) / rate
+
+    # when n * i is small the closed form cancels, so use the power series
+    # A(i) = sum_j (-1)^j C(n + j, j + 1) i^j and its derivatives instead
+    small = np.flatnonzero(np.abs(rate) * np.maximum(periods, 1) < 0.1)
+    if small.size:
+        small_n = periods[small]
+        small_rate = rate[small]
+        coef = small_n
+        series = [np.zeros(small.size) for _ in range(3)]
+        for j in range(16):
+            term = (-1) ** j * coef
+            series[0] += term * small_rate ** j
+            if j >= 1:
+                series[1] += j * term * small_rate ** (j - 1)
+            if j >= 2:
+                series[2] += j * (j - 1) * term * small_rate ** (j - 2)
+            coef = coef * (small_n + j + 1) / (j + 2)
+        annuity[small] = series[0]
+        d_annuity[small] = series[1]
+        if order >= 2:
+            d2_annuity[small] = series[2]
+
+    principal = face_value * np.exp(-1 * face_periods * log_growth)
+    d_principal = -1 * face_periods * principal * inv_growth
+
+    price = coupon * annuity + principal
+    d_price = (coupon * d_annuity + d_principal) / cpn_freq
+
+    d2_price = None
+    if order >= 2:
+        d2_principal = -1 * (face_periods + 1) * d_principal * inv_growth
+        d2_price = ((coupon * d2_annuity + d2_principal) / cpn_freq ** 2).reshape(shape)[()]
+
+    return price.reshape(shape)[()], d_price.reshape(shape)[()], d2_price
 
 
 def bond_cashflow(price, time_to_mat, cpn_rate, cpn_freq, face_value):
@@ -104,16 +294,12 @@ def bond_cashflow(price, time_to_mat, cpn_rate, cpn_freq, face_value):
     :param cpn_rate: coupon rate of the bond
     :param face_value: faceValue of the bond
     :param cpn_freq: frequency of the compounding
-    :return: the irr (YTM) of the bond
-
-    Notes: The yield to time_to_mat (irr) calculation uses the numpy.irr library,
-           which adopts a method that finds the root of a polynomial by solving
-           the eigenvalue of the companion matrix. For a detailed explanation,
-           please see http://web.mit.edu/18.06/www/Spring17/Eigenvalue-Polynomials.pdf
+    :return: list of cash flows, starting with the (negative) purchase price
 
-           There are other faster, and generic ways to solve for the root of polynomial.
-           i.e. the Newton-Raphson method. For an example of YTM calculation using this
-           method please see https://github.com/jamesmawm/Mastering-Python-for-Finance-source-codes/blob/master/B03898_05_Codes/bond_ytm.py
+    Notes: The yield to time_to_mat (irr) of these cash flows can be solved with
+           derpy.cashflow.cf_irr, a safeguarded Newton-Raphson iteration that also
+           takes many bonds at once as rows of a padded matrix (see
+           derpy.cashflow.pad_cash_flows).
     """
 
     cash_flow = [-1 * float(price)]
@@ -177,8 +363,20 @@ class Bond(object):
                                       cpn_freq=self.coupon_freq)
         return self.duration
 
-    def calc_px(self):
-        self.price = bond_price(yld_to_mat=self.yield_to_mat,
+    def calc_convexity(self):
+        self.convexity = bond_convexity(price=self.price,
+                                        face_value=self.face_value,
+                                        time_to_mat=self.maturity,
+                                        cpn_rate=self.coupon_rate,
+                                        cpn_freq=self.coupon_freq)
+        return self.convexity
+
+    def calc_px(self, curve=None):
+        """
+        :param curve: YieldCurve to price off, defaults to discounting at yield_to_mat
+        """
+        # yield_to_mat is a decimal (as solved by calc_ytm), bond_price takes percent
+        self.price = bond_price(yld_to_mat=self.yield_to_mat * 100 if curve is None else curve,
                                 face_value=self.face_value,
                                 time_to_mat=self.maturity,
                                 cpn_rate=self.coupon_rate,
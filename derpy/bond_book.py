@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Columnar bond inventory
+# Notes:
+#       BondBook stores one contiguous float64 column per bond
+#       attribute so analytics run as single vectorized calls
+#       over the whole inventory. Bond objects handed out by
+#       the book are views that read and write its rows.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from derpy import bond as bd
+
+
+class BondBook(object):
+    # static bond terms, followed by the analytics the book fills in
+    INPUT_COLUMNS = ('coupon_rate', 'coupon_freq', 'maturity', 'face_value', 'price')
+    OUTPUT_COLUMNS = ('yield_to_mat', 'mod_duration', 'mac_duration', 'convexity')
+    COLUMNS = INPUT_COLUMNS + OUTPUT_COLUMNS
+
+    def __init__(self, coupon_rate, coupon_freq, maturity, face_value, price=None, yield_to_mat=None, index=None):
+        """
+        :param coupon_rate: coupon rates (e.g. 2.5 to represent 2.5%)
+        :param coupon_freq: coupons per year (1 = annual, 2 = semi-annual, 4 = quarterly)
+        :param maturity: times to maturity in years
+        :param face_value: face values
+        :param price: market prices, NaN where unknown
+        :param yield_to_mat: yields to maturity (e.g. 0.05 to represent 5%), NaN where unknown
+        :param index: optional row labels, kept for pandas export
+
+        Scalars are broadcast to the book length, arrays must be 1-D and all of
+        the same length. float64 arrays that are already contiguous are stored
+        without copying.
+        """
+        inputs = dict(coupon_rate=coupon_rate, coupon_freq=coupon_freq, maturity=maturity, face_value=face_value,
+                      price=price, yield_to_mat=yield_to_mat)
+        shapes = dict((name, np.shape(values)) for name, values in inputs.items() if values is not None)
+        lengths = set(shape for shape in shapes.values() if shape != ())
+        if len(lengths) > 1 or any(len(shape) != 1 for shape in lengths):
+            raise ValueError("Book columns must be scalars or 1-D arrays of one length, got shapes {}".format(
+                ', '.join('{}={}'.format(name, shape) for name, shape in sorted(shapes.items()))))
+        size = lengths.pop()[0] if lengths else 1
+        self.index = index
+
+        # per row solver diagnostics from the last calc_ytm / calc_duration
+        self.ytm_iterations = np.zeros(size, dtype=np.int64)
+        self.ytm_converged = np.zeros(size, dtype=bool)
+
+        for name, values in [('coupon_rate', coupon_rate),
+                             ('coupon_freq', coupon_freq),
+                             ('maturity', maturity),
+                             ('face_value', face_value),
+                             ('price', price),
+                             ('yield_to_mat', yield_to_mat),
+                             ('mod_duration', None),
+                             ('mac_duration', None),
+                             ('convexity', None)]:
+            setattr(self, name, _column(values, size))
+
+    def __repr__(self):
+        return "BondBook(size={})".format(len(self))
+
+    def __len__(self):
+        return self.maturity.shape[0]
+
+    def __getitem__(self, row):
+        return self.bond(row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield BondView(self, row)
+
+    def bond(self, row):
+        """
+        :param row: row number
+        :return: Bond view reading and writing that row of the book
+        """
+        if not -len(self) <= row < len(self):
+            raise IndexError("Bond row {} out of range for book of size {}".format(row, len(self)))
+        return BondView(self, row % len(self))
+
+    @classmethod
+    def from_bonds(cls, bonds):
+        """
+        :param bonds: iterable of Bond objects
+        :return: BondBook holding a copy of their terms
+        """
+        bonds = list(bonds)
+        columns = {}
+        for name in ('coupon_rate', 'coupon_freq', 'maturity', 'face_value', 'price', 'yield_to_mat'):
+            columns[name] = [np.nan if getattr(b, name) is None else getattr(b, name) for b in bonds]
+
+        return cls(**columns)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        :param frame: pandas DataFrame with (a subset of) the COLUMNS as columns
+        :return: BondBook sharing the frame's float64 column memory where possible
+        """
+        columns = {}
+        for name in cls.INPUT_COLUMNS + ('yield_to_mat',):
+            if name in frame.columns:
+                columns[name] = frame[name].to_numpy(dtype=np.float64, copy=False)
+
+        return cls(index=frame.index, **columns)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        :param records: NumPy structured array with (a subset of) the COLUMNS as fields
+        :return: BondBook
+        """
+        columns = {}
+        for name in cls.INPUT_COLUMNS + ('yield_to_mat',):
+            if name in records.dtype.names:
+                columns[name] = records[name]
+
+        return cls(**columns)
+
+    def to_frame(self):
+        """
+        :return: pandas DataFrame of every column, built without copying
+        """
+        import pandas as pd
+
+        return pd.DataFrame({name: getattr(self, name) for name in self.COLUMNS}, index=self.index, copy=False)
+
+    def to_records(self):
+        """
+        :return: NumPy structured array of every column
+        """
+        records = np.empty(len(self), dtype=[(name, np.float64) for name in self.COLUMNS])
+        for name in self.COLUMNS:
+            records[name] = getattr(self, name)
+
+        return records
+
+    def calc_ytm(self, chunk_size=None, n_workers=1):
+        """
+        Solves every row at once. Rows that fail to solve are left NaN and
+        flagged in ytm_converged rather than raising.
+        :param chunk_size: bonds per worker task
+        :param n_workers: worker processes sharding the book, None for one per CPU
+        :return: yield to maturity column
+        """
+        ytm, iterations, converged = bd.bond_ytm_batch(price=self.price,
+                                                       face_value=self.face_value,
+                                                       time_to_mat=self.maturity,
+                                                       cpn_rate=self.coupon_rate,
+                                                       cpn_freq=self.coupon_freq,
+                                                       chunk_size=chunk_size,
+                                                       n_workers=n_workers)
+        self.yield_to_mat = _column(ytm, len(self))
+        self.ytm_iterations = np.asarray(iterations).reshape(len(self))
+        self.ytm_converged = np.asarray(converged).reshape(len(self))
+        return self.yield_to_mat
+
+    def calc_px(self):
+        """
+        :return: price column, repriced from the yield to maturity column
+        """
+        self.price = _column(bd.bond_price(face_value=self.face_value,
+                                           time_to_mat=self.maturity,
+                                           yld_to_mat=self.yield_to_mat * 100,
+                                           cpn_rate=self.coupon_rate,
+                                           cpn_freq=self.coupon_freq), len(self))
+        return self.price
+
+    def calc_duration(self, chunk_size=None, n_workers=1):
+        """
+        Fills the yield, duration and convexity columns from one yield solve
+        :param chunk_size: bonds per worker task
+        :param n_workers: worker processes for the yield solve, None for one per CPU
+        :return: modified duration and Macaulay duration columns
+        """
+        ytm = self.calc_ytm(chunk_size, n_workers)
+        mod_dur, mac_dur, convexity = bd.bond_yield_risk(face_value=self.face_value,
+                                                         time_to_mat=self.maturity,
+                                                         ytm=ytm,
+                                                         cpn_rate=self.coupon_rate,
+                                                         cpn_freq=self.coupon_freq)
+        self.mod_duration = _column(mod_dur, len(self))
+        self.mac_duration = _column(mac_dur, len(self))
+        self.convexity = _column(convexity, len(self))
+
+        return self.mod_duration, self.mac_duration
+
+
+class BondView(bd.Bond):
+    """
+    A Bond whose attributes live in one row of a BondBook
+    """
+
+    def __init__(self, book, row):
+        self.book = book
+        self.row = row
+        self.cash_flows = []
+
+    coupon_rate = property(lambda self: self._get('coupon_rate'), lambda self, v: self._set('coupon_rate', v))
+    coupon_freq = property(lambda self: self._get('coupon_freq'), lambda self, v: self._set('coupon_freq', v))
+    maturity = property(lambda self: self._get('maturity'), lambda self, v: self._set('maturity', v))
+    face_value = property(lambda self: self._get('face_value'), lambda self, v: self._set('face_value', v))
+    price = property(lambda self: self._get('price'), lambda self, v: self._set('price', v))
+    yield_to_mat = property(lambda self: self._get('yield_to_mat'), lambda self, v: self._set('yield_to_mat', v))
+    convexity = property(lambda self: self._get('convexity'), lambda self, v: self._set('convexity', v))
+
+    @property
+    def duration(self):
+        mod_dur, mac_dur = self._get('mod_duration'), self._get('mac_duration')
+        return [] if mod_dur is None else (mod_dur, mac_dur)
+
+    @duration.setter
+    def duration(self, value):
+        mod_dur, mac_dur = value if len(value) else (None, None)
+        self._set('mod_duration', mod_dur)
+        self._set('mac_duration', mac_dur)
+
+    def _get(self, name):
+        value = getattr(self.book, name)[self.row]
+        return None if np.isnan(value) else float(value)
+
+    def _set(self, name, value):
+        column = getattr(self.book, name)
+        if not column.flags.writeable:
+            # columns shared read-only with a source frame are copied on first write
+            column = column.copy()
+            setattr(self.book, name, column)
+        column[self.row] = np.nan if value is None else value
+
+
+def _column(values, size):
+    """
+    :return: contiguous float64 column of length size, NaN filled for None
+    """
+    if values is None:
+        return np.full(size, np.nan)
+
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape != (size,):
+        values = np.array(np.broadcast_to(values, (size,)))
+
+    return np.ascontiguousarray(values)
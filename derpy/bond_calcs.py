@@ -6,7 +6,7 @@
 # August 2018
 # --------------------------------------------------------
 
-import numpy as np
+from derpy import cashflow as cf
 
 
 def bond_price(rate, maturity, coupon, face_value, freq, due=0):
@@ -21,7 +21,7 @@ def bond_price(rate, maturity, coupon, face_value, freq, due=0):
     :return: the npv of all bond future cash flows
     """
 
-    npv = np.pv(rate/freq, maturity*freq, -1*coupon*face_value/freq, -1*face_value, due)
+    npv = cf.annuity_pv(rate/freq, maturity*freq, -1*coupon*face_value/freq, -1*face_value, due)
 
     return npv
 
@@ -36,21 +36,17 @@ def ytm_calculation(price, maturity, coupon, face_value, freq):
     :param freq: frequency of the compounding
     :return: the irr (YTM) of the bond
 
-    Notes: The yield to maturity (irr) calculation uses the numpy.irr library,
-           which adopts a method that finds the root of a polynomial by solving
-           the eigenvalue of the companion matrix. For a detailed explanation,
-           please see http://web.mit.edu/18.06/www/Spring17/Eigenvalue-Polynomials.pdf
-
-           There are other faster, and generic ways to solve for the root of polynomial.
-           i.e. the Newton-Raphson method. For an example of YTM calculation using this
-           method please see https://github.com/jamesmawm/
-                    Mastering-Python-for-Finance-source-codes/blob/master/B03898_05_Codes/bond_ytm.py
+    Notes: The yield to maturity (irr) is found with the safeguarded Newton-Raphson
+           iteration in derpy.cashflow.cf_irr, rather than the eigenvalue solve of the
+           companion matrix used by the (since removed) numpy.irr. For a detailed
+           explanation of that approach, please see
+           http://web.mit.edu/18.06/www/Spring17/Eigenvalue-Polynomials.pdf
     """
 
     cash_flow = [-1*price]
     cash_flow.extend([face_value * coupon / freq] * (maturity*freq - 2))
     cash_flow.append(face_value*(1 + coupon/freq))
 
-    ytm = np.irr(cash_flow)
+    ytm = cf.cf_irr(cash_flow)
 
     return ytm
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Cash flow analytics, PV and IRR over dated cash flows
+# Notes:
+#       Replaces numpy.pv / numpy.irr, which were removed from
+#       NumPy. The IRR is a safeguarded Newton iteration on the
+#       cash flow polynomial rather than an eigenvalue solve of
+#       its companion matrix, so each iteration is O(n) per row
+#       and many instruments solve together as rows of a 2-D
+#       (zero padded) cash flow matrix.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+
+def annuity_pv(rate, nper, pmt, fv=0, when=0):
+    """
+    Present value of a level annuity, same sign convention as numpy.pv
+    :param rate: rate per period
+    :param nper: number of periods
+    :param pmt: payment per period
+    :param fv: future value paid with the last period
+    :param when: payments at the end (0, ordinary annuity) or start (1, annuity due) of each period
+    :return: present value
+    """
+    rate = np.asarray(rate, dtype=np.float64)
+    growth = (1 + rate) ** nper
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(rate == 0, nper, (1 + rate * when) / rate * (growth - 1))
+
+    return (-1 * (fv + pmt * annuity) / growth)[()]
+
+
+def pad_cash_flows(cash_flows, times=None):
+    """
+    Stacks ragged cash flow vectors into zero padded 2-D matrices
+    :param cash_flows: sequence of cash flow vectors, possibly of different lengths
+    :param times: matching sequence of time vectors, None for periods 0, 1, 2, ..
+    :return: (cash_flows, times) as 2-D float64 arrays
+    """
+    cash_flows = [np.asarray(flows, dtype=np.float64) for flows in cash_flows]
+    if times is None:
+        times = [np.arange(flows.size, dtype=np.float64) for flows in cash_flows]
+    else:
+        times = [np.asarray(t, dtype=np.float64) for t in times]
+
+    width = max(flows.size for flows in cash_flows)
+    padded_flows = np.zeros((len(cash_flows), width))
+    padded_times = np.zeros((len(cash_flows), width))
+    for row, (flows, t) in enumerate(zip(cash_flows, times)):
+        padded_flows[row, :flows.size] = flows
+        padded_times[row, :t.size] = t
+
+    return padded_flows, padded_times
+
+
+def cf_pv(rate, cash_flows, times=None):
+    """
+    Present value of dated cash flows, discounted at (1 + rate) ** -time
+    :param rate: rate per unit of time, scalar or one per cash flow row
+    :param cash_flows: cash flow vector, or 2-D matrix with one instrument per row
+    :param times: time of each cash flow (same shape), None for periods 0, 1, 2, ..
+    :return: present value(s)
+    """
+    cash_flows, times = _flows_and_times(cash_flows, times)
+    rate = np.asarray(rate, dtype=np.float64)[..., None]
+
+    return np.sum(cash_flows * np.exp(-1 * times * np.log1p(rate)), axis=-1)[()]
+
+
+def cf_irr(cash_flows, times=None, guess=None, tol=1e-12, max_iter=100, bracket=(-0.99, 10.0)):
+    """
+    Internal rate of return of dated cash flows, one per row.
+
+    Each row takes Newton steps on NPV(r) = sum c_k (1 + r) ** -t_k with its
+    analytic derivative, inside a bracket on which NPV changes sign. Steps
+    leaving the bracket fall back to bisection, and converged rows drop out
+    of the working set.
+
+    :param cash_flows: cash flow vector, or 2-D (zero padded) matrix with one instrument per row
+    :param times: time of each cash flow (same shape), None for periods 0, 1, 2, ..
+    :param guess: starting rate, defaults to a per row estimate from the
+                  ratio of inflows to outflows
+    :param tol: convergence tolerance on the rate step
+    :param max_iter: iteration cap per row
+    :param bracket: (lowest, highest) rate searched
+    :return: IRR per row, NaN where NPV has no sign change on the bracket or
+             the iteration did not converge
+    """
+    cash_flows, times = _flows_and_times(cash_flows, times)
+    shape = cash_flows.shape[:-1]
+    cash_flows = cash_flows.reshape(-1, cash_flows.shape[-1])
+    times = np.broadcast_to(times, cash_flows.shape[:-1] + times.shape[-1:]).reshape(cash_flows.shape)
+    result = np.full(cash_flows.shape[0], np.nan)
+
+    lo = np.full(cash_flows.shape[0], float(bracket[0]))
+    hi = np.full(cash_flows.shape[0], float(bracket[1]))
+    with np.errstate(over='ignore', invalid='ignore'):
+        # discount factors overflow near the bottom of the bracket, so zero
+        # flows are masked to keep 0 * inf out of the sums
+        npv_lo = _npv(lo, cash_flows, times, skip_zeros=True)[0]
+        npv_hi = _npv(hi, cash_flows, times, skip_zeros=True)[0]
+    active = np.flatnonzero(np.sign(npv_lo) * np.sign(npv_hi) < 0)
+    # orient each bracket so NPV is positive at lo and negative at hi
+    flip = npv_lo[active] < 0
+    lo, hi = np.where(flip, hi[active], lo[active]), np.where(flip, lo[active], hi[active])
+
+    if guess is None:
+        inflow = np.sum(np.where(cash_flows > 0, cash_flows, 0), axis=-1)
+        outflow = np.sum(np.where(cash_flows < 0, -1 * cash_flows, 0), axis=-1)
+        horizon = np.sum(np.abs(cash_flows) * times, axis=-1) / np.sum(np.abs(cash_flows), axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            guess = (inflow / outflow) ** (1 / horizon) - 1
+    rate = np.broadcast_to(np.asarray(guess, dtype=np.float64), result.shape)[active]
+    rate = np.where(np.isfinite(rate) & (rate > np.minimum(lo, hi)) & (rate < np.maximum(lo, hi)), rate,
+                    (lo + hi) / 2)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            if not active.size:
+                break
+
+            npv, d_npv = _npv(rate, cash_flows[active], times[active])
+            lo = np.where(npv > 0, rate, lo)
+            hi = np.where(npv < 0, rate, hi)
+
+            # converged rows accept the raw Newton step before the bracket check, as in bond.bond_ytm_batch
+            new_rate = rate - npv / d_npv
+            done = (npv == 0) | (np.abs(new_rate - rate) < tol)
+            new_rate = np.where(npv == 0, rate, new_rate)
+            bisect = ~done & (~np.isfinite(new_rate) | (new_rate <= np.minimum(lo, hi))
+                              | (new_rate >= np.maximum(lo, hi)))
+            new_rate = np.where(bisect, (lo + hi) / 2, new_rate)
+
+            result[active[done]] = new_rate[done]
+
+            keep = ~done
+            active, rate, lo, hi = active[keep], new_rate[keep], lo[keep], hi[keep]
+
+    return result.reshape(shape)[()]
+
+
+def _flows_and_times(cash_flows, times):
+    """
+    :return: cash flows and times as float64 arrays, times defaulting to periods
+    """
+    cash_flows = np.asarray(cash_flows, dtype=np.float64)
+    if times is None:
+        times = np.arange(cash_flows.shape[-1], dtype=np.float64)
+    else:
+        times = np.asarray(times, dtype=np.float64)
+
+    return cash_flows, times
+
+
+def _npv(rate, cash_flows, times, skip_zeros=False):
+    """
+    :return: NPV of each row at its rate, and the derivative in rate
+    """
+    log_growth = np.log1p(rate)[:, None]
+    discounted = cash_flows * np.exp(-1 * times * log_growth)
+    if skip_zeros:
+        discounted = np.where(cash_flows == 0, 0., discounted)
+    npv = np.sum(discounted, axis=-1)
+    d_npv = -1 * np.sum(times * discounted, axis=-1) / (1 + rate)
+
+    return npv, d_npv
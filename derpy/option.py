@@ -8,6 +8,7 @@ from __future__ import print_function
 
 from derpy import option_binomial as bn
 from derpy import option_bsm as bsm
+from derpy import option_pde as pde
 
 
 class Option:
@@ -19,7 +20,33 @@ class Option:
         self.volatility = volatility
         self.interest_rate = interest_rate
 
-    def option_price(self, opt_type='euro', call_put='call', px_method='bsm', step=10):
+    @property
+    def volatility(self):
+        """
+        Flat volatility, or the volatility of this strike and maturity when a VolSurface was given
+        """
+        return bsm._surface_vol(self._volatility, self.time_to_mat, self.strike)
+
+    @volatility.setter
+    def volatility(self, volatility):
+        self._volatility = volatility
+
+    @property
+    def interest_rate(self):
+        """
+        Flat rate, or the zero rate to this maturity when a YieldCurve was given
+        """
+        return bsm._curve_rate(self._interest_rate, self.time_to_mat)
+
+    @interest_rate.setter
+    def interest_rate(self, interest_rate):
+        self._interest_rate = interest_rate
+
+    def option_price(self, opt_type='euro', call_put='call', px_method='bsm', step=None):
+        """
+        :param step: binomial tree steps (default 10), or PDE time steps (default pde_option's)
+        """
+        tree_step = 10 if step is None else step
         if opt_type in ['e', 'european', 'euro']:
             if px_method in ['bsm', 'black']:
 
@@ -40,9 +67,25 @@ class Option:
                                             volatility=self.volatility,
                                             time_to_maturity=self.time_to_mat,
                                             interest_rate=self.interest_rate,
-                                            step=step)
+                                            step=tree_step)
 
                 return opt_px
+
+            elif px_method in ['bbs', 'bbsr', 'richardson']:
+                opt_px = bn.binomial_option(flag='european',
+                                            call_put=call_put,
+                                            stock_price=self.underlying,
+                                            strike=self.strike,
+                                            volatility=self.volatility,
+                                            time_to_maturity=self.time_to_mat,
+                                            interest_rate=self.interest_rate,
+                                            step=tree_step,
+                                            method=px_method)
+
+                return opt_px
+
+            elif px_method in ['pde']:
+                return self._pde_price('european', call_put, step)
             else:
                 raise ValueError("Pricing method: {} not supported".format(px_method))
 
@@ -51,22 +94,46 @@ class Option:
                 raise ValueError("BSM American options not available.. please submit enhancement request..")
 
             elif px_method in ['binomial']:
-                opt_px = bn.binomial_option(flag='european',
+                opt_px = bn.binomial_option(flag='american',
+                                            call_put=call_put,
+                                            stock_price=self.underlying,
+                                            strike=self.strike,
+                                            volatility=self.volatility,
+                                            time_to_maturity=self.time_to_mat,
+                                            interest_rate=self.interest_rate,
+                                            step=tree_step)
+                return opt_px
+
+            elif px_method in ['bbs', 'bbsr', 'richardson']:
+                opt_px = bn.binomial_option(flag='american',
                                             call_put=call_put,
                                             stock_price=self.underlying,
                                             strike=self.strike,
                                             volatility=self.volatility,
                                             time_to_maturity=self.time_to_mat,
                                             interest_rate=self.interest_rate,
-                                            step=step)
+                                            step=tree_step,
+                                            method=px_method)
                 return opt_px
 
+            elif px_method in ['pde']:
+                return self._pde_price('american', call_put, step)
             else:
                 raise ValueError("Pricing method: {} not supported".format(px_method))
 
         else:
             ValueError("Option type not supported: {} not supported".format(px_method))
 
+    def _pde_price(self, flag, call_put, step):
+        return pde.pde_option(flag=flag,
+                              call_put=call_put,
+                              stock_price=self.underlying,
+                              strike=self.strike,
+                              volatility=self.volatility,
+                              time_to_maturity=self.time_to_mat,
+                              interest_rate=self.interest_rate,
+                              n_time=step)
+
     def delta(self):
         pass
 
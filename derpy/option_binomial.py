@@ -7,8 +7,10 @@
 # version 1.0
 # Notes:
 #       This model applies the simple Cox-Ross-Rubinstein (CRR)
-#       model. Advanced alternatives may be added in future
-#       releases. (i.e. Jarrow-Rudd, CRR with drift..)
+#       model, optionally smoothed with a Black-Scholes value at
+#       the penultimate layer (BBS, Broadie & Detemple 1996) and
+#       Richardson extrapolated (BBSR). Further alternatives may
+#       be added in future releases. (i.e. Jarrow-Rudd..)
 # --------------------------------------------------------
 
 # future proof py2 vs py3
@@ -18,6 +20,12 @@ from __future__ import division
 
 import numpy as np
 
+from derpy.option_bsm import _call_put_sign, euro_option_batch
+from derpy.parallel import map_chunks, process_map
+
+# default cap on lattice cells per chunk in binomial_option_batch (32MB per matrix)
+BATCH_CELLS = 2 ** 22
+
 
 def binomial_option(flag,
                     call_put,
@@ -26,7 +34,8 @@ def binomial_option(flag,
                     volatility,
                     time_to_maturity,
                     interest_rate,
-                    step):
+                    step,
+                    method='crr'):
     """
 
     :param flag: indicating American or European option
@@ -37,8 +46,25 @@ def binomial_option(flag,
     :param time_to_maturity: time to expiration of the option
     :param interest_rate: risk-free interest rate
     :param step: number of steps of the binomial tree
+    :param method: 'crr' plain tree, 'bbs' Black-Scholes smoothed penultimate
+                   layer, 'bbsr' BBS with two-point Richardson extrapolation
+                   (n BBS(n) - m BBS(m)) / (n - m), n = step and m about step / 2
+                   with the same parity as step, which is 2 BBS(n) - BBS(n / 2)
+                   when step / 2 is even
     :return: the option price using binomial method
     """
+    if method in ['bbsr', 'richardson']:
+        if step < 3:
+            raise ValueError("Richardson extrapolation needs at least 3 steps, got {}".format(step))
+        # the BBS error is C / n with a constant C that depends on the tree parity,
+        # so the coarse tree must match the parity of the fine one; the weights
+        # cancel C / n for any pair of step counts
+        half_step = step // 2 + (step - step // 2) % 2
+        args = (flag, call_put, stock_price, strike, volatility, time_to_maturity, interest_rate)
+        return (step * binomial_option(*args, step=step, method='bbs')
+                - half_step * binomial_option(*args, step=half_step, method='bbs')) / (step - half_step)
+    elif method not in ['crr', 'bbs']:
+        raise ValueError("Binomial method: {} not supported".format(method))
 
     # set up binomial inputs
     period = time_to_maturity / step
@@ -47,15 +73,6 @@ def binomial_option(flag,
     drift = np.exp(interest_rate * period)
     rn_prob = (drift - down_prob) / (up_prob - down_prob)
 
-    # calculate underlying tree price
-    price_asset = np.zeros((step + 1, step + 1))
-    price_asset[0, 0] = stock_price
-
-    for i in range(1, step + 1):
-        price_asset[i, i] = price_asset[i - 1, i - 1] * down_prob
-        for j in range(i):
-            price_asset[j, i] = price_asset[j, i - 1] * up_prob
-
     # set option type
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         call_put = 1
@@ -72,16 +89,182 @@ def binomial_option(flag,
     else:
         print("please specify Am or EU option flag")
 
-    # calculate option tree price
-    price_option = np.zeros((step + 1, step + 1))
-    for i in range(step + 1):
-        price_option[i, step] = max(call_put * (price_asset[i, step] - strike), 0)
-    for j in range(step):
-        for i in range(step - j):
-            price_option[i, step - 1 - j] = (rn_prob * price_option[i, step - j]
-                                             + (1 - rn_prob) * price_option[i + 1, step - j]) / drift
-            if flag == 1:
-                price_option[i, step - 1 - j] = max(call_put * (price_asset[i, step - 1 - j] - strike),
-                                                    price_option[i, step - 1 - j])
-
-    return price_option[0, 0]
+    # underlying price at node j of time slice i is S * up^(i - j) * down^j
+    nodes = np.arange(step + 1)
+    up_pow = up_prob ** nodes
+    down_pow = down_prob ** nodes
+
+    # roll a single slice of option values back from expiry, reusing the
+    # same buffers so memory stays O(step)
+    if method == 'bbs':
+        # one period from expiry the remaining tree is replaced by the
+        # closed form European value, removing the payoff kink oscillation
+        last = step - 1
+        price_asset = stock_price * up_pow[last::-1] * down_pow[:last + 1]
+        price_option = np.empty(step + 1)
+        price_option[:last + 1] = euro_option_batch(call_put, price_asset, strike, volatility, period, interest_rate)
+        if flag == 1:
+            np.maximum(price_option[:last + 1], call_put * (price_asset - strike), out=price_option[:last + 1])
+    else:
+        last = step
+        price_option = np.maximum(call_put * (stock_price * up_pow[::-1] * down_pow - strike), 0)
+    scratch = np.empty(step + 1)
+    exercise = np.empty(step + 1)
+
+    for i in range(last - 1, -1, -1):
+        n = i + 1
+        continuation = price_option[:n]
+        np.multiply(price_option[1:n + 1], 1 - rn_prob, out=scratch[:n])
+        np.multiply(continuation, rn_prob, out=continuation)
+        continuation += scratch[:n]
+        continuation /= drift
+
+        if flag == 1:
+            np.multiply(up_pow[i::-1], down_pow[:n], out=exercise[:n])
+            exercise[:n] *= stock_price
+            exercise[:n] -= strike
+            exercise[:n] *= call_put
+            np.maximum(continuation, exercise[:n], out=continuation)
+
+    return price_option[0]
+
+
+def binomial_option_batch(flag,
+                          call_put,
+                          stock_price,
+                          strike,
+                          volatility,
+                          time_to_maturity,
+                          interest_rate,
+                          step,
+                          div_yield=0,
+                          chunk_size=None,
+                          n_threads=1,
+                          n_workers=1):
+    """
+    Prices many contracts with the same step count through one lattice sweep.
+    Takes the same broadcastable arrays as option_bsm.euro_option_batch and
+    carries a 2-D (nodes x contracts) lattice through backward induction, so
+    there is no per-contract Python overhead.
+
+    :param flag: American or European flag(s), scalar or per contract
+    :param call_put: option type(s), flags ('c', 'put', ...) or +1/-1 signs
+    :param stock_price: the current price of underlying security
+    :param strike: pre-defined strike price of option
+    :param volatility: assumed annual volatility of the underlying security
+    :param time_to_maturity: time to expiration of the option
+    :param interest_rate: risk-free interest rate
+    :param step: number of steps of the binomial tree
+    :param div_yield: continuous dividend yield
+    :param chunk_size: contracts per lattice sweep, caps peak memory at roughly
+                       5 * chunk_size * (step + 1) float64 cells. Defaults to
+                       BATCH_CELLS // (step + 1)
+    :param n_threads: number of threads sweeping chunks concurrently
+    :param n_workers: number of worker processes sharding the book (None for one
+                      per CPU); with n_workers != 1, chunk_size is the contracts per
+                      worker task and n_threads is ignored
+    :return: ndarray of option prices
+    """
+    american = _exercise_flag(flag)
+    arrays = np.broadcast_arrays(american,
+                                 _call_put_sign(call_put),
+                                 np.asarray(stock_price, dtype=np.float64),
+                                 np.asarray(strike, dtype=np.float64),
+                                 np.asarray(volatility, dtype=np.float64),
+                                 np.asarray(time_to_maturity, dtype=np.float64),
+                                 np.asarray(interest_rate, dtype=np.float64),
+                                 np.asarray(div_yield, dtype=np.float64))
+    shape = arrays[0].shape
+    columns = [np.ascontiguousarray(a.ravel()) for a in arrays]
+
+    if n_workers != 1:
+        # each worker task sweeps chunk_size contracts, itself capped by BATCH_CELLS
+        prices = process_map(_binomial_rows, columns, chunk_size, n_workers, step=step)
+    else:
+        prices = _binomial_rows(*columns, step=step, chunk_size=chunk_size, n_threads=n_threads)
+
+    return prices.reshape(shape)
+
+
+def _binomial_rows(american, call_put, stock_price, strike, volatility, time_to_maturity, interest_rate,
+                   div_yield, step, chunk_size=None, n_threads=1):
+    """
+    Prices flat (already broadcast) contract columns for binomial_option_batch
+    :return: 1-D ndarray of option prices
+    """
+    inputs = [call_put, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield]
+
+    if chunk_size is None:
+        chunk_size = max(1, BATCH_CELLS // (step + 1))
+
+    prices = np.empty(american.size)
+
+    # American and European contracts sweep separately so the exercise
+    # check only runs on the rows that need it
+    for is_american in [True, False]:
+        rows = np.flatnonzero(american == is_american)
+        if not rows.size:
+            continue
+        group = [a[rows] for a in inputs]
+
+        def sweep(chunk):
+            return _lattice_sweep(is_american, step, *[a[chunk] for a in group])
+
+        prices[rows] = np.concatenate(map_chunks(sweep, rows.size, chunk_size, n_threads))
+
+    return prices
+
+
+def _exercise_flag(flag):
+    """
+    :param flag: American / European flag(s)
+    :return: boolean array, True for American exercise
+    """
+    flags = np.char.lower(np.asarray(flag).astype(str))
+    is_american = np.isin(flags, ['a', 'am', 'american'])
+    is_european = np.isin(flags, ['e', 'eu', 'european'])
+    if not np.all(is_american | is_european):
+        raise ValueError("please specify Am or EU option flag")
+
+    return is_american
+
+
+def _lattice_sweep(american, step, call_put, stock_price, strike, volatility, time_to_maturity, interest_rate,
+                   div_yield):
+    """
+    Backward induction over a CRR lattice holding every contract in the chunk.
+    :return: ndarray of option prices, one per contract
+    """
+    period = time_to_maturity / step
+    up_prob = np.exp(volatility * (period ** 0.5))
+    down_prob = np.exp(-1 * volatility * (period ** 0.5))
+    drift = np.exp((interest_rate - div_yield) * period)
+    discount = np.exp(interest_rate * period)
+    rn_prob = (drift - down_prob) / (up_prob - down_prob)
+
+    # the lattice is stored node-major, so each time slice of every
+    # contract is one contiguous block of rows
+    nodes = np.arange(step + 1)[:, None]
+    up_pow = up_prob ** nodes
+    down_pow = down_prob ** nodes
+
+    price_option = np.maximum(call_put * (stock_price * up_pow[::-1] * down_pow - strike), 0)
+    scratch = np.empty_like(price_option)
+    exercise = np.empty_like(price_option)
+
+    for i in range(step - 1, -1, -1):
+        n = i + 1
+        continuation = price_option[:n]
+        np.multiply(price_option[1:n + 1], 1 - rn_prob, out=scratch[:n])
+        np.multiply(continuation, rn_prob, out=continuation)
+        continuation += scratch[:n]
+        continuation /= discount
+
+        if american:
+            np.multiply(up_pow[i::-1], down_pow[:n], out=exercise[:n])
+            exercise[:n] *= stock_price
+            exercise[:n] -= strike
+            exercise[:n] *= call_put
+            np.maximum(continuation, exercise[:n], out=continuation)
+
+    return price_option[0].copy()
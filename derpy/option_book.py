@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Option book greeks aggregation
+# Notes:
+#       OptionBook stores one float64 column per option term,
+#       next to the position quantity, and aggregates position
+#       greeks per underlying with np.bincount. Everything that
+#       does not depend on spot (discount factors, sqrt(T), the
+#       d1 drift term and quantity weights) is computed once, so
+#       a spot tick only costs the normal cdf / pdf evaluations,
+#       and only for the lines on the underlyings that moved.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from derpy import option_bsm as bsm
+from derpy.special import norm_cdf, norm_pdf
+
+# position greeks aggregated by the book, per underlying and in total.
+# price is the market value of the positions, theta is per calendar year.
+BOOK_GREEKS = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho')
+BOOK_GREEKS_DTYPE = np.dtype([(name, np.float64) for name in BOOK_GREEKS])
+
+
+class OptionBook(object):
+
+    def __init__(self, underlying, call_put, strike, time_to_maturity, volatility, quantity, spots,
+                 interest_rate=0, div_yield=0, multiplier=1):
+        """
+        :param underlying: underlying label of each line
+        :param call_put: option type of each line, flags ('c', 'put', ...) or +1/-1 signs
+        :param strike: strike prices
+        :param time_to_maturity: times to maturity in years
+        :param volatility: annual volatilities
+        :param quantity: number of contracts held, negative for short positions
+        :param spots: dict of underlying label to spot price, covering every underlying
+        :param interest_rate: annual continuous interest rates
+        :param div_yield: continuous dividend yields
+        :param multiplier: contract multipliers
+
+        Scalars are broadcast to the book length. After changing any column
+        other than the spots, call rebuild() to refresh the cached invariants.
+        """
+        underlying = np.asarray(underlying)
+        size = underlying.shape[0]
+        self.underlyings, self._codes = np.unique(underlying, return_inverse=True)
+        self._codes = self._codes.reshape(size)
+        # line numbers of each underlying, for ticks that move a subset of spots
+        self._groups = np.split(np.argsort(self._codes, kind='stable'),
+                                np.cumsum(np.bincount(self._codes, minlength=len(self.underlyings)))[:-1])
+
+        self.underlying = underlying
+        self.sign = np.broadcast_to(bsm._call_put_sign(call_put), (size,)).copy()
+        for name, values in [('strike', strike),
+                             ('time_to_maturity', time_to_maturity),
+                             ('volatility', volatility),
+                             ('quantity', quantity),
+                             ('interest_rate', interest_rate),
+                             ('div_yield', div_yield),
+                             ('multiplier', multiplier)]:
+            setattr(self, name, np.array(np.broadcast_to(np.asarray(values, dtype=np.float64), (size,))))
+
+        self.spots = np.full(len(self.underlyings), np.nan)
+        # spots of underlyings without lines are ignored, a missing spot raises KeyError
+        self._set_spots(dict((label, spots[label]) for label in self.underlyings))
+        self.rebuild()
+
+    def __repr__(self):
+        return "OptionBook(size={}, underlyings={})".format(len(self), len(self.underlyings))
+
+    def __len__(self):
+        return self.strike.shape[0]
+
+    @classmethod
+    def from_records(cls, records, spots):
+        """
+        :param records: NumPy structured array (or DataFrame) with underlying, call_put, strike,
+                        time_to_maturity, volatility, quantity and optionally interest_rate,
+                        div_yield and multiplier fields
+        :param spots: dict of underlying label to spot price
+        :return: OptionBook
+        """
+        names = records.dtype.names if hasattr(records, 'dtype') and records.dtype.names else records.columns
+        columns = dict((name, np.asarray(records[name])) for name in names
+                       if name in ('underlying', 'call_put', 'strike', 'time_to_maturity', 'volatility', 'quantity',
+                                   'interest_rate', 'div_yield', 'multiplier'))
+        return cls(spots=spots, **columns)
+
+    def rebuild(self):
+        """
+        Recomputes the spot independent invariants and the book greeks
+        """
+        mat = self.time_to_maturity
+        self._sqrt_t = mat ** 0.5
+        self._vol_sqrt_t = self.volatility * self._sqrt_t
+        self._drift = (self.interest_rate - self.div_yield + self.volatility ** 2 / 2) * mat - np.log(self.strike)
+        self._disc_r = np.exp(-1 * self.interest_rate * mat)
+        self._disc_q = np.exp(-1 * self.div_yield * mat)
+
+        weight = self.quantity * self.multiplier
+        self._weight_q = weight * self._disc_q
+        self._weight_k = weight * self.strike * self._disc_r
+
+        self._greeks = np.zeros(len(self.underlyings), dtype=BOOK_GREEKS_DTYPE)
+        self._aggregate(slice(None), np.arange(len(self.underlyings)))
+
+    def update_spots(self, spots):
+        """
+        Moves spots and re-aggregates only the lines on the underlyings that moved
+        :param spots: dict of underlying label to spot price, or an array aligned with underlyings
+        :return: greeks per underlying, as by greeks()
+        """
+        moved = self._set_spots(spots)
+        if moved.size == len(self.underlyings):
+            # every line moves, so slicing avoids gathering the cached columns
+            self._aggregate(slice(None), moved)
+        elif moved.size:
+            self._aggregate(np.concatenate([self._groups[code] for code in moved]), moved)
+
+        return self.greeks()
+
+    def greeks(self):
+        """
+        :return: structured array of BOOK_GREEKS_DTYPE position greeks, one row per underlying
+        """
+        return self._greeks.copy()
+
+    def total(self):
+        """
+        :return: BOOK_GREEKS_DTYPE record of position greeks summed over the book
+        """
+        total = np.zeros((), dtype=BOOK_GREEKS_DTYPE)
+        for name in BOOK_GREEKS:
+            total[name] = self._greeks[name].sum()
+
+        return total[()]
+
+    def line_greeks(self):
+        """
+        :return: GREEKS_DTYPE structured array of per contract greeks for every line
+        """
+        stock_price = self.spots[self._codes]
+        d1 = (np.log(stock_price) + self._drift) / self._vol_sqrt_t
+
+        return bsm._greeks_kernel(self.sign, stock_price, self.strike, self.volatility, self.time_to_maturity,
+                                  self.interest_rate, self.div_yield, self._sqrt_t, self._vol_sqrt_t, d1,
+                                  self._disc_r, self._disc_q)
+
+    def to_frame(self):
+        """
+        :return: pandas DataFrame of greeks per underlying
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self._greeks, index=self.underlyings)
+
+    def _set_spots(self, spots):
+        """
+        :return: codes of the underlyings whose spot was set
+        """
+        if isinstance(spots, dict):
+            moved = np.searchsorted(self.underlyings, list(spots.keys()))
+            moved = np.clip(moved, 0, max(len(self.underlyings) - 1, 0))
+            unknown = [label for label, code in zip(spots.keys(), moved)
+                       if not len(self.underlyings) or self.underlyings[code] != label]
+            if unknown:
+                raise KeyError("Underlyings not in the book: {}".format(unknown))
+            self.spots[moved] = list(spots.values())
+            return moved
+
+        self.spots[:] = spots
+        return np.arange(len(self.underlyings))
+
+    def _aggregate(self, rows, codes):
+        """
+        Re-evaluates the position greeks of rows and replaces the totals of their underlyings
+        :param rows: line numbers (or a slice) covering every line of the underlyings in codes
+        :param codes: underlying codes whose totals are replaced
+        """
+        log_spot = np.log(self.spots)
+        spot = self.spots[self._codes[rows]]
+        sign = self.sign[rows]
+        vol_sqrt_t = self._vol_sqrt_t[rows]
+        weight_q = self._weight_q[rows]
+        weight_k = self._weight_k[rows]
+
+        d1 = (log_spot[self._codes[rows]] + self._drift[rows]) / vol_sqrt_t
+        pdf_d1 = norm_pdf(d1)
+        cdf_d1 = norm_cdf(sign * d1)
+        cdf_d2 = norm_cdf(sign * (d1 - vol_sqrt_t))
+
+        spot_pdf = spot * weight_q * pdf_d1
+        value_q = sign * spot * weight_q * cdf_d1
+        value_k = sign * weight_k * cdf_d2
+
+        lines = {'price': value_q - value_k,
+                 'delta': sign * weight_q * cdf_d1,
+                 'gamma': weight_q * pdf_d1 / (spot * vol_sqrt_t),
+                 'vega': spot_pdf * self._sqrt_t[rows],
+                 'theta': -1 * spot_pdf * self.volatility[rows] / (2 * self._sqrt_t[rows])
+                 - self.interest_rate[rows] * value_k + self.div_yield[rows] * value_q,
+                 'rho': value_k * self.time_to_maturity[rows]}
+
+        size = len(self.underlyings)
+        line_codes = self._codes[rows]
+        for name in BOOK_GREEKS:
+            self._greeks[name][codes] = np.bincount(line_codes, weights=lines[name], minlength=size)[codes]
@@ -12,10 +12,31 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from scipy.stats import norm
 import numpy as np
 import math
 
+from derpy.special import norm_cdf, norm_pdf
+
+# status codes returned by implied_vol_batch
+IV_CONVERGED = 0
+IV_MAX_ITERATION = 1
+IV_BELOW_INTRINSIC = 2
+IV_ABOVE_MAXIMUM = 3
+IV_INVALID_INPUT = 4
+
+# fields returned by greeks(), first order sensitivities then second order
+GREEKS_DTYPE = np.dtype([('price', np.float64),
+                         ('delta', np.float64),
+                         ('vega', np.float64),
+                         ('theta', np.float64),
+                         ('rho', np.float64),
+                         ('epsilon', np.float64),
+                         ('gamma', np.float64),
+                         ('vanna', np.float64),
+                         ('charm', np.float64),
+                         ('volga', np.float64),
+                         ('veta', np.float64)])
+
 
 def option_pricing(func, args):
     """
@@ -54,6 +75,7 @@ def euro_option(call_put,
     :param div_yield: continuous dividend yield
     :return: european call option price
     """
+    interest_rate = _curve_rate(interest_rate, time_to_maturity)
 
     d1 = (math.log(stock_price / strike)
           + (interest_rate - div_yield + (volatility ** 2) / 2)
@@ -61,11 +83,11 @@ def euro_option(call_put,
 
     d2 = d1 - volatility * (time_to_maturity ** 0.5)
 
-    call_price = stock_price * np.exp(-1 * div_yield * time_to_maturity) * norm.cdf(d1) \
-                 - strike * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(d2)
+    call_price = stock_price * math.exp(-1 * div_yield * time_to_maturity) * norm_cdf(d1) \
+                 - strike * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(d2)
 
-    put_price = strike * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(-1 * d2) \
-                - stock_price * np.exp(-1 * div_yield * time_to_maturity) * norm.cdf(-1 * d1)
+    put_price = strike * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(-1 * d2) \
+                - stock_price * math.exp(-1 * div_yield * time_to_maturity) * norm_cdf(-1 * d1)
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_price
@@ -75,6 +97,182 @@ def euro_option(call_put,
         return "Please specify option type"
 
 
+def _call_put_sign(call_put):
+    """
+    :param call_put: option type(s), either a single flag or an array of
+                     flags ('c', 'call', 'p', 'put', ...) or +1/-1 signs
+    :return: float array of +1 (call) / -1 (put) signs
+    """
+    flags = np.asarray(call_put)
+
+    if flags.dtype.kind in 'iuf':
+        sign = flags.astype(np.float64)
+        if not np.all(np.abs(sign) == 1):
+            raise ValueError("Numeric call_put flags must be +1 (call) or -1 (put)")
+        return sign
+
+    flags = np.char.lower(flags.astype(str))
+    is_call = np.isin(flags, ['c', 'call'])
+    is_put = np.isin(flags, ['p', 'put'])
+    if not np.all(is_call | is_put):
+        raise ValueError("Please specify option type")
+
+    return np.where(is_call, 1.0, -1.0)
+
+
+def _surface_vol(volatility, time_to_maturity, strike):
+    """
+    :param volatility: volatility number(s), or a surface with a vol(time_to_maturity, strike) method
+                       such as vol_surface.VolSurface
+    :return: volatility looked up on the surface, otherwise volatility unchanged
+    """
+    if hasattr(volatility, 'vol'):
+        return volatility.vol(time_to_maturity, strike)
+    return volatility
+
+
+def _curve_rate(interest_rate, time_to_maturity):
+    """
+    :param interest_rate: rate number(s), or a curve with a zero_rate(time_to_maturity) method
+                          such as yield_curve.YieldCurve
+    :return: continuously compounded zero rate to each maturity, otherwise interest_rate unchanged
+    """
+    if hasattr(interest_rate, 'zero_rate'):
+        return interest_rate.zero_rate(time_to_maturity)
+    return interest_rate
+
+
+def euro_option_batch(call_put,
+                      stock_price,
+                      strike,
+                      volatility,
+                      time_to_maturity,
+                      interest_rate,
+                      div_yield=0):
+    """
+    Vectorized counterpart of euro_option, pricing a whole book in one pass.
+    All inputs are broadcast against each other, so any of them may be a
+    scalar shared by every contract.
+
+    :param call_put: option type(s), flags ('c', 'put', ...) or +1/-1 signs
+    :param stock_price: spot price(s) of the underlying asset
+    :param strike: strike price(s)
+    :param volatility: annual volatility of the underlying asset, or a VolSurface
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate, or a YieldCurve
+    :param div_yield: continuous dividend yield
+    :return: ndarray of european option prices
+    """
+    sign = _call_put_sign(call_put)
+    stock_price = np.asarray(stock_price, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    volatility = np.asarray(_surface_vol(volatility, time_to_maturity, strike), dtype=np.float64)
+    time_to_maturity = np.asarray(time_to_maturity, dtype=np.float64)
+    interest_rate = np.asarray(_curve_rate(interest_rate, time_to_maturity), dtype=np.float64)
+    div_yield = np.asarray(div_yield, dtype=np.float64)
+
+    sqrt_t = time_to_maturity ** 0.5
+    d1 = (np.log(stock_price / strike)
+          + (interest_rate - div_yield + (volatility ** 2) / 2)
+          * time_to_maturity) / (volatility * sqrt_t)
+
+    d2 = d1 - volatility * sqrt_t
+
+    # price = sign * (S e^-qT N(sign d1) - K e^-rT N(sign d2)), the call and put legs of
+    # euro_option; arrays take the ndtr kernel rather than math.erfc, so the two agree to a few
+    # ulp of the spot / strike scale rather than bit for bit (see derpy.special)
+    price = stock_price * np.exp(-1 * div_yield * time_to_maturity) * norm_cdf(sign * d1) \
+        - strike * np.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(sign * d2)
+
+    return sign * price
+
+
+def greeks(call_put,
+           stock_price,
+           strike,
+           volatility,
+           time_to_maturity,
+           interest_rate,
+           div_yield=0):
+    """
+    Price and all first and second order greeks from one shared set of
+    intermediates (d1, d2, densities and discount factors), instead of
+    recomputing them in each of delta, gamma, vega, theta and rho.
+    Inputs may be scalars or broadcastable arrays, as in euro_option_batch.
+
+    Unlike the single greek functions, the dividend yield is carried through
+    every formula. With div_yield=0 the results agree with delta, gamma, vega,
+    theta and rho. Theta and charm are per year of calendar time.
+
+    :param call_put: option type(s), flags ('c', 'put', ...) or +1/-1 signs
+    :param stock_price: spot price of the underlying asset
+    :param strike: strike price
+    :param volatility: annual volatility of the underlying asset, or a VolSurface
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate, or a YieldCurve
+    :param div_yield: continuous dividend yield
+    :return: structured array of GREEKS_DTYPE (a single record for scalar inputs)
+    """
+    sign = _call_put_sign(call_put)
+    stock_price = np.asarray(stock_price, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    volatility = np.asarray(_surface_vol(volatility, time_to_maturity, strike), dtype=np.float64)
+    time_to_maturity = np.asarray(time_to_maturity, dtype=np.float64)
+    interest_rate = np.asarray(_curve_rate(interest_rate, time_to_maturity), dtype=np.float64)
+    div_yield = np.asarray(div_yield, dtype=np.float64)
+
+    sqrt_t = time_to_maturity ** 0.5
+    vol_sqrt_t = volatility * sqrt_t
+    d1 = (np.log(stock_price / strike)
+          + (interest_rate - div_yield + (volatility ** 2) / 2)
+          * time_to_maturity) / vol_sqrt_t
+
+    out = _greeks_kernel(sign, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield,
+                         sqrt_t, vol_sqrt_t, d1,
+                         np.exp(-1 * interest_rate * time_to_maturity),
+                         np.exp(-1 * div_yield * time_to_maturity))
+
+    return out[()] if out.ndim == 0 else out
+
+
+def _greeks_kernel(sign, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield,
+                   sqrt_t, vol_sqrt_t, d1, disc_r, disc_q):
+    """
+    Shared greeks evaluation once d1 and the discount factors are known.
+    :return: structured array of GREEKS_DTYPE
+    """
+    d2 = d1 - vol_sqrt_t
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1 = norm_cdf(sign * d1)
+    cdf_d2 = norm_cdf(sign * d2)
+
+    spot_q = stock_price * disc_q
+    strike_r = strike * disc_r
+    spot_pdf = spot_q * pdf_d1
+
+    out = np.empty(np.broadcast(sign, d1, spot_q, strike_r).shape, dtype=GREEKS_DTYPE)
+
+    out['price'] = sign * (spot_q * cdf_d1 - strike_r * cdf_d2)
+    out['delta'] = sign * disc_q * cdf_d1
+    out['vega'] = spot_pdf * sqrt_t
+    out['theta'] = -1 * spot_pdf * volatility / (2 * sqrt_t) \
+        - sign * interest_rate * strike_r * cdf_d2 \
+        + sign * div_yield * spot_q * cdf_d1
+    out['rho'] = sign * strike_r * time_to_maturity * cdf_d2
+    out['epsilon'] = -1 * sign * spot_q * time_to_maturity * cdf_d1
+
+    out['gamma'] = disc_q * pdf_d1 / (stock_price * vol_sqrt_t)
+    out['vanna'] = -1 * disc_q * pdf_d1 * d2 / volatility
+    out['charm'] = sign * div_yield * disc_q * cdf_d1 \
+        - disc_q * pdf_d1 * (2 * (interest_rate - div_yield) * time_to_maturity - d2 * vol_sqrt_t) \
+        / (2 * time_to_maturity * vol_sqrt_t)
+    out['volga'] = spot_pdf * sqrt_t * d1 * d2 / volatility
+    out['veta'] = spot_pdf * sqrt_t * (div_yield + (interest_rate - div_yield) * d1 / vol_sqrt_t
+                                       - (1 + d1 * d2) / (2 * time_to_maturity))
+
+    return out
+
+
 def delta(call_put,
           stock_price,
           strike,
@@ -86,9 +284,9 @@ def delta(call_put,
           + (interest_rate - div_yield + (volatility ** 2) / 2)
           * time_to_maturity) / (volatility * (time_to_maturity ** 0.5))
 
-    call_delta = norm.cdf(d1)
+    call_delta = norm_cdf(d1)
 
-    put_delta = norm.cdf(d1) - 1
+    put_delta = norm_cdf(d1) - 1
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_delta
@@ -109,9 +307,9 @@ def gamma(call_put,
           + (interest_rate - div_yield + (volatility ** 2) / 2)
           * time_to_maturity) / (volatility * (time_to_maturity ** 0.5))
 
-    call_gamma = norm.pdf(d1) / (stock_price * volatility * (time_to_maturity ** (1 / 2)))
+    call_gamma = norm_pdf(d1) / (stock_price * volatility * (time_to_maturity ** (1 / 2)))
 
-    put_gamma = norm.pdf(d1) / (stock_price * volatility * (time_to_maturity ** (1 / 2)))
+    put_gamma = norm_pdf(d1) / (stock_price * volatility * (time_to_maturity ** (1 / 2)))
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_gamma
@@ -132,9 +330,9 @@ def vega(call_put,
           + (interest_rate - div_yield + (volatility ** 2) / 2)
           * time_to_maturity) / (volatility * (time_to_maturity ** 0.5))
 
-    call_vega = stock_price * norm.pdf(d1) * (time_to_maturity ** 0.5)
+    call_vega = stock_price * norm_pdf(d1) * (time_to_maturity ** 0.5)
 
-    put_vega = stock_price * norm.pdf(d1) * (time_to_maturity ** 0.5)
+    put_vega = stock_price * norm_pdf(d1) * (time_to_maturity ** 0.5)
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_vega
@@ -157,13 +355,13 @@ def theta(call_put,
 
     d2 = d1 - volatility * (time_to_maturity ** 0.5)
 
-    call_theta = -1 * stock_price * norm.pdf(d1) \
+    call_theta = -1 * stock_price * norm_pdf(d1) \
                  * volatility / (2 * (time_to_maturity ** 0.5)) - interest_rate * strike \
-                 * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(d2)
+                 * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(d2)
 
-    put_theta = -1 * stock_price * norm.pdf(d1) \
+    put_theta = -1 * stock_price * norm_pdf(d1) \
                 * volatility / (2 * (time_to_maturity ** 0.5)) + interest_rate * strike \
-                * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(-1 * d2)
+                * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(-1 * d2)
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_theta
@@ -187,10 +385,10 @@ def rho(call_put,
     d2 = d1 - volatility * (time_to_maturity ** 0.5)
 
     call_rho = strike * time_to_maturity \
-               * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(d2)
+               * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(d2)
 
     put_rho = -1 * strike * time_to_maturity \
-              * np.exp(-1 * interest_rate * time_to_maturity) * norm.cdf(-1 * d2)
+              * math.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(-1 * d2)
 
     if call_put in ['c', 'C', 'call', 'Call', 'CALL']:
         return call_rho
@@ -207,31 +405,152 @@ def implied_vol(call_put,
                 time_to_maturity,
                 interest_rate,
                 div_yield=0):
-    max_iteration = 100
-    precision = 0.00001
-    sigma = 0.25  # initial guess
-
-    for i in xrange(0, max_iteration):
-        guess_price = euro_option(call_put,
-                                  stock_price,
-                                  strike,
-                                  sigma,
-                                  time_to_maturity,
-                                  interest_rate,
-                                  div_yield)
-
-        guess_vega = vega(call_put,
-                          stock_price,
-                          strike,
-                          sigma,
-                          time_to_maturity,
-                          interest_rate,
-                          div_yield)
-
-        diff = target_option_value - guess_price
-
-        if abs(diff) < precision:
-            return sigma
-        sigma = sigma + diff / guess_vega
-
-    return "Max iteration reached: cannot converge"
+    """
+    :param call_put: the type of European options
+    :param target_option_value: observed option price
+    :param stock_price: spot price of the underlying asset
+    :param strike: strike price
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate
+    :param div_yield: continuous dividend yield
+    :return: implied volatility, NaN if it cannot be solved
+             (see implied_vol_batch for the reason codes)
+    """
+    vol, _ = implied_vol_batch(call_put,
+                               target_option_value,
+                               stock_price,
+                               strike,
+                               time_to_maturity,
+                               interest_rate,
+                               div_yield)
+    return float(vol)
+
+
+def implied_vol_batch(call_put,
+                      target_option_value,
+                      stock_price,
+                      strike,
+                      time_to_maturity,
+                      interest_rate,
+                      div_yield=0,
+                      precision=1e-10,
+                      max_iteration=100,
+                      max_vol=10.0):
+    """
+    Solves implied volatilities for a whole option chain at once.
+
+    Every row starts from the Corrado-Miller approximation and takes
+    safeguarded Halley steps inside a [0, max_vol] bracket that tightens on
+    each iteration; a step that leaves the bracket (or has no usable vega)
+    falls back to bisection. Rows drop out of the working set as soon as they
+    converge, so the remaining iterations only touch unresolved quotes. Rows
+    that stall short of precision stop early and report IV_MAX_ITERATION.
+
+    :param call_put: option type(s), flags ('c', 'put', ...) or +1/-1 signs
+    :param target_option_value: observed option price(s)
+    :param stock_price: spot price of the underlying asset
+    :param strike: strike price
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate
+    :param div_yield: continuous dividend yield
+    :param precision: absolute price tolerance
+    :param max_iteration: iteration cap per row
+    :param max_vol: upper end of the search bracket
+    :return: (vol, status) arrays; vol is NaN wherever status != IV_CONVERGED
+    """
+    sign = _call_put_sign(call_put)
+    arrays = np.broadcast_arrays(sign,
+                                 np.asarray(target_option_value, dtype=np.float64),
+                                 np.asarray(stock_price, dtype=np.float64),
+                                 np.asarray(strike, dtype=np.float64),
+                                 np.asarray(time_to_maturity, dtype=np.float64),
+                                 np.asarray(_curve_rate(interest_rate, time_to_maturity), dtype=np.float64),
+                                 np.asarray(div_yield, dtype=np.float64))
+    shape = arrays[0].shape
+    sign, target, spot, strike, mat, rate, div = [a.ravel() for a in arrays]
+
+    vol = np.full(sign.shape, np.nan)
+    status = np.full(sign.shape, IV_MAX_ITERATION, dtype=np.int8)
+
+    with np.errstate(all='ignore'):
+        spot_q = spot * np.exp(-1 * div * mat)
+        strike_r = strike * np.exp(-1 * rate * mat)
+        lower = np.maximum(sign * (spot_q - strike_r), 0)
+        upper = np.where(sign > 0, spot_q, strike_r)
+
+        valid = np.isfinite(target) & np.isfinite(spot_q) & np.isfinite(strike_r) \
+            & (spot > 0) & (strike > 0) & (mat > 0)
+        status[~valid] = IV_INVALID_INPUT
+        below = valid & (target <= lower)
+        status[below] = IV_BELOW_INTRINSIC
+        above = valid & ~below & (target >= upper)
+        status[above] = IV_ABOVE_MAXIMUM
+
+        idx = np.flatnonzero(valid & ~below & ~above)
+        if idx.size:
+            price_hi = _price_vega_volga(sign[idx], spot[idx], strike[idx], max_vol, mat[idx], rate[idx],
+                                         div[idx])[0]
+            out_of_range = price_hi < target[idx]
+            status[idx[out_of_range]] = IV_ABOVE_MAXIMUM
+            idx = idx[~out_of_range]
+
+        # Corrado-Miller initial guess on the equivalent call price
+        call_px = np.where(sign[idx] > 0, target[idx], target[idx] + spot_q[idx] - strike_r[idx])
+        moneyness = spot_q[idx] - strike_r[idx]
+        half_gap = call_px - moneyness / 2
+        root = np.sqrt(np.maximum(half_gap ** 2 - moneyness ** 2 / np.pi, 0))
+        sigma = (2 * np.pi / mat[idx]) ** 0.5 / (spot_q[idx] + strike_r[idx]) * (half_gap + root)
+        sigma = np.clip(np.where(np.isfinite(sigma), sigma, 0.25), 1e-3, max_vol / 2)
+
+        lo = np.zeros(idx.size)
+        hi = np.full(idx.size, float(max_vol))
+
+        for _ in range(max_iteration):
+            if not idx.size:
+                break
+
+            price, vega_, volga_ = _price_vega_volga(sign[idx], spot[idx], strike[idx], sigma, mat[idx],
+                                                     rate[idx], div[idx])
+            diff = price - target[idx]
+
+            done = np.abs(diff) < precision
+            vol[idx[done]] = sigma[done]
+            status[idx[done]] = IV_CONVERGED
+
+            # price is increasing in vol, so the sign of diff tightens the bracket
+            hi = np.where(diff > 0, sigma, hi)
+            lo = np.where(diff < 0, sigma, lo)
+
+            # Halley step, falling back to bisection when it leaves the bracket
+            step = 2 * diff * vega_ / (2 * vega_ ** 2 - diff * volga_)
+            new_sigma = sigma - step
+            bisect = ~np.isfinite(new_sigma) | (new_sigma <= lo) | (new_sigma >= hi)
+            new_sigma = np.where(bisect, (lo + hi) / 2, new_sigma)
+
+            # a row whose step no longer moves sigma cannot reach precision, it keeps IV_MAX_ITERATION
+            stalled = ~done & (np.abs(new_sigma - sigma) <= 1e-15 * np.maximum(sigma, 1))
+
+            keep = ~(done | stalled)
+            idx, sigma, lo, hi = idx[keep], new_sigma[keep], lo[keep], hi[keep]
+
+    return vol.reshape(shape), status.reshape(shape)
+
+
+def _price_vega_volga(sign, stock_price, strike, volatility, time_to_maturity, interest_rate, div_yield):
+    """
+    Price, vega and volga sharing the same d1/d2, for the implied vol solver.
+    """
+    sqrt_t = time_to_maturity ** 0.5
+    vol_sqrt_t = volatility * sqrt_t
+    d1 = (np.log(stock_price / strike)
+          + (interest_rate - div_yield + (volatility ** 2) / 2)
+          * time_to_maturity) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+
+    spot_q = stock_price * np.exp(-1 * div_yield * time_to_maturity)
+    price = sign * (spot_q * norm_cdf(sign * d1)
+                    - strike * np.exp(-1 * interest_rate * time_to_maturity) * norm_cdf(sign * d2))
+    vega_ = spot_q * norm_pdf(d1) * sqrt_t
+    volga_ = vega_ * d1 * d2 / volatility
+
+    return price, vega_, volga_
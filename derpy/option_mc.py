@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Monte Carlo option pricing
+# Notes:
+#       GBM paths are simulated in batches of at most
+#       BATCH_CELLS path points, so memory stays flat however
+#       many paths are requested; only running moments are kept
+#       between batches. Payoffs are plain functions of a
+#       (paths x monitoring dates) price array whose first column
+#       is the spot, so path dependent payoffs (Asian, barrier,
+#       lookback) work with the same engine. Antithetic variates
+#       and a European option control variate, priced in closed
+#       form by option_bsm.euro_option, reduce the variance.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+import numpy as np
+
+from derpy import option_bsm as bsm
+
+# path points (paths x monitoring dates) simulated per batch
+BATCH_CELLS = 2 ** 20
+
+BARRIER_TYPES = ('down-and-out', 'down-and-in', 'up-and-out', 'up-and-in')
+
+
+def gbm_path_batches(stock_price, volatility, time_to_maturity, interest_rate, div_yield=0, n_paths=10000,
+                     n_steps=1, batch_size=None, antithetic=False, seed=None):
+    """
+    Risk neutral geometric Brownian motion paths, in batches
+    :param stock_price: spot price of the underlying asset
+    :param volatility: annual volatility of the underlying asset
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate
+    :param div_yield: continuous dividend yield
+    :param n_paths: total number of paths
+    :param n_steps: equally spaced monitoring dates after the spot date
+    :param batch_size: paths per batch, defaults to BATCH_CELLS // (n_steps + 1)
+    :param antithetic: pair every normal draw with its negative; the paths of a
+                       batch are the draws followed by their antithetic mirrors
+    :param seed: seed or numpy Generator; batches are drawn in order from one
+                 stream, so the paths do not depend on batch_size
+    :return: generator of (paths, n_steps + 1) price arrays, the first column the spot
+    """
+    rng = np.random.default_rng(seed)
+    dt = time_to_maturity / n_steps
+    drift = (interest_rate - div_yield - volatility ** 2 / 2) * dt
+    diffusion = volatility * math.sqrt(dt)
+    if batch_size is None:
+        batch_size = max(2, BATCH_CELLS // (n_steps + 1) // 2 * 2)
+    if antithetic and (n_paths % 2 or batch_size % 2):
+        raise ValueError("Antithetic paths need even n_paths and batch_size")
+
+    remaining = n_paths
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        draws = size // 2 if antithetic else size
+        log_paths = np.empty((size, n_steps + 1))
+        log_paths[:, 0] = 0
+        log_paths[:draws, 1:] = rng.standard_normal((draws, n_steps))
+        if antithetic:
+            np.negative(log_paths[:draws, 1:], out=log_paths[draws:, 1:])
+
+        increments = log_paths[:, 1:]
+        increments *= diffusion
+        increments += drift
+        np.cumsum(increments, axis=1, out=increments)
+        np.exp(log_paths, out=log_paths)
+        log_paths *= stock_price
+
+        remaining -= size
+        yield log_paths
+
+
+def mc_price(payoff, stock_price, volatility, time_to_maturity, interest_rate, div_yield=0, n_paths=100000,
+             n_steps=1, batch_size=None, antithetic=False, control_variate=False, control_strike=None, seed=None):
+    """
+    Monte Carlo price of a payoff paid at maturity
+    :param payoff: function of a (paths, n_steps + 1) price array returning one payoff per path,
+                   e.g. from european_payoff, asian_payoff, barrier_payoff or lookback_payoff
+    :param stock_price: spot price of the underlying asset
+    :param volatility: annual volatility of the underlying asset
+    :param time_to_maturity: time to maturity expressed in years
+    :param interest_rate: annual continuous interest rate
+    :param div_yield: continuous dividend yield
+    :param n_paths: total number of paths
+    :param n_steps: equally spaced monitoring dates after the spot date
+    :param batch_size: paths per batch, defaults to BATCH_CELLS // (n_steps + 1)
+    :param antithetic: use antithetic variates, each pair counting as one sample
+    :param control_variate: use a European call on the terminal price as control,
+                            with its expectation from option_bsm.euro_option
+    :param control_strike: strike of the control call, defaults to the spot
+    :param seed: seed or numpy Generator, for reproducible prices
+    :return: (price, standard error)
+    """
+    discount = math.exp(-1 * interest_rate * time_to_maturity)
+    if control_variate:
+        control_strike = stock_price if control_strike is None else control_strike
+        control_mean = bsm.euro_option('c', stock_price, control_strike, volatility, time_to_maturity,
+                                       interest_rate, div_yield)
+
+    moments = None
+    for paths in gbm_path_batches(stock_price, volatility, time_to_maturity, interest_rate, div_yield, n_paths,
+                                  n_steps, batch_size, antithetic, seed):
+        samples = [discount * np.asarray(payoff(paths), dtype=np.float64)]
+        if control_variate:
+            samples.append(discount * np.maximum(paths[:, -1] - control_strike, 0))
+        if antithetic:
+            # a path and its mirror are one sample
+            half = paths.shape[0] // 2
+            samples = [(sample[:half] + sample[half:]) / 2 for sample in samples]
+        moments = _merge_moments(moments, np.vstack(samples))
+
+    count, mean, comoment = moments
+    if not control_variate:
+        return float(mean[0]), math.sqrt(comoment[0, 0] / (count - 1) / count)
+
+    # optimal control coefficient, with the variance of the controlled estimator
+    beta = comoment[0, 1] / comoment[1, 1] if comoment[1, 1] > 0 else 0.
+    price = mean[0] - beta * (mean[1] - control_mean)
+    variance = (comoment[0, 0] - beta * comoment[0, 1]) / (count - 1)
+    return float(price), math.sqrt(max(variance, 0) / count)
+
+
+def european_payoff(call_put, strike):
+    """
+    :return: payoff function of the final price
+    """
+    sign = float(bsm._call_put_sign(call_put))
+
+    def payoff(paths):
+        return np.maximum(sign * (paths[:, -1] - strike), 0)
+
+    return payoff
+
+
+def asian_payoff(call_put, strike, average='arithmetic'):
+    """
+    Fixed strike Asian option on the average over the monitoring dates after the spot date
+    :param average: 'arithmetic' or 'geometric'
+    :return: payoff function
+    """
+    sign = float(bsm._call_put_sign(call_put))
+    if average not in ('arithmetic', 'geometric'):
+        raise ValueError("Average: {} not supported".format(average))
+
+    def payoff(paths):
+        if average == 'arithmetic':
+            mean = paths[:, 1:].mean(axis=1)
+        else:
+            mean = np.exp(np.log(paths[:, 1:]).mean(axis=1))
+        return np.maximum(sign * (mean - strike), 0)
+
+    return payoff
+
+
+def barrier_payoff(call_put, strike, barrier, barrier_type='down-and-out', rebate=0):
+    """
+    Barrier option monitored on the spot date and every monitoring date
+    :param barrier_type: one of BARRIER_TYPES
+    :param rebate: amount paid at maturity when the option is knocked out (or never knocked in)
+    :return: payoff function
+    """
+    sign = float(bsm._call_put_sign(call_put))
+    if barrier_type not in BARRIER_TYPES:
+        raise ValueError("Barrier type: {} not supported".format(barrier_type))
+
+    def payoff(paths):
+        if barrier_type.startswith('down'):
+            hit = paths.min(axis=1) <= barrier
+        else:
+            hit = paths.max(axis=1) >= barrier
+        alive = ~hit if barrier_type.endswith('out') else hit
+        return np.where(alive, np.maximum(sign * (paths[:, -1] - strike), 0), rebate)
+
+    return payoff
+
+
+def lookback_payoff(call_put, strike=None):
+    """
+    Lookback option on the extremes over the spot and monitoring dates
+    :param strike: fixed strike, None for a floating strike lookback
+    :return: payoff function
+    """
+    sign = float(bsm._call_put_sign(call_put))
+
+    def payoff(paths):
+        if strike is None:
+            # call pays S_T - min(S), put pays max(S) - S_T
+            extreme = paths.min(axis=1) if sign > 0 else paths.max(axis=1)
+            return sign * (paths[:, -1] - extreme)
+        extreme = paths.max(axis=1) if sign > 0 else paths.min(axis=1)
+        return np.maximum(sign * (extreme - strike), 0)
+
+    return payoff
+
+
+def _merge_moments(moments, samples):
+    """
+    Combines running (count, mean, co-moment matrix) with a batch of samples,
+    one variable per row, using the pairwise update of Chan et al.
+    """
+    count = samples.shape[1]
+    mean = samples.mean(axis=1)
+    centred = samples - mean[:, None]
+    comoment = np.dot(centred, centred.T)
+    if moments is None:
+        return count, mean, comoment
+
+    total_count, total_mean, total_comoment = moments
+    delta = mean - total_mean
+    new_count = total_count + count
+    new_mean = total_mean + delta * count / new_count
+    new_comoment = total_comoment + comoment + np.outer(delta, delta) * total_count * count / new_count
+    return new_count, new_mean, new_comoment
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Finite difference (Crank-Nicolson) option pricing
+# Notes:
+#       Black-Scholes PDE in x = log(S) on a uniform grid with
+#       the spot on a node, stepped back from maturity with
+#       Crank-Nicolson. The tridiagonal system has constant
+#       coefficients, so it is LU factorized once (LAPACK
+#       gttrf) and every time step is a single O(M) gttrs solve.
+#       Rannacher start-up (implicit half steps) damps the
+#       payoff kink. American steps solve the linear
+#       complementarity problem exactly with the Brennan-Schwartz
+#       projected elimination, which for a single exercise
+#       boundary reduces to two banded solves: one to eliminate
+#       towards the exercise side, one to substitute back from
+#       the boundary. A strip of strikes on one
+#       underlying shares the grid and the factorization, one
+#       right hand side column per strike. Delta, gamma and
+#       theta are read off the final grid.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from derpy.option_bsm import _call_put_sign
+from derpy.option_binomial import _exercise_flag
+
+PDE_GREEKS_DTYPE = np.dtype([('price', np.float64),
+                             ('delta', np.float64),
+                             ('gamma', np.float64),
+                             ('theta', np.float64)])
+
+# (scipy.linalg.lapack, scipy.linalg.solve_banded), imported by the first pricing call
+_linalg = None
+
+
+def pde_option(flag,
+               call_put,
+               stock_price,
+               strike,
+               volatility,
+               time_to_maturity,
+               interest_rate,
+               div_yield=0,
+               n_space=800,
+               n_time=None,
+               n_std=4.0,
+               rannacher_steps=2,
+               greeks=False):
+    """
+    :param flag: 'american' or 'european'
+    :param call_put: option type, or one per strike, flags ('c', 'put', ...) or +1/-1 signs
+    :param stock_price: the current price of underlying security
+    :param strike: strike price, or 1-D array of strikes priced together on one grid
+    :param volatility: annual volatility of the underlying security
+    :param time_to_maturity: time to expiration of the option
+    :param interest_rate: risk-free interest rate
+    :param div_yield: continuous dividend yield
+    :param n_space: number of log price intervals, rounded up to even so the spot is a node
+    :param n_time: number of time steps, defaults to n_space // 4
+    :param n_std: grid half width beyond the strikes, in standard deviations of log(S_T)
+    :param rannacher_steps: leading time steps taken as two implicit half steps each
+    :param greeks: also return delta, gamma and theta (per year of calendar time) off the grid
+    :return: price(s), or PDE_GREEKS_DTYPE record(s) when greeks is True
+    """
+    lapack = _scipy_linalg()[0]
+
+    american = bool(_exercise_flag(flag))
+    strike = np.asarray(strike, dtype=np.float64)
+    strikes = np.atleast_1d(strike)
+    sign = np.broadcast_to(_call_put_sign(call_put), strikes.shape).astype(np.float64)
+    n_space += n_space % 2
+    n_time = max(1, n_space // 4 if n_time is None else n_time)
+    rannacher_steps = min(rannacher_steps, n_time)
+
+    # uniform log price grid with the spot on the middle node
+    log_spot = np.log(stock_price)
+    half_width = np.max(np.abs(np.log(strikes) - log_spot)) + n_std * volatility * time_to_maturity ** 0.5
+    dx = 2 * half_width / n_space
+    log_moneyness = abs(np.log(strikes[0]) - log_spot)
+    if strikes.size == 1 and log_moneyness > dx:
+        # shrink dx slightly so a single strike falls on a node, where the payoff kink is
+        dx = log_moneyness / np.ceil(log_moneyness / dx)
+    spot_node = n_space // 2
+    prices = np.exp(log_spot + dx * (np.arange(n_space + 1) - spot_node))
+
+    payoff = np.maximum(sign * (prices[:, None] - strikes), 0)
+    values = payoff.copy()
+
+    # L V_j = lower V_j-1 + diag V_j + upper V_j+1
+    drift = interest_rate - div_yield - volatility ** 2 / 2
+    lower = volatility ** 2 / (2 * dx ** 2) - drift / (2 * dx)
+    diag = -1 * volatility ** 2 / dx ** 2 - interest_rate
+    upper = volatility ** 2 / (2 * dx ** 2) + drift / (2 * dx)
+
+    # Crank-Nicolson and the Rannacher implicit half steps share the matrix I - dt/2 L
+    dt = time_to_maturity / n_time
+    half_dt = dt / 2
+    interior = n_space - 1
+    factors = lapack.dgttrf(np.full(interior - 1, -half_dt * lower),
+                            np.full(interior, 1 - half_dt * diag),
+                            np.full(interior - 1, -half_dt * upper))
+    if factors[-1]:
+        raise RuntimeError("Tridiagonal factorization failed, LAPACK info {}".format(factors[-1]))
+    if american:
+        # puts exercise at the low end of the grid, calls at the high end, so
+        # call columns are eliminated on the node reversed grid
+        eliminations = {-1.: _elimination(-half_dt * lower, 1 - half_dt * diag, -half_dt * upper, interior),
+                        1.: _elimination(-half_dt * upper, 1 - half_dt * diag, -half_dt * lower, interior)}
+
+    steps = [(half_dt, 0.)] * (2 * rannacher_steps) + [(half_dt, half_dt)] * (n_time - rannacher_steps)
+    tau = 0.
+    for implicit_dt, explicit_dt in steps:
+        previous = values
+        tau += implicit_dt + explicit_dt
+        rhs = values[1:-1].copy()
+        if explicit_dt:
+            rhs += explicit_dt * (lower * values[:-2] + diag * values[1:-1] + upper * values[2:])
+
+        new_values = np.empty_like(values)
+        new_values[0], new_values[-1] = _boundaries(american, sign, prices[[0, -1]], strikes, tau,
+                                                    interest_rate, div_yield)
+        rhs[0] += implicit_dt * lower * new_values[0]
+        rhs[-1] += implicit_dt * upper * new_values[-1]
+        if american:
+            for side, elimination in eliminations.items():
+                columns = np.flatnonzero(sign == side)
+                if not columns.size:
+                    continue
+                nodes = slice(None) if side < 0 else slice(None, None, -1)
+                new_values[1:-1, columns] = _projected_solve(elimination, rhs[nodes, columns],
+                                                             payoff[1:-1][nodes, columns])[nodes]
+        else:
+            new_values[1:-1] = _solve(factors, rhs)
+        values = new_values
+
+    price = values[spot_node]
+    if not greeks:
+        return price.reshape(strike.shape)[()]
+
+    # first and second derivatives in x at the spot node, mapped to S
+    d_x = (values[spot_node + 1] - values[spot_node - 1]) / (2 * dx)
+    d2_x = (values[spot_node + 1] - 2 * price + values[spot_node - 1]) / dx ** 2
+    out = np.empty(strikes.shape, dtype=PDE_GREEKS_DTYPE)
+    out['price'] = price
+    out['delta'] = d_x / stock_price
+    out['gamma'] = (d2_x - d_x) / stock_price ** 2
+    # previous is the grid one step of calendar time later
+    out['theta'] = (previous[spot_node] - price) / sum(steps[-1])
+    return out.reshape(strike.shape)[()]
+
+
+def _scipy_linalg():
+    """
+    :return: (lapack, solve_banded) from scipy.linalg, resolved once so the per step solves skip the import
+    """
+    global _linalg
+    if _linalg is None:
+        from scipy.linalg import lapack, solve_banded
+        _linalg = lapack, solve_banded
+    return _linalg
+
+
+def _solve(factors, rhs):
+    """
+    :return: solution of the factorized tridiagonal system for every right hand side column
+    """
+    dl, d, du, du2, ipiv, info = factors
+    solution, info = _scipy_linalg()[0].dgttrs(dl, d, du, du2, ipiv, rhs)
+    if info:
+        raise RuntimeError("Tridiagonal solve failed, LAPACK info {}".format(info))
+    return solution
+
+
+def _elimination(lower, diag, upper, size):
+    """
+    Eliminates the upper diagonal of a constant tridiagonal matrix from the last row up
+    :return: (lower, reduced diagonal, banded matrix of the right hand side elimination)
+    """
+    reduced = np.empty(size)
+    reduced[-1] = diag
+    for i in range(size - 2, -1, -1):
+        reduced[i] = diag - upper * lower / reduced[i + 1]
+
+    # d'_i = d_i - upper / reduced_i+1 * d'_i+1, an upper bidiagonal solve
+    banded = np.ones((2, size))
+    banded[0, 1:] = upper / reduced[1:]
+    return lower, reduced, banded
+
+
+def _projected_solve(elimination, rhs, payoff):
+    """
+    Brennan-Schwartz solve of min(A V - rhs, V - payoff) = 0, exercise at the low node end
+    :return: option values on the interior nodes, one column per right hand side
+    """
+    solve_banded = _scipy_linalg()[1]
+
+    lower, reduced, banded = elimination
+    rhs = solve_banded((0, 1), banded, rhs)
+
+    # with every lower node exercised, the first node whose continuation value
+    # beats its payoff starts the continuation region
+    continuation = rhs.copy()
+    continuation[1:] -= lower * payoff[:-1]
+    continuation /= reduced[:, None]
+    beats = continuation > payoff
+
+    values = payoff.copy()
+    for column in range(rhs.shape[1]):
+        if not beats[:, column].any():
+            continue
+        start = np.argmax(beats[:, column])
+        rows = rhs[start:, column].copy()
+        if start:
+            rows[0] -= lower * payoff[start - 1, column]
+        # back substitution V_i = (d'_i - lower V_i-1) / reduced_i as a lower bidiagonal solve
+        substitution = np.zeros((2, rows.size))
+        substitution[0] = reduced[start:]
+        substitution[1, :-1] = lower
+        values[start:, column] = solve_banded((1, 0), substitution, rows)
+
+    return values
+
+
+def _boundaries(american, sign, edge_prices, strikes, tau, interest_rate, div_yield):
+    """
+    :return: option values on the lowest and highest grid nodes at time to maturity tau
+    """
+    forward = sign * (edge_prices[:, None] * np.exp(-1 * div_yield * tau) - strikes * np.exp(-1 * interest_rate * tau))
+    value = np.maximum(forward, 0)
+    if american:
+        value = np.maximum(value, sign * (edge_prices[:, None] - strikes))
+    return value[0], value[1]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Chunked execution helpers for the batch pricers
+# Notes:
+#       Batch kernels are written against contiguous slices
+#       of a book so peak memory can be capped by chunk size.
+#       NumPy releases the GIL inside its array loops, so the
+#       chunks can also be spread across a thread pool. Work
+#       that holds the GIL (Python level iteration, small
+#       arrays) is sharded across a process pool instead, with
+#       the book columns shipped once through shared memory
+#       rather than pickled per task. The executors and shared
+#       memory are only imported once a pool is needed.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+import numpy as np
+
+# tasks per worker process when process_map is not given a chunk_size,
+# enough to even out uneven chunks without much dispatch overhead
+TASKS_PER_WORKER = 4
+
+
+def chunk_slices(size, chunk_size=None):
+    """
+    :param size: number of rows in the book
+    :param chunk_size: rows per chunk, None for a single chunk
+    :return: list of slice objects covering range(size) in order
+    """
+    if chunk_size is None or chunk_size >= size:
+        return [slice(0, size)]
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    return [slice(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+def map_chunks(func, size, chunk_size=None, n_threads=1):
+    """
+    :param func: callable taking a slice of the book and returning its result
+    :param size: number of rows in the book
+    :param chunk_size: rows per chunk, None for a single chunk
+    :param n_threads: number of worker threads, 1 runs inline
+    :return: list of chunk results, in book order
+    """
+    slices = chunk_slices(size, chunk_size)
+
+    if n_threads is None or n_threads <= 1 or len(slices) == 1:
+        return [func(chunk) for chunk in slices]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        return list(pool.map(func, slices))
+
+
+def process_map(func, arrays, chunk_size=None, n_workers=None, **kwargs):
+    """
+    Shards the rows of a book across a process pool
+    :param func: module level function called as func(*row_slices, **kwargs), returning an
+                 array, or a tuple of arrays, with one leading entry per row
+    :param arrays: equal length 1-D arrays (the book columns), copied once into shared memory
+    :param chunk_size: rows per task, defaults to TASKS_PER_WORKER tasks per worker
+    :param n_workers: worker processes, None for one per CPU, 1 runs inline
+    :param kwargs: scalar arguments passed to every call
+    :return: the output(s) of func concatenated over the chunks, in book order
+    """
+    arrays = [np.ascontiguousarray(a) for a in arrays]
+    size = arrays[0].shape[0] if arrays else 0
+    if any(a.ndim != 1 or a.shape[0] != size for a in arrays):
+        raise ValueError("process_map needs 1-D arrays of equal length")
+    if any(a.dtype.hasobject for a in arrays):
+        raise ValueError("Object arrays cannot be shared between processes")
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-size // (n_workers * TASKS_PER_WORKER)))
+    slices = chunk_slices(size, chunk_size)
+
+    if n_workers <= 1 or len(slices) == 1:
+        return _gather([func(*[a[rows] for a in arrays], **kwargs) for rows in slices])
+
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    blocks = []
+    try:
+        specs = []
+        for a in arrays:
+            block = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(a.shape, dtype=a.dtype, buffer=block.buf)[:] = a
+            specs.append((block.name, a.shape, a.dtype.str))
+
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_shared_chunk, func, specs, rows, kwargs) for rows in slices]
+            return _gather([future.result() for future in futures])
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _shared_chunk(func, specs, rows, kwargs):
+    """
+    Worker side of process_map: attaches the shared columns and runs func on rows
+    """
+    from multiprocessing import shared_memory
+
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    columns = []
+    try:
+        columns = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)[rows]
+                   for block, (_, shape, dtype) in zip(blocks, specs)]
+        result = func(*columns, **kwargs)
+        # copy out before the shared buffers are released
+        if isinstance(result, tuple):
+            return tuple(np.array(r) for r in result)
+        return np.array(result)
+    finally:
+        # views must go before their buffers can close
+        del columns[:]
+        for block in blocks:
+            block.close()
+
+
+def _gather(results):
+    """
+    :return: chunk results concatenated in order, per output for tuple results
+    """
+    if results and isinstance(results[0], tuple):
+        return tuple(np.concatenate([np.atleast_1d(r[i]) for r in results]) for i in range(len(results[0])))
+    return np.concatenate([np.atleast_1d(r) for r in results])
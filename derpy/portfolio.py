@@ -6,36 +6,288 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import pandas as pd
+from collections import deque, namedtuple
+
 import numpy as np
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize'])
+
+# ticks between full re-sums of the portfolio value, bounding the drift of the running sum
+RESUM_TICKS = 1024
+
+
 class Portfolio(object):
+    """
+    Security values, weights, portfolio value and returns from positions x prices.
+
+    Intermediate results form a small cached graph (values -> row sums ->
+    weights / returns), so each O(T x N) product is computed once. The cache
+    is cleared when positions or prices are reassigned or changed through
+    update(); frames mutated in place by other means need invalidate().
+    Public methods return shallow copies of the cached frames, which pandas
+    Copy-on-Write detaches on the first write, so editing a result never
+    reaches the cache.
+    """
 
     def __init__(self, names, positions, prices):
         self.sec_names = names
+        self._cache = {}
+        self._hits = 0
+        self._misses = 0
         self.positions = positions
         self.prices = prices
 
+    @property
+    def positions(self):
+        return self._positions
+
+    @positions.setter
+    def positions(self, positions):
+        self._positions = positions
+        self.invalidate()
+
+    @property
+    def prices(self):
+        return self._prices
+
+    @prices.setter
+    def prices(self, prices):
+        self._prices = prices
+        self.invalidate()
+
+    def update(self, positions=None, prices=None):
+        """
+        Overwrites cells of the positions and/or prices frames and clears the cache
+        :param positions: DataFrame whose index / columns locate the cells to overwrite
+        :param prices: DataFrame whose index / columns locate the cells to overwrite
+        """
+        for frame, changes in [(self._positions, positions), (self._prices, prices)]:
+            if changes is not None:
+                frame.loc[changes.index, changes.columns] = changes
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops every cached intermediate result
+        """
+        self._cache.clear()
+
+    def cache_info(self):
+        """
+        :return: CacheInfo(hits, misses, currsize) since construction
+        """
+        return CacheInfo(self._hits, self._misses, len(self._cache))
+
+    # public results are shallow copies, Copy-on-Write keeps edits to them out of the cache
     def sec_values(self):
-        return self.positions * self.prices
+        return self._sec_values().copy(deep=False)
 
     def sec_weights(self):
-        sec_vals = self.sec_values()
-        return sec_vals.divide(sec_vals.sum(axis='columns'), axis='rows')
+        return self._cached('sec_weights', lambda: self._sec_values().divide(self._row_sums(), axis='rows')).copy(deep=False)
 
     def portfolio_value(self):
-        sec_vals = self.sec_values()
-        return pd.DataFrame(sec_vals.sum(axis=1), columns=['value'])
+        import pandas as pd
+
+        return pd.DataFrame(self._row_sums(), columns=['value'])
 
     def portfolio_returns(self):
+        return self._cached('portfolio_returns', self._portfolio_returns).copy(deep=False)
+
+    def _sec_values(self):
+        return self._cached('sec_values', lambda: self.positions * self.prices)
+
+    def _row_sums(self):
+        return self._cached('row_sums', lambda: self._sec_values().sum(axis=1))
+
+    def _portfolio_returns(self):
         port_val = self.portfolio_value()
         port_val['simple_ret'] = port_val['value'].pct_change()
         port_val['log_ret'] = np.log(port_val['value']) - np.log(port_val['value'].shift(1))
         return port_val
 
+    def _cached(self, key, compute):
+        if key in self._cache:
+            self._hits += 1
+        else:
+            self._misses += 1
+            self._cache[key] = compute()
+        return self._cache[key]
+
+
+class IncrementalPortfolio(object):
+    """
+    Portfolio analytics updated one bar (or one tick) at a time.
+
+    Only the latest positions and prices are held per security, so appending
+    a bar or applying a tick costs O(num_securities) and never revisits
+    history. The last max(windows) portfolio values and log returns are kept
+    in ring buffers for the rolling volatility and drawdown statistics.
+    The per bar history behind portfolio_returns() grows with every bar
+    unless bounded by history, which long running feeds should set. Ticks
+    adjust the value by differences, which is re-summed every RESUM_TICKS
+    ticks and on every bar so rounding cannot accumulate.
+    """
+
+    def __init__(self, names, windows=(20,), history=None):
+        """
+        :param names: security names, fixing the column order of every bar
+        :param windows: rolling window lengths (in bars) for the statistics
+        :param history: bars kept for portfolio_returns(), None keeps every bar and 0 none
+        """
+        self.sec_names = list(names)
+        self.windows = tuple(windows)
+        self._column = dict((name, i) for i, name in enumerate(self.sec_names))
+
+        self.positions = np.zeros(len(self.sec_names))
+        self.prices = np.zeros(len(self.sec_names))
+        self.values = np.zeros(len(self.sec_names))
+        self.value = np.nan
+        self.simple_ret = np.nan
+        self.log_ret = np.nan
+        self._prev_value = np.nan
+
+        # value / return history, one entry per bar, the oldest dropped beyond history bars
+        self.dates = deque(maxlen=history)
+        self._history = deque(maxlen=history)
+        self._ticks = 0
+
+        # ring buffers for the rolling statistics
+        self._ring_size = max(self.windows)
+        self._ring_values = np.full(self._ring_size, np.nan)
+        self._ring_log_rets = np.full(self._ring_size, np.nan)
+        self._bars = 0
+
+    @classmethod
+    def from_portfolio(cls, portfolio, windows=(20,), history=None):
+        """
+        :param portfolio: Portfolio whose history is replayed bar by bar
+        :param windows: rolling window lengths (in bars)
+        :param history: bars kept for portfolio_returns(), None keeps every bar
+        :return: IncrementalPortfolio positioned on the last bar
+        """
+        incremental = cls(portfolio.sec_names, windows, history)
+        positions = portfolio.positions[incremental.sec_names].to_numpy(dtype=np.float64)
+        prices = portfolio.prices[incremental.sec_names].to_numpy(dtype=np.float64)
+        for date, position_row, price_row in zip(portfolio.positions.index, positions, prices):
+            incremental.append(position_row, price_row, date)
+
+        return incremental
+
+    def append(self, positions, prices, date=None):
+        """
+        Closes the current bar and starts a new one
+        :param positions: positions of every security, in sec_names order
+        :param prices: prices of every security, in sec_names order
+        :param date: label of the new bar
+        """
+        self._prev_value = self.value
+        self.positions[:] = positions
+        self.prices[:] = prices
+        np.multiply(self.positions, self.prices, out=self.values)
+        self.value = self.values.sum()
+        self._ticks = 0
+
+        self.dates.append(date)
+        self._history.append(None)
+        self._bars += 1
+        self._update_returns()
+
+    def update_tick(self, name, price=None, position=None):
+        """
+        Applies a price and/or position change for one security to the current bar
+        :param name: security name
+        :param price: new price, unchanged if None
+        :param position: new position, unchanged if None
+        """
+        if not self._bars:
+            raise ValueError("No bar to update, append a bar first")
+
+        i = self._column[name]
+        if price is not None:
+            self.prices[i] = price
+        if position is not None:
+            self.positions[i] = position
+
+        new_value = self.positions[i] * self.prices[i]
+        self._ticks += 1
+        if self._ticks < RESUM_TICKS:
+            self.value += new_value - self.values[i]
+            self.values[i] = new_value
+        else:
+            self.values[i] = new_value
+            self.value = self.values.sum()
+            self._ticks = 0
+        self._update_returns()
+
+    def sec_weights(self):
+        """
+        :return: current security weights, in sec_names order
+        """
+        return self.values / self.value
+
+    def rolling_vol(self, window):
+        """
+        :param window: number of bars
+        :return: sample standard deviation of the last window log returns
+        """
+        log_rets = self._window(self._ring_log_rets, window)
+        log_rets = log_rets[~np.isnan(log_rets)]
+        return log_rets.std(ddof=1) if log_rets.size > 1 else np.nan
+
+    def drawdown(self, window):
+        """
+        :param window: number of bars
+        :return: current value against the peak of the last window values, minus one
+        """
+        return self.value / np.nanmax(self._window(self._ring_values, window)) - 1
+
+    def max_drawdown(self, window):
+        """
+        :param window: number of bars
+        :return: largest peak to trough fall within the last window values
+        """
+        values = self._window(self._ring_values, window)
+        values = values[~np.isnan(values)]
+        return np.min(values / np.maximum.accumulate(values) - 1)
+
+    def stats(self):
+        """
+        :return: dict of rolling statistics, keyed by window length
+        """
+        return dict((window, {'vol': self.rolling_vol(window),
+                              'drawdown': self.drawdown(window),
+                              'max_drawdown': self.max_drawdown(window)}) for window in self.windows)
+
+    def portfolio_returns(self):
+        """
+        :return: DataFrame of value, simple_ret and log_ret per bar, as Portfolio.portfolio_returns
+        """
+        import pandas as pd
+
+        return pd.DataFrame(list(self._history), index=list(self.dates), columns=['value', 'simple_ret', 'log_ret'])
+
+    def _update_returns(self):
+        self.simple_ret = self.value / self._prev_value - 1
+        self.log_ret = np.log(self.value) - np.log(self._prev_value)
+
+        # the current bar always occupies the newest ring slot
+        slot = (self._bars - 1) % self._ring_size
+        self._ring_values[slot] = self.value
+        self._ring_log_rets[slot] = self.log_ret
+        if self._history:
+            self._history[-1] = (self.value, self.simple_ret, self.log_ret)
+
+    def _window(self, ring, window):
+        if not 0 < window <= self._ring_size:
+            raise ValueError("Window must be between 1 and {}".format(self._ring_size))
+        # positions of the last window bars, oldest first
+        return ring[np.arange(max(self._bars - window, 0), self._bars) % self._ring_size]
+
 
 if __name__ == '__main__':
+    import pandas as pd
+
     securities = ['AAA', 'BBB']
     positions = [[11, 10], [12, 10], [13, 10], [13, 11], [13, 12]]
     prices = [[10, 10], [11, 10], [12, 10], [12, 10], [12, 10]]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Array backed portfolio analytics
+# Notes:
+#       ArrayPortfolio holds positions and prices as contiguous
+#       (dates x securities) float64 arrays, with security names
+#       and dates stored once as index arrays. Every calculation
+#       accepts a preallocated out buffer, so a risk loop over
+#       fixed shapes runs without allocating, and pandas is only
+#       imported when results are converted with to_frame.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+# columns of the portfolio_returns array, as in Portfolio.portfolio_returns
+RETURN_COLUMNS = ('value', 'simple_ret', 'log_ret')
+
+
+class ArrayPortfolio(object):
+
+    def __init__(self, names, positions, prices, dates=None):
+        """
+        :param names: security names, one per column
+        :param positions: (dates x securities) positions
+        :param prices: (dates x securities) prices
+        :param dates: row labels, defaults to 0 .. T-1
+
+        float64 arrays that are already C-contiguous are stored without copying,
+        so in-place updates by the caller are seen by the portfolio.
+        """
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64)
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        if self.positions.ndim != 2 or self.positions.shape != self.prices.shape:
+            raise ValueError("Positions {} and prices {} must be 2-D arrays of the same shape"
+                             .format(self.positions.shape, self.prices.shape))
+
+        self.sec_names = np.asarray(names)
+        self.dates = np.arange(self.positions.shape[0]) if dates is None else np.asarray(dates)
+        if self.sec_names.shape != self.positions.shape[1:] or self.dates.shape != self.positions.shape[:1]:
+            raise ValueError("Expected {} names and {} dates".format(self.positions.shape[1],
+                                                                     self.positions.shape[0]))
+
+        # (dates x securities) workspace reused by calls made without an out buffer
+        self._values = None
+
+    @property
+    def shape(self):
+        return self.positions.shape
+
+    @classmethod
+    def from_portfolio(cls, portfolio):
+        """
+        :param portfolio: pandas backed Portfolio
+        :return: ArrayPortfolio over the same positions, prices and labels
+        """
+        names = list(portfolio.sec_names)
+        return cls(names=names,
+                   positions=portfolio.positions[names].to_numpy(dtype=np.float64),
+                   prices=portfolio.prices[names].to_numpy(dtype=np.float64),
+                   dates=portfolio.positions.index.to_numpy())
+
+    def update(self, rows, positions=None, prices=None):
+        """
+        Overwrites rows of positions and/or prices in place
+        :param rows: row number, slice or index array
+        :param positions: new positions for those rows, broadcast as in numpy assignment
+        :param prices: new prices for those rows, broadcast as in numpy assignment
+        """
+        if positions is not None:
+            self.positions[rows] = positions
+        if prices is not None:
+            self.prices[rows] = prices
+
+    def sec_values(self, out=None):
+        """
+        :param out: optional (dates x securities) float64 buffer
+        :return: positions * prices
+        """
+        if out is None:
+            out = np.empty(self.shape)
+        return np.multiply(self.positions, self.prices, out=out)
+
+    def portfolio_value(self, out=None):
+        """
+        :param out: optional (dates,) float64 buffer
+        :return: total value per date
+        """
+        return np.sum(self.sec_values(out=self._workspace()), axis=1, out=out)
+
+    def sec_weights(self, out=None):
+        """
+        :param out: optional (dates x securities) float64 buffer
+        :return: security values divided by the total value of their date
+        """
+        out = self.sec_values(out=out)
+        total = np.sum(out, axis=1)
+        return np.divide(out, total[:, None], out=out)
+
+    def portfolio_returns(self, out=None):
+        """
+        :param out: optional (dates x 3) float64 buffer
+        :return: value, simple_ret and log_ret columns (RETURN_COLUMNS), NaN on the first date
+        """
+        if out is None:
+            out = np.empty((self.shape[0], len(RETURN_COLUMNS)))
+        value, simple_ret, log_ret = out[:, 0], out[:, 1], out[:, 2]
+
+        self.portfolio_value(out=value)
+        simple_ret[:1] = np.nan
+        np.divide(value[1:], value[:-1], out=simple_ret[1:])
+        simple_ret[1:] -= 1
+        np.log(value, out=log_ret)
+        # numpy buffers the overlapping operands, so this differences the log values in place
+        log_ret[1:] -= log_ret[:-1]
+        log_ret[0] = np.nan
+        return out
+
+    def to_frame(self, name='portfolio_returns'):
+        """
+        :param name: sec_values, sec_weights, portfolio_value or portfolio_returns
+        :return: the result as a labelled DataFrame, laid out as by Portfolio
+        """
+        import pandas as pd
+
+        if name in ('sec_values', 'sec_weights'):
+            return pd.DataFrame(getattr(self, name)(), index=self.dates, columns=self.sec_names)
+        if name == 'portfolio_value':
+            return pd.DataFrame(self.portfolio_value(), index=self.dates, columns=['value'])
+        if name == 'portfolio_returns':
+            return pd.DataFrame(self.portfolio_returns(), index=self.dates, columns=list(RETURN_COLUMNS))
+        raise ValueError("Unknown portfolio result: {}".format(name))
+
+    def _workspace(self):
+        if self._values is None or self._values.shape != self.shape:
+            self._values = np.empty(self.shape)
+        return self._values
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# On-disk portfolio histories
+# Notes:
+#       A store is a directory holding positions.npy and
+#       prices.npy as (dates x securities) float64 arrays,
+#       dates.npy, and meta.json with the security names and
+#       shape. Arrays are opened with np.memmap (via np.load
+#       mmap_mode), so opening is near-instant whatever the
+#       size, and compute() walks the date axis in chunks,
+#       writing values, weights and returns to memory mapped
+#       .npy files in the same directory.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+
+import numpy as np
+
+from derpy.parallel import chunk_slices, map_chunks
+from derpy.portfolio_array import ArrayPortfolio, RETURN_COLUMNS
+
+# float64 cells per chunk, bounds the resident working set of compute()
+CHUNK_CELLS = 2 ** 22
+
+META_FILE = 'meta.json'
+STORE_VERSION = 1
+
+
+class PortfolioStore(object):
+
+    def __init__(self, path, mode='r'):
+        """
+        Opens an existing store
+        :param path: store directory
+        :param mode: 'r' for read only positions and prices, 'r+' to allow in-place updates
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get('version') != STORE_VERSION:
+            raise ValueError("Unsupported portfolio store version: {}".format(meta.get('version')))
+
+        self.sec_names = meta['names']
+        self.positions = np.load(self._file('positions'), mmap_mode=mode)
+        self.prices = np.load(self._file('prices'), mmap_mode=mode)
+        self.dates = np.load(self._file('dates'), mmap_mode='r', allow_pickle=False)
+        if self.positions.shape != tuple(meta['shape']) or self.prices.shape != tuple(meta['shape']):
+            raise ValueError("Store arrays do not match the shape {} in {}".format(meta['shape'], META_FILE))
+
+    def __repr__(self):
+        return "PortfolioStore(path={!r}, shape={})".format(self.path, self.shape)
+
+    @property
+    def shape(self):
+        return self.positions.shape
+
+    @classmethod
+    def create(cls, path, names, n_dates, dates=None):
+        """
+        Creates an empty store to be filled through its positions and prices memmaps
+        :param path: store directory, created if missing
+        :param names: security names
+        :param n_dates: number of dates
+        :param dates: date labels (numeric, datetime64 or text), defaults to 0 .. n_dates-1
+        :return: PortfolioStore opened in 'r+' mode
+        """
+        names = [str(name) for name in names]
+        shape = (int(n_dates), len(names))
+        dates = np.arange(shape[0]) if dates is None else np.asarray(dates)
+        if dates.dtype == object:
+            # .npy files are written without pickling, so object labels are stored as text
+            dates = dates.astype(str)
+        if dates.shape != shape[:1]:
+            raise ValueError("Expected {} dates, got {}".format(shape[0], dates.shape))
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        np.save(os.path.join(path, 'dates.npy'), dates, allow_pickle=False)
+        for name in ('positions', 'prices'):
+            np.lib.format.open_memmap(os.path.join(path, name + '.npy'), mode='w+', dtype=np.float64, shape=shape)
+        with open(os.path.join(path, META_FILE), 'w') as meta_file:
+            json.dump({'version': STORE_VERSION, 'names': names, 'shape': shape}, meta_file)
+
+        return cls(path, mode='r+')
+
+    @classmethod
+    def save(cls, path, names, positions, prices, dates=None, chunk_size=None):
+        """
+        Writes in-memory (or memory mapped) histories to a new store
+        :param path: store directory, created if missing
+        :param names: security names
+        :param positions: (dates x securities) positions
+        :param prices: (dates x securities) prices
+        :param dates: date labels, defaults to 0 .. T-1
+        :param chunk_size: dates copied per chunk
+        :return: PortfolioStore opened in 'r+' mode
+        """
+        store = cls.create(path, names, np.shape(positions)[0], dates)
+        for rows in chunk_slices(store.shape[0], _chunk_rows(store.shape, chunk_size)):
+            store.positions[rows] = positions[rows]
+            store.prices[rows] = prices[rows]
+        store.flush()
+
+        return store
+
+    @classmethod
+    def from_portfolio(cls, path, portfolio, chunk_size=None):
+        """
+        :param path: store directory, created if missing
+        :param portfolio: pandas backed Portfolio
+        :param chunk_size: dates copied per chunk
+        :return: PortfolioStore opened in 'r+' mode
+        """
+        names = list(portfolio.sec_names)
+        return cls.save(path, names,
+                        positions=portfolio.positions[names].to_numpy(dtype=np.float64),
+                        prices=portfolio.prices[names].to_numpy(dtype=np.float64),
+                        dates=portfolio.positions.index.to_numpy(),
+                        chunk_size=chunk_size)
+
+    def flush(self):
+        """
+        Writes pending changes of writable memmaps to disk
+        """
+        for array in (self.positions, self.prices):
+            if isinstance(array, np.memmap) and array.flags.writeable:
+                array.flush()
+
+    def array_portfolio(self, rows=slice(None)):
+        """
+        :param rows: date slice
+        :return: ArrayPortfolio over the memory mapped rows, without copying
+        """
+        return ArrayPortfolio(self.sec_names, self.positions[rows], self.prices[rows], dates=self.dates[rows])
+
+    def compute(self, outputs=('sec_values', 'sec_weights', 'portfolio_returns'), chunk_size=None, n_threads=1):
+        """
+        Computes results chunk by chunk along the date axis into memory mapped files
+        :param outputs: any of sec_values, sec_weights, portfolio_returns
+        :param chunk_size: dates per chunk, defaults to CHUNK_CELLS // num_securities
+        :param n_threads: worker threads for the chunks
+        :return: dict of output name to memmap, saved as <name>.npy in the store directory
+
+        portfolio_returns has the RETURN_COLUMNS (value, simple_ret, log_ret).
+        """
+        unknown = set(outputs) - {'sec_values', 'sec_weights', 'portfolio_returns'}
+        if unknown:
+            raise ValueError("Unknown portfolio outputs: {}".format(sorted(unknown)))
+
+        results = {}
+        for name in outputs:
+            shape = (self.shape[0], len(RETURN_COLUMNS)) if name == 'portfolio_returns' else self.shape
+            results[name] = np.lib.format.open_memmap(self._file(name), mode='w+', dtype=np.float64, shape=shape)
+
+        def compute_chunk(rows):
+            chunk = self.array_portfolio(rows)
+            for name, result in results.items():
+                getattr(chunk, name)(out=result[rows])
+            return rows
+
+        chunks = map_chunks(compute_chunk, self.shape[0], _chunk_rows(self.shape, chunk_size), n_threads)
+
+        if 'portfolio_returns' in results:
+            # the first date of each chunk returns against the last date of the previous chunk
+            returns = results['portfolio_returns']
+            for rows in chunks[1:]:
+                value, prev_value = returns[rows.start, 0], returns[rows.start - 1, 0]
+                returns[rows.start, 1] = value / prev_value - 1
+                returns[rows.start, 2] = np.log(value) - np.log(prev_value)
+
+        for result in results.values():
+            result.flush()
+        return results
+
+    def load_result(self, name):
+        """
+        :param name: output name passed to compute()
+        :return: read only memmap of a previously computed result
+        """
+        return np.load(self._file(name), mmap_mode='r')
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.npy')
+
+
+def _chunk_rows(shape, chunk_size):
+    """
+    :return: dates per chunk, defaulting to CHUNK_CELLS // num_securities
+    """
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_CELLS // max(shape[1], 1))
+    return chunk_size
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Out-of-core portfolio returns
+# Notes:
+#       Readers yield (positions, prices) DataFrame pairs one
+#       date chunk at a time from CSV, Parquet or .npy sources.
+#       portfolio_returns_stream turns them into value / return
+#       blocks, carrying the last portfolio value across chunk
+#       boundaries, so only one chunk is held in memory and the
+#       concatenated blocks equal Portfolio.portfolio_returns.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+import pandas as pd
+
+from derpy.parallel import chunk_slices
+
+# dates per chunk when a reader is not given a chunk_size
+CHUNK_DATES = 10000
+
+
+def read_csv_chunks(positions_path, prices_path, chunk_size=CHUNK_DATES, index_col=0, **kwargs):
+    """
+    :param positions_path: csv of positions, one row per date and one column per security
+    :param prices_path: csv of prices, laid out as the positions
+    :param chunk_size: dates per chunk
+    :param index_col: date column, passed to pandas.read_csv
+    :param kwargs: further pandas.read_csv arguments (e.g. parse_dates)
+    :return: generator of (positions, prices) DataFrame chunks
+    """
+    positions = pd.read_csv(positions_path, index_col=index_col, chunksize=chunk_size, **kwargs)
+    prices = pd.read_csv(prices_path, index_col=index_col, chunksize=chunk_size, **kwargs)
+    with positions, prices:
+        for chunk in _zip_chunks(positions, prices):
+            yield chunk
+
+
+def read_parquet_chunks(positions_path, prices_path, chunk_size=CHUNK_DATES, index_col=None):
+    """
+    Reads row batches with pyarrow, which must be installed for Parquet sources
+    :param positions_path: parquet file of positions, one row per date and one column per security
+    :param prices_path: parquet file of prices, laid out as the positions
+    :param chunk_size: dates per chunk
+    :param index_col: column to use as the date index, None keeps the stored pandas index
+    :return: generator of (positions, prices) DataFrame chunks
+    """
+    import pyarrow.parquet as pq
+
+    def batches(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            frame = batch.to_pandas()
+            yield frame if index_col is None else frame.set_index(index_col)
+
+    for chunk in _zip_chunks(batches(positions_path), batches(prices_path)):
+        yield chunk
+
+
+def read_npy_chunks(positions_path, prices_path, names, dates=None, chunk_size=CHUNK_DATES):
+    """
+    :param positions_path: .npy file of (dates x securities) positions, memory mapped
+    :param prices_path: .npy file of (dates x securities) prices, memory mapped
+    :param names: security names, one per column
+    :param dates: date labels (array or .npy path), defaults to 0 .. T-1
+    :param chunk_size: dates per chunk
+    :return: generator of (positions, prices) DataFrame chunks
+    """
+    positions = np.load(positions_path, mmap_mode='r')
+    prices = np.load(prices_path, mmap_mode='r')
+    if positions.shape != prices.shape:
+        raise ValueError("Positions {} and prices {} differ in shape".format(positions.shape, prices.shape))
+    if dates is None:
+        dates = np.arange(positions.shape[0])
+    elif isinstance(dates, str):
+        dates = np.load(dates, mmap_mode='r')
+
+    for rows in chunk_slices(positions.shape[0], chunk_size):
+        index = pd.Index(dates[rows])
+        yield (pd.DataFrame(np.array(positions[rows]), index=index, columns=names),
+               pd.DataFrame(np.array(prices[rows]), index=index, columns=names))
+
+
+def portfolio_returns_stream(chunks, names=None):
+    """
+    :param chunks: iterable of (positions, prices) DataFrame chunks in date order
+    :param names: securities to include, None for every column
+    :return: generator of DataFrames with value, simple_ret and log_ret, one per chunk
+    """
+    # last portfolio value of the previous chunk
+    carry = None
+
+    for positions, prices in chunks:
+        if names is not None:
+            positions, prices = positions[names], prices[names]
+        if not positions.index.equals(prices.index):
+            raise ValueError("Positions and prices chunks cover different dates")
+
+        value = (positions * prices).sum(axis=1)
+        if not len(value):
+            # the row sums of an empty frame are object dtype, which would leak into the concatenated output
+            value = value.astype(np.float64)
+        if carry is not None:
+            value = pd.concat([carry, value])
+
+        port_val = value.to_frame('value')
+        port_val['simple_ret'] = port_val['value'].pct_change()
+        port_val['log_ret'] = np.log(port_val['value']) - np.log(port_val['value'].shift(1))
+
+        if carry is not None:
+            port_val = port_val.iloc[1:]
+        # an empty chunk has no value to carry, keep the previous one
+        if len(value):
+            carry = value.iloc[-1:]
+        yield port_val
+
+
+def portfolio_returns(chunks, names=None):
+    """
+    :param chunks: iterable of (positions, prices) DataFrame chunks in date order
+    :param names: securities to include, None for every column
+    :return: DataFrame of value, simple_ret and log_ret over every chunk
+    """
+    return pd.concat(list(portfolio_returns_stream(chunks, names)))
+
+
+def _zip_chunks(positions, prices):
+    """
+    :return: generator of (positions, prices) pairs, checking both sources end together
+    """
+    positions, prices = iter(positions), iter(prices)
+    while True:
+        position_chunk, price_chunk = next(positions, None), next(prices, None)
+        if position_chunk is None and price_chunk is None:
+            return
+        if position_chunk is None or price_chunk is None:
+            raise ValueError("Positions and prices sources have different lengths")
+        yield position_chunk, price_chunk
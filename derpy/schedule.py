@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Shared coupon schedules
+# Notes:
+#       Bonds with the same coupon structure share one schedule
+#       of coupon times and coupon fractions. Schedules are built
+#       once per (maturity, frequency, convention) key, stored as
+#       read-only arrays so every caller can hold the same object,
+#       and kept in an LRU cache with a size limit.
+#       YieldCurve is the consumer; the closed form bond
+#       analytics and the cash-flow list builders do not use it.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# schedules kept by the default cache
+SCHEDULE_CACHE_SIZE = 4096
+
+# 'forward': coupons every 1 / freq years from the start date for int(maturity * freq)
+#            periods, as bond.bond_price discounts them
+# 'backward': coupons every 1 / freq years back from maturity, the first period a short stub
+CONVENTIONS = ('forward', 'backward')
+
+# coupon times in years, and the fraction of the annual coupon paid at each
+Schedule = namedtuple('Schedule', ['times', 'coupons'])
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class ScheduleCache(object):
+
+    def __init__(self, maxsize=SCHEDULE_CACHE_SIZE):
+        """
+        :param maxsize: schedules kept, the least recently used is evicted beyond it
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1, got {}".format(maxsize))
+        self.maxsize = maxsize
+        self._schedules = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._schedules)
+
+    def __repr__(self):
+        return "ScheduleCache(maxsize={}, currsize={})".format(self.maxsize, len(self))
+
+    def schedule(self, maturity, freq, convention='forward'):
+        """
+        :param maturity: time to maturity in years
+        :param freq: coupons per year
+        :param convention: one of CONVENTIONS
+        :return: Schedule of read-only times and coupons arrays, shared by every caller with the same key
+        """
+        key = _schedule_key(maturity, freq, convention)
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is not None:
+                self._hits += 1
+                self._schedules.move_to_end(key)
+                return schedule
+            self._misses += 1
+
+        schedule = _build_schedule(*key)
+        with self._lock:
+            # another thread may have built the same key meanwhile, keep the first so callers share it
+            schedule = self._schedules.setdefault(key, schedule)
+            while len(self._schedules) > self.maxsize:
+                self._schedules.popitem(last=False)
+
+        return schedule
+
+    def cache_info(self):
+        """
+        :return: CacheInfo(hits, misses, maxsize, currsize) since construction or the last clear()
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._schedules))
+
+    def clear(self):
+        with self._lock:
+            self._schedules.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+_default_cache = ScheduleCache()
+
+
+def coupon_schedule(maturity, freq, convention='forward', cache=None):
+    """
+    :param maturity: time to maturity in years
+    :param freq: coupons per year
+    :param convention: one of CONVENTIONS
+    :param cache: ScheduleCache to draw on, defaults to the module wide cache
+    :return: Schedule of read-only times and coupons arrays
+    """
+    return (_default_cache if cache is None else cache).schedule(maturity, freq, convention)
+
+
+def default_cache():
+    """
+    :return: the module wide ScheduleCache used by coupon_schedule
+    """
+    return _default_cache
+
+
+def _schedule_key(maturity, freq, convention):
+    """
+    Forward schedules only depend on the number of whole periods, so maturities
+    inside the same period share one key
+    """
+    freq = float(freq)
+    if freq <= 0:
+        raise ValueError("Coupon frequency must be positive, got {}".format(freq))
+    if convention == 'forward':
+        return convention, int(math.floor(maturity * freq)), freq
+    if convention == 'backward':
+        return convention, float(maturity), freq
+    raise ValueError("Schedule convention: {} not supported".format(convention))
+
+
+def _build_schedule(convention, term, freq):
+    if convention == 'forward':
+        times = np.arange(1, term + 1) / freq
+        coupons = np.full(term, 1 / freq)
+    else:
+        # round so a maturity a float hair short of a whole period does not add a stub
+        periods = int(math.ceil(round(term * freq, 9)))
+        times = term - np.arange(periods - 1, -1, -1) / freq
+        coupons = np.full(periods, 1 / freq)
+        if periods:
+            # the stub accrues from the start date to the first coupon
+            coupons[0] = times[0]
+
+    times.flags.writeable = False
+    coupons.flags.writeable = False
+    return Schedule(times, coupons)
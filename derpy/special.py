@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Standard normal distribution kernels
+# Notes:
+#       scipy.stats.norm.cdf / pdf validate and broadcast their
+#       arguments through the rv_continuous machinery, which
+#       costs microseconds per scalar call. Python floats go
+#       straight to math.erfc / math.exp here, arrays to the
+#       scipy.special.ndtr ufunc, so the pricers pay neither
+#       the dispatch overhead nor a per element Python loop.
+#       scipy.special is only imported by the first array call.
+#       The two cdf kernels are different implementations and
+#       are not bit-identical: they agree to about 3e-14
+#       relative on |x| < 10, and match in roughly half of all
+#       inputs. Prices built on them (the scalar and batch
+#       option pricers) inherit that difference, amplified where
+#       the two legs cancel: within a few ulp of the spot /
+#       strike scale, up to ~1e-10 relative for deep out of
+#       the money prices. Routing floats through ndtr would load
+#       scipy for scalar pricing, and arrays through math.erfc
+#       would need a Python loop, so the split is kept.
+#       The pdf paths (math.exp vs np.exp) differ by at most an
+#       ulp.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+import numpy as np
+
+INV_SQRT_2 = 1 / math.sqrt(2)
+INV_SQRT_2PI = 1 / math.sqrt(2 * math.pi)
+
+# scipy.special.ndtr, resolved by the first array call
+_ndtr = None
+
+
+def norm_cdf(x):
+    """
+    :param x: float or array
+    :return: standard normal cumulative distribution at x, floats and arrays agree to ~3e-14 relative
+    """
+    if isinstance(x, float):
+        # erfc keeps full relative precision in the lower tail, unlike 1 + erf
+        return 0.5 * math.erfc(-1 * x * INV_SQRT_2)
+
+    global _ndtr
+    if _ndtr is None:
+        from scipy.special import ndtr
+        _ndtr = ndtr
+    return _ndtr(x)
+
+
+def norm_pdf(x):
+    """
+    :param x: float or array
+    :return: standard normal density at x
+    """
+    if isinstance(x, float):
+        return math.exp(-0.5 * x * x) * INV_SQRT_2PI
+    x = np.asarray(x, dtype=np.float64)
+    return (np.exp(-0.5 * x * x) * INV_SQRT_2PI)[()]
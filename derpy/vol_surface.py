@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Implied volatility surface
+# Notes:
+#       Quotes are stored per expiry as sorted arrays of
+#       log-moneyness log(K / F) and total variance vol^2 T.
+#       Each expiry slice is a natural cubic spline of total
+#       variance in log-moneyness, built lazily and cached;
+#       changing the quotes of one expiry only marks that slice
+#       for rebuilding. Between expiries the surface is linear
+#       in total variance at constant log-moneyness. Lookups
+#       are vectorized: one binary search over the expiries and
+#       one over the knots of each slice touched.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from derpy import option_bsm as bsm
+
+# floor on interpolated total variance, a spline can undershoot between sparse quotes
+MIN_VARIANCE = 1e-12
+
+
+class VolSurface(object):
+
+    def __init__(self, expiry, strike, volatility, stock_price, interest_rate=0, div_yield=0):
+        """
+        :param expiry: time to expiry in years of each quote
+        :param strike: strike price of each quote
+        :param volatility: implied volatility of each quote
+        :param stock_price: spot price of the underlying, with the rates it sets the forwards
+        :param interest_rate: annual continuous interest rate
+        :param div_yield: continuous dividend yield
+
+        Quotes are flat arrays, one entry per (expiry, strike) point; quotes
+        sharing an expiry form one slice.
+        """
+        self.stock_price = float(stock_price)
+        self.interest_rate = float(interest_rate)
+        self.div_yield = float(div_yield)
+        self.expiries = np.empty(0)
+        self._quotes = []
+        self._splines = []
+
+        arrays = np.broadcast_arrays(np.asarray(expiry, dtype=np.float64),
+                                     np.asarray(strike, dtype=np.float64),
+                                     np.asarray(volatility, dtype=np.float64))
+        expiry, strike, volatility = [np.ravel(a) for a in arrays]
+        for mat in np.unique(expiry):
+            rows = expiry == mat
+            self.set_quotes(mat, strike[rows], volatility[rows])
+
+    def __repr__(self):
+        return "VolSurface(expiries={}, quotes={})".format(len(self.expiries),
+                                                           sum(quote[0].size for quote in self._quotes))
+
+    @classmethod
+    def from_prices(cls, call_put, option_price, expiry, strike, stock_price, interest_rate=0, div_yield=0):
+        """
+        Builds the surface from option prices, solving every implied vol in one batch
+        :param call_put: option type(s), flags ('c', 'put', ...) or +1/-1 signs
+        :param option_price: observed option prices
+        :param expiry: time to expiry in years of each quote
+        :param strike: strike price of each quote
+        :param stock_price: spot price of the underlying asset
+        :param interest_rate: annual continuous interest rate
+        :param div_yield: continuous dividend yield
+        :return: VolSurface over the quotes whose implied vol converged
+        """
+        vol, status = bsm.implied_vol_batch(call_put, option_price, stock_price, strike, expiry, interest_rate,
+                                            div_yield)
+        expiry, strike, vol, status = [np.ravel(a) for a in np.broadcast_arrays(expiry, strike, vol, status)]
+        solved = status == bsm.IV_CONVERGED
+        return cls(expiry[solved], strike[solved], vol[solved], stock_price, interest_rate, div_yield)
+
+    def set_quotes(self, expiry, strike, volatility):
+        """
+        Replaces (or adds) the quotes of one expiry, only that slice is rebuilt on the next lookup
+        :param expiry: time to expiry in years
+        :param strike: strike prices
+        :param volatility: implied volatilities, one per strike
+        """
+        expiry = float(expiry)
+        if expiry <= 0:
+            raise ValueError("Expiry must be positive, got {}".format(expiry))
+        strike, volatility = np.broadcast_arrays(np.asarray(strike, dtype=np.float64).ravel(),
+                                                 np.asarray(volatility, dtype=np.float64).ravel())
+        if not strike.size:
+            raise ValueError("No quotes for expiry {}".format(expiry))
+
+        log_moneyness = np.log(strike) - self._log_forward(expiry)
+        order = np.argsort(log_moneyness)
+        if np.any(np.diff(log_moneyness[order]) == 0):
+            raise ValueError("Duplicate strikes for expiry {}".format(expiry))
+        quote = (log_moneyness[order], volatility[order] ** 2 * expiry)
+
+        pos = np.searchsorted(self.expiries, expiry)
+        if pos < len(self.expiries) and self.expiries[pos] == expiry:
+            self._quotes[pos] = quote
+            self._splines[pos] = None
+        else:
+            self.expiries = np.insert(self.expiries, pos, expiry)
+            self._quotes.insert(pos, quote)
+            self._splines.insert(pos, None)
+
+    def remove_expiry(self, expiry):
+        """
+        :param expiry: time to expiry of the slice to drop
+        """
+        pos = np.flatnonzero(self.expiries == expiry)
+        if not pos.size:
+            raise KeyError("No slice for expiry {}".format(expiry))
+        self.expiries = np.delete(self.expiries, pos[0])
+        del self._quotes[pos[0]]
+        del self._splines[pos[0]]
+
+    def vol(self, time_to_maturity, strike):
+        """
+        :param time_to_maturity: times to maturity in years
+        :param strike: strike prices, broadcast against time_to_maturity
+        :return: interpolated implied volatilities (a float for scalar inputs)
+        """
+        time_to_maturity = np.asarray(time_to_maturity, dtype=np.float64)
+        variance = self.total_variance(time_to_maturity, strike)
+        vol = np.sqrt(variance / time_to_maturity)
+        return vol[()] if vol.ndim == 0 else vol
+
+    def total_variance(self, time_to_maturity, strike):
+        """
+        Linear in total variance between expiries, flat implied vol before the first and after the last
+        :param time_to_maturity: times to maturity in years
+        :param strike: strike prices, broadcast against time_to_maturity
+        :return: total implied variance vol^2 T
+        """
+        if not len(self.expiries):
+            raise ValueError("Surface has no quotes")
+        mat, strike = np.broadcast_arrays(np.asarray(time_to_maturity, dtype=np.float64),
+                                          np.asarray(strike, dtype=np.float64))
+        shape = mat.shape
+        mat, strike = mat.ravel(), strike.ravel()
+        log_moneyness = np.log(strike) - self._log_forward(mat)
+
+        # slice pair bracketing each maturity, clamped to the first / last slice
+        last = len(self.expiries) - 1
+        pos = np.searchsorted(self.expiries, mat)
+        upper = np.minimum(pos, last)
+        lower = np.where(pos > last, last, np.maximum(pos - 1, 0))
+
+        lower_var = self._slice_variance(lower, log_moneyness)
+        upper_var = self._slice_variance(upper, log_moneyness)
+        lower_t, upper_t = self.expiries[lower], self.expiries[upper]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = lower_var + (mat - lower_t) / (upper_t - lower_t) * (upper_var - lower_var)
+            # outside the quoted expiries keep the nearest slice's implied vol
+            variance = np.where(upper == lower, lower_var * mat / lower_t, variance)
+
+        return np.maximum(variance, MIN_VARIANCE * mat).reshape(shape)
+
+    def slice(self, expiry):
+        """
+        :param expiry: quoted time to expiry
+        :return: cached CubicSpline of total variance in log-moneyness (None for a single quote)
+        """
+        pos = np.flatnonzero(self.expiries == expiry)
+        if not pos.size:
+            raise KeyError("No slice for expiry {}".format(expiry))
+        return self._spline(pos[0])[0]
+
+    def _spline(self, pos):
+        """
+        :return: (spline or None, knots, total variances) of slice pos, built on first use after a change
+        """
+        if self._splines[pos] is None:
+            from scipy.interpolate import CubicSpline
+
+            log_moneyness, variance = self._quotes[pos]
+            spline = CubicSpline(log_moneyness, variance, bc_type='natural') if log_moneyness.size > 1 else None
+            self._splines[pos] = (spline, log_moneyness, variance)
+
+        return self._splines[pos]
+
+    def _slice_variance(self, slices, log_moneyness):
+        """
+        :return: total variance of each point on its slice, flat outside the quoted strikes
+        """
+        variance = np.empty(log_moneyness.shape)
+        for pos in np.unique(slices):
+            rows = slices == pos
+            spline, knots, values = self._spline(pos)
+            if spline is None:
+                variance[rows] = values[0]
+            else:
+                variance[rows] = spline(np.clip(log_moneyness[rows], knots[0], knots[-1]))
+
+        return variance
+
+    def _log_forward(self, time_to_maturity):
+        return np.log(self.stock_price) + (self.interest_rate - self.div_yield) * time_to_maturity
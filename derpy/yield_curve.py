@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------
+# Bootstrapped yield curve
+# Notes:
+#       YieldCurve keeps its knots as arrays of times and log
+#       discount factors, with an implicit (0, 0) knot, and is
+#       linear in log discount factor between knots (piecewise
+#       flat forwards), flat forward beyond the last knot.
+#       discount() evaluates any array of times in one np.interp
+#       call. Coupon dates come from the shared schedule cache;
+#       a book of bonds is priced from one discount() call over
+#       its distinct coupon grids.
+# --------------------------------------------------------
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from derpy.schedule import coupon_schedule
+
+# zero rates searched when bootstrapping a knot
+BOOTSTRAP_BRACKET = (-0.5, 2.0)
+
+
+class YieldCurve(object):
+
+    def __init__(self, times, discount_factors):
+        """
+        :param times: knot times in years, positive and strictly increasing
+        :param discount_factors: discount factor at each knot
+        """
+        times = np.asarray(times, dtype=np.float64).ravel()
+        discount_factors = np.asarray(discount_factors, dtype=np.float64).ravel()
+        if times.shape != discount_factors.shape or not times.size:
+            raise ValueError("Need one discount factor per knot time, got {} and {}".format(
+                times.size, discount_factors.size))
+        if times[0] <= 0 or np.any(np.diff(times) <= 0):
+            raise ValueError("Knot times must be positive and strictly increasing")
+        if np.any(discount_factors <= 0):
+            raise ValueError("Discount factors must be positive")
+
+        self.times = times
+        self.discount_factors = discount_factors
+        self._knots = np.concatenate([[0.], times])
+        self._log_df = np.concatenate([[0.], np.log(discount_factors)])
+        # forward rate of the last segment, carried flat beyond the last knot
+        self._tail_forward = (self._log_df[-2] - self._log_df[-1]) / (self._knots[-1] - self._knots[-2])
+
+    def __repr__(self):
+        return "YieldCurve(knots={}, last={})".format(self.times.size, self.times[-1])
+
+    @classmethod
+    def from_zero_rates(cls, times, zero_rates):
+        """
+        :param times: knot times in years
+        :param zero_rates: continuously compounded zero rates (e.g. 0.05 to represent 5%)
+        :return: YieldCurve
+        """
+        times = np.asarray(times, dtype=np.float64)
+        return cls(times, np.exp(-1 * np.asarray(zero_rates, dtype=np.float64) * times))
+
+    @classmethod
+    def bootstrap(cls, deposits=(), swaps=(), bonds=()):
+        """
+        Builds the curve one knot per instrument, in maturity order, so every
+        instrument reprices exactly off the finished curve
+        :param deposits: (maturity, rate) pairs, simple money market rates (e.g. 0.05 to represent 5%)
+        :param swaps: (maturity, par_rate, fixed_freq) triples, par swap rates as decimals, with fixed
+                      payments every 1 / fixed_freq years back from maturity (a 'backward' schedule)
+        :param bonds: (maturity, cpn_rate, cpn_freq, price, face_value) tuples, coupon rates in percent
+                      and coupon dates as in bond.bond_price
+        :return: YieldCurve
+        """
+        from scipy.optimize import brentq
+
+        quotes = [(float(mat), 'deposit', (float(rate),)) for mat, rate in deposits]
+        quotes += [(float(mat), 'swap', (float(rate), float(freq))) for mat, rate, freq in swaps]
+        quotes += [(float(bond[0]), 'bond', tuple(float(v) for v in bond[1:])) for bond in bonds]
+        quotes.sort(key=lambda quote: quote[0])
+        if not quotes:
+            raise ValueError("No instruments to bootstrap")
+
+        times, discount_factors = [], []
+        for maturity, kind, terms in quotes:
+            if times and maturity <= times[-1]:
+                raise ValueError("Instruments must have distinct maturities, {} repeats".format(maturity))
+
+            if kind == 'deposit':
+                discount_factors.append(1 / (1 + terms[0] * maturity))
+                times.append(maturity)
+                continue
+
+            def mispricing(zero_rate):
+                curve = cls(times + [maturity], discount_factors + [np.exp(-1 * zero_rate * maturity)])
+                if kind == 'swap':
+                    rate, freq = terms
+                    pay_times, coupons = coupon_schedule(maturity, freq, 'backward')
+                    return rate * np.dot(coupons, curve.discount(pay_times)) + curve.discount(maturity) - 1
+                cpn_rate, cpn_freq, price, face_value = terms
+                return curve.bond_price(face_value, maturity, cpn_rate, cpn_freq) - price
+
+            zero_rate = brentq(mispricing, BOOTSTRAP_BRACKET[0], BOOTSTRAP_BRACKET[1], xtol=1e-15)
+            discount_factors.append(np.exp(-1 * zero_rate * maturity))
+            times.append(maturity)
+
+        return cls(times, discount_factors)
+
+    def discount(self, time):
+        """
+        :param time: times in years, any shape
+        :return: discount factors (a float for a scalar time)
+        """
+        time = np.asarray(time, dtype=np.float64)
+        log_df = np.interp(time, self._knots, self._log_df)
+        beyond = time > self._knots[-1]
+        if np.any(beyond):
+            log_df = np.where(beyond, self._log_df[-1] - self._tail_forward * (time - self._knots[-1]), log_df)
+
+        return np.exp(log_df)[()]
+
+    def zero_rate(self, time):
+        """
+        :param time: times in years
+        :return: continuously compounded zero rates, the first segment's rate at time 0
+        """
+        time = np.asarray(time, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = -1 * np.log(self.discount(time)) / time
+        return np.where(time > 0, rate, -1 * self._log_df[1] / self._knots[1])[()]
+
+    def forward_rate(self, start, end):
+        """
+        :return: continuously compounded forward rates between start and end times
+        """
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        return (np.log(self.discount(start)) - np.log(self.discount(end))) / (end - start)
+
+    def bond_price(self, face_value, time_to_mat, cpn_rate, cpn_freq=2):
+        """
+        Prices bonds off the curve with the coupon dates of bond.bond_price: coupons every
+        1 / cpn_freq years for int(time_to_mat * cpn_freq) periods, face value paid at time_to_mat
+        :param face_value: face values
+        :param time_to_mat: times to maturity in years
+        :param cpn_rate: coupon rates (e.g. 2.5 to represent 2.5%)
+        :param cpn_freq: coupons per year
+        :return: bond prices
+        """
+        arrays = np.broadcast_arrays(*[np.asarray(a, dtype=np.float64)
+                                       for a in (face_value, time_to_mat, cpn_rate, cpn_freq)])
+        shape = arrays[0].shape
+        face_value, time_to_mat, cpn_rate, cpn_freq = [a.ravel() for a in arrays]
+        periods = np.floor(time_to_mat * cpn_freq)
+
+        # bonds sharing a coupon grid share its annuity, sum(DF(t_j))
+        # a complex (periods, frequency) key sorts far faster than np.unique(axis=0) on pairs
+        grids, first, inverse = np.unique(periods + 1j * cpn_freq, return_index=True, return_inverse=True)
+        times = [coupon_schedule(time_to_mat[row], cpn_freq[row]).times for row in first]
+        sizes = np.array([t.size for t in times])
+        ends = np.cumsum(sizes)
+        discounts = self.discount(np.concatenate(times + [time_to_mat]))
+        cumulative = np.concatenate([[0.], np.cumsum(discounts[:ends[-1]])])
+        annuity = cumulative[ends] - cumulative[ends - sizes]
+
+        coupon = cpn_rate / 100. * face_value / cpn_freq
+        price = coupon * annuity[inverse.ravel()] + face_value * discounts[ends[-1]:]
+        return price.reshape(shape)[()]
@@ -7,6 +7,7 @@ from __future__ import division
 from __future__ import print_function
 
 from derpy import bond as bd
+import numpy as np
 import unittest
 
 
@@ -23,6 +24,59 @@ class TestBond(unittest.TestCase):
         expected_result = 0.023985917390473392
         self.assertAlmostEqual(bond.calc_ytm(), expected_result)
 
+    def test_bond_price_round_trip(self):
+        price = [95.0428, 139.87, 101.5]
+        face_val = [100.0, 99.94, 100.0]
+        mat = [1.5, 12, 30]
+        cpn_rate = [5.25, 6.25, 4.0]
+        ytm = bd.bond_ytm(price, face_val, mat, cpn_rate, 2)
+        self.assertEqual(ytm.shape, (3,))
+        np.testing.assert_allclose(bd.bond_price(face_val, mat, ytm * 100, cpn_rate, 2), price, rtol=1e-12)
+
+    def test_bond_duration_convexity(self):
+        px, face_val, mat, cpn_rate, cpn_frq = 95.0428, 100.0, 1.5, 5.25, 2
+        ytm, mod_dur, mac_dur, convexity = bd.bond_analytics(px, face_val, mat, cpn_rate, cpn_frq)
+        bump = 1e-4
+        px_up = bd.bond_price(face_val, mat, (ytm + bump) * 100, cpn_rate, cpn_frq)
+        px_down = bd.bond_price(face_val, mat, (ytm - bump) * 100, cpn_rate, cpn_frq)
+        self.assertAlmostEqual(mod_dur, (px_down - px_up) / (2 * px * bump), places=6)
+        self.assertAlmostEqual(convexity, (px_up + px_down - 2 * px) / (px * bump ** 2), places=3)
+        self.assertAlmostEqual(mac_dur, mod_dur * (1 + ytm / cpn_frq))
+        self.assertAlmostEqual(bd.bond_duration(px, face_val, mat, cpn_rate, cpn_frq)[0], mod_dur)
+        self.assertAlmostEqual(bd.bond_convexity(px, face_val, mat, cpn_rate, cpn_frq), convexity)
+
+    def test_bond_ytm_batch_flags_failures(self):
+        price = [139.87, np.nan, 95.0428, 1e-6]
+        ytm, iterations, converged = bd.bond_ytm_batch(price, 100.0, [12, 12, 1.5, 5], [6.25, 5, 5.25, 3], 2)
+        self.assertEqual(list(converged), [True, False, True, False])
+        self.assertTrue(np.all(np.isnan(ytm[~converged])))
+        self.assertEqual(iterations[1], 0)
+        self.assertTrue(np.all(iterations[converged] < 10))
+        self.assertAlmostEqual(ytm[2], bd.bond_ytm(95.0428, 100.0, 1.5, 5.25, 2))
+        self.assertRaises(RuntimeError, bd.bond_ytm, np.nan, 100.0, 12, 5, 2)
+
+    def test_bond_ytm_batch_converged_rows_skip_bisection(self):
+        # a converged row's sub-ulp Newton step can touch the bracket edge, it used to bisect for 50+ iterations
+        price = [3.283307863615076, bd.bond_price(100.0, 11.54, 29.56, 0.17, 2)]
+        ytm, iterations, converged = bd.bond_ytm_batch(price, 100.0, [13.851928706484461, 11.54],
+                                                       [0.8992683174395233, 0.17], [4, 2], max_iter=20)
+        self.assertTrue(np.all(converged))
+        self.assertTrue(np.all(iterations <= 10))
+        np.testing.assert_allclose(ytm, [0.3621412630271884, 0.2956], rtol=1e-12)
+
+    def test_bond_ytm_batch_near_maturity(self):
+        # a bond inside its last coupon period or at maturity must not seed Newton with inf / NaN
+        with np.errstate(all='raise'):
+            ytm, iterations, converged = bd.bond_ytm_batch([98.0, 99.0], 100.0, [0.3, 0.0], 5, 2)
+        self.assertEqual(list(converged), [True, False])
+        self.assertAlmostEqual(bd.bond_price(100.0, 0.3, ytm[0] * 100, 5, 2), 98.0, places=10)
+        self.assertTrue(np.isnan(ytm[1]))
+
+    def test_bond_calc_px_round_trip(self):
+        bond = bd.Bond(price=139.87, maturity=12, cpn_freq=2, cpn_rate=6.25, face_value=99.94)
+        bond.calc_ytm()
+        self.assertAlmostEqual(bond.calc_px(), 139.87)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import bond as bd
+from derpy import bond_book as bb
+import numpy as np
+import pandas as pd
+import unittest
+
+
+class TestBondBook(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = pd.DataFrame({'coupon_rate': [6.25, 5.25, 4.0],
+                                   'coupon_freq': [2., 2., 1.],
+                                   'maturity': [12., 1.5, 7.],
+                                   'face_value': [99.94, 100., 100.],
+                                   'price': [139.87, 95.0428, 101.3]},
+                                  index=['A', 'B', 'C'])
+
+    def test_bulk_analytics_match_bond(self):
+        book = bb.BondBook.from_frame(self.frame)
+        book.calc_ytm()
+        mod_dur, mac_dur = book.calc_duration()
+
+        for row in range(len(book)):
+            bond = bd.Bond(price=book.price[row], maturity=book.maturity[row], cpn_freq=book.coupon_freq[row],
+                           cpn_rate=book.coupon_rate[row], face_value=book.face_value[row])
+            self.assertAlmostEqual(book.yield_to_mat[row], bond.calc_ytm())
+            self.assertAlmostEqual(mod_dur[row], bond.calc_duration()[0])
+            self.assertAlmostEqual(mac_dur[row], bond.calc_duration()[1])
+
+        self.assertAlmostEqual(book.yield_to_mat[0], 0.023985917390473392)
+        self.assertTrue(np.all(book.ytm_converged))
+        np.testing.assert_allclose(book.calc_px(), self.frame['price'], rtol=1e-12)
+
+    def test_zero_copy_columns(self):
+        book = bb.BondBook.from_frame(self.frame)
+        self.assertTrue(np.shares_memory(book.maturity, self.frame['maturity'].to_numpy()))
+        out = book.to_frame()
+        self.assertEqual(list(out.index), ['A', 'B', 'C'])
+        self.assertEqual(tuple(out.columns), bb.BondBook.COLUMNS)
+
+    def test_mismatched_columns(self):
+        self.assertRaises(ValueError, bb.BondBook, 5, 2, [1., 2., 3.], 100, price=[99., 98.])
+        self.assertRaises(ValueError, bb.BondBook, 5, 2, [1., 2., 3.], 100, yield_to_mat=[0.05])
+        self.assertRaises(ValueError, bb.BondBook, [5., 4.], 2, [1., 2., 3.], 100)
+        self.assertRaises(ValueError, bb.BondBook, 5, 2, [[1., 2., 3.]], 100)
+        self.assertEqual(len(bb.BondBook(5, 2, [1., 2., 3.], 100, price=99.)), 3)
+
+    def test_bond_view(self):
+        book = bb.BondBook.from_frame(self.frame)
+        bond = book[0]
+        self.assertIsInstance(bond, bd.Bond)
+        self.assertAlmostEqual(bond.calc_ytm(), 0.023985917390473392)
+        self.assertAlmostEqual(book.yield_to_mat[0], 0.023985917390473392)
+
+        bond.price = 140.
+        self.assertEqual(book.price[0], 140.)
+        self.assertEqual(self.frame['price'].iloc[0], 139.87)
+
+
+if __name__ == '__main__':
+    unittest.main()
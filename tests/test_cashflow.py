@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import bond as bd
+from derpy import bond_calcs as bc
+from derpy import cashflow as cf
+import numpy as np
+import unittest
+
+
+class TestCashFlow(unittest.TestCase):
+
+    def test_annuity_pv(self):
+        # values from numpy.pv before its removal
+        self.assertAlmostEqual(cf.annuity_pv(0.025, 20, -2, -100), 92.20541885717662)
+        self.assertAlmostEqual(cf.annuity_pv(0.01, 10, -1, -100, 1), 100.09471305)
+        self.assertAlmostEqual(cf.annuity_pv(0, 10, -1, -100), 110.0)
+        self.assertAlmostEqual(bc.bond_price(0.05, 10, 0.04, 100, 2), bd.bond_price(100, 10, 5, 4, 2))
+
+    def test_irr_matches_bond_ytm(self):
+        cash_flows = [-95.] + [2.] * 19 + [102.]
+        periodic_ytm = bd.bond_ytm(95., 100., 10, 4., 2) / 2
+        self.assertAlmostEqual(cf.cf_irr(cash_flows), periodic_ytm)
+        self.assertAlmostEqual(cf.cf_pv(periodic_ytm, cash_flows), 0)
+
+    def test_irr_batch_ragged(self):
+        cash_flows, times = cf.pad_cash_flows([[-100, 110], [-100, 5, 5, 105], [1, 2, 3], [-100, 60, 60]],
+                                              [[0, 1], [0, 1, 2, 3], [0, 1, 2], [0, 0.5, 1.25]])
+        irr = cf.cf_irr(cash_flows, times)
+        np.testing.assert_allclose(irr[:2], [0.1, 0.05], rtol=1e-12)
+        self.assertTrue(np.isnan(irr[2]))
+        self.assertAlmostEqual(cf.cf_pv(irr[3], [-100, 60, 60], [0, 0.5, 1.25]), 0)
+
+    def test_irr_random_batch_converges(self):
+        # converged rows used to bisect when their last Newton step touched the bracket edge
+        rng = np.random.RandomState(7)
+        for periods in [60, 360]:
+            cash_flows = np.repeat(rng.uniform(0.5, 4, (1000, 1)), periods + 1, axis=1)
+            cash_flows[:, 0] = -1 * rng.uniform(80, 120, 1000)
+            cash_flows[:, -1] += 100
+            irr = cf.cf_irr(cash_flows, max_iter=20)
+            self.assertFalse(np.any(np.isnan(irr)))
+            np.testing.assert_allclose(cf.cf_pv(irr, cash_flows), 0, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import unittest
+
+import derpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(statement, modules=('scipy', 'pandas')):
+    """
+    :return: which of modules are imported after running statement in a fresh interpreter
+    """
+    code = "import sys; {}; print(','.join(m for m in {!r} if m in sys.modules))".format(statement, modules)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+class TestImports(unittest.TestCase):
+
+    def test_pricing_modules_defer_heavy_imports(self):
+        statement = 'import derpy.option, derpy.bond_book, derpy.portfolio, derpy.vol_surface, derpy.yield_curve'
+        self.assertEqual(loaded_after(statement), [])
+        self.assertEqual(loaded_after("from derpy import option_bsm; option_bsm.euro_option('c', 100, 95, 0.2, 1, "
+                                      "0.05)"), [])
+        self.assertEqual(loaded_after("from derpy import option_bsm; option_bsm.euro_option_batch('c', [100], 95, "
+                                      "0.2, 1, 0.05)"), ['scipy'])
+
+    def test_lazy_submodules(self):
+        self.assertIs(derpy.option_bsm, sys.modules['derpy.option_bsm'])
+        self.assertIn('yield_curve', dir(derpy))
+        with self.assertRaises(AttributeError):
+            derpy.not_a_module
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,10 @@ from __future__ import division
 from __future__ import print_function
 
 import unittest
+import numpy as np
 from derpy import option
+from derpy import option_binomial as bn
+from derpy import option_bsm as bsm
 
 
 class TestOption(unittest.TestCase):
@@ -45,8 +48,114 @@ class TestOption(unittest.TestCase):
     def test_binomial_amer_put(self):
         opt = option.Option(strike=10, underlying=16, time_to_mat=60, volatility=0.16, interest_rate=0.02)
         opt_px = opt.option_price(opt_type='a', call_put='p', px_method='binomial')
-        opt_expected = 0.3120165359797314
+        # early exercise is worth more than the european tree price of 0.3120165359797314
+        opt_expected = 0.7060487687989193
         self.assertAlmostEqual(opt_px, opt_expected)
+        self.assertAlmostEqual(opt_px, bn.binomial_option('a', 'p', 16, 10, 0.16, 60, 0.02, 10))
+
+    def test_bsm_batch_matches_scalar(self):
+        call_put = ['c', 'p', 'call', 'put']
+        stock_price = [16, 16, 95.5, 101.2]
+        strike = [10, 10, 100, 90]
+        volatility = [0.16, 0.16, 0.35, 0.22]
+        time_to_mat = [60, 60, 0.5, 2.25]
+        interest_rate = 0.02
+        div_yield = [0, 0, 0.01, 0.03]
+        batch_px = bsm.euro_option_batch(call_put, stock_price, strike, volatility, time_to_mat,
+                                         interest_rate, div_yield)
+        scalar_px = [bsm.euro_option(call_put[i], stock_price[i], strike[i], volatility[i], time_to_mat[i],
+                                     interest_rate, div_yield[i]) for i in range(len(call_put))]
+        # the scalar and array normal cdf kernels are not bit-identical, see derpy.special
+        np.testing.assert_allclose(batch_px, scalar_px, rtol=1e-10, atol=1e-14 * max(stock_price + strike))
+
+    def test_bsm_batch_broadcast(self):
+        strikes = np.array([8., 10., 12.])
+        batch_px = bsm.euro_option_batch(1, 16, strikes, 0.16, 60, 0.02)
+        self.assertEqual(batch_px.shape, (3,))
+        self.assertAlmostEqual(batch_px[1], 13.29762576988012)
+
+    def test_greeks_match_single_greeks(self):
+        args = (16, 10, 0.16, 60, 0.02)
+        for call_put in ['c', 'p']:
+            g = bsm.greeks(call_put, *args)
+            self.assertAlmostEqual(g['price'], bsm.euro_option(call_put, *args))
+            self.assertAlmostEqual(g['delta'], bsm.delta(call_put, *args))
+            self.assertAlmostEqual(g['gamma'], bsm.gamma(call_put, *args))
+            self.assertAlmostEqual(g['vega'], bsm.vega(call_put, *args))
+            self.assertAlmostEqual(g['theta'], bsm.theta(call_put, *args))
+            self.assertAlmostEqual(g['rho'], bsm.rho(call_put, *args))
+
+    def test_greeks_batch_second_order(self):
+        stock_price, strike, vol, time_to_mat, rate, div = 100., 95., 0.3, 0.7, 0.04, 0.02
+        g = bsm.greeks(['c', 'p'], stock_price, strike, vol, time_to_mat, rate, div)
+        self.assertEqual(g.shape, (2,))
+        bump = 1e-4
+        up = bsm.greeks(['c', 'p'], stock_price, strike, vol + bump, time_to_mat, rate, div)
+        down = bsm.greeks(['c', 'p'], stock_price, strike, vol - bump, time_to_mat, rate, div)
+        np.testing.assert_allclose(g['vanna'], (up['delta'] - down['delta']) / (2 * bump), rtol=1e-6)
+        np.testing.assert_allclose(g['volga'], (up['vega'] - down['vega']) / (2 * bump), rtol=1e-6)
+
+    def test_implied_vol_scalar(self):
+        opt_px = bsm.euro_option('p', 16, 10, 0.16, 60, 0.02)
+        self.assertAlmostEqual(bsm.implied_vol('p', opt_px, 16, 10, 60, 0.02), 0.16, places=6)
+
+    def test_implied_vol_batch_round_trip(self):
+        strikes = np.linspace(80., 130., 11)
+        vols = np.linspace(0.1, 0.9, 11)
+        call_put = np.where(strikes < 100, -1, 1)
+        opt_px = bsm.euro_option_batch(call_put, 100, strikes, vols, 0.75, 0.03, 0.01)
+        iv, status = bsm.implied_vol_batch(call_put, opt_px, 100, strikes, 0.75, 0.03, 0.01)
+        self.assertTrue(np.all(status == bsm.IV_CONVERGED))
+        np.testing.assert_allclose(iv, vols, rtol=1e-7)
+
+    def test_implied_vol_batch_flags_bad_quotes(self):
+        iv, status = bsm.implied_vol_batch(['c', 'c', 'p'], [0.5, 120., 1.], 100, [90., 90., 100.], [1., 1., -1.], 0.0)
+        self.assertTrue(np.all(np.isnan(iv)))
+        self.assertEqual(list(status), [bsm.IV_BELOW_INTRINSIC, bsm.IV_ABOVE_MAXIMUM, bsm.IV_INVALID_INPUT])
+        self.assertTrue(np.isnan(bsm.implied_vol('c', 0.5, 100, 90, 1, 0.0)))
+
+    def test_implied_vol_batch_flags_stalled_rows(self):
+        # no sigma reprices within a 1e-20 tolerance, the stalled solve must not report convergence
+        opt_px = bsm.euro_option('c', 100, 95, 0.2, 1, 0.05) + np.array([2e-15, 5e-15])
+        iv, status = bsm.implied_vol_batch('c', opt_px, 100, 95, 1, 0.05, precision=1e-20)
+        self.assertTrue(np.all(np.isnan(iv)))
+        self.assertTrue(np.all(status == bsm.IV_MAX_ITERATION))
+
+    def test_binomial_high_step(self):
+        euro_px = bn.binomial_option('e', 'p', 100, 105, 0.3, 1, 0.05, 5000)
+        amer_px = bn.binomial_option('a', 'p', 100, 105, 0.3, 1, 0.05, 5000)
+        self.assertAlmostEqual(euro_px, bsm.euro_option('p', 100, 105, 0.3, 1, 0.05), places=3)
+        self.assertAlmostEqual(amer_px, 12.570629556181348, places=9)
+
+    def test_binomial_batch_matches_scalar(self):
+        flag = ['a', 'e', 'american', 'e', 'a']
+        call_put = ['p', 'p', 'c', 'c', 'p']
+        strike = [105., 105., 95., 10., 60.]
+        time_to_mat = [1., 1., 0.5, 2., 3.]
+        batch_px = bn.binomial_option_batch(flag, call_put, 100, strike, 0.3, time_to_mat, 0.05, 150,
+                                            chunk_size=2, n_threads=2)
+        for i in range(len(flag)):
+            scalar_px = bn.binomial_option(flag[i], call_put[i], 100, strike[i], 0.3, time_to_mat[i], 0.05, 150)
+            self.assertAlmostEqual(batch_px[i], scalar_px, places=12)
+
+    def test_binomial_smoothed_modes(self):
+        opt = option.Option(strike=105, underlying=100, time_to_mat=1, volatility=0.3, interest_rate=0.05)
+        bsm_px = opt.option_price(opt_type='e', call_put='p', px_method='bsm')
+        bbs_px = opt.option_price(opt_type='e', call_put='p', px_method='bbs', step=800)
+        bbsr_px = opt.option_price(opt_type='e', call_put='p', px_method='bbsr', step=800)
+        self.assertAlmostEqual(bbs_px, bsm_px, places=2)
+        self.assertAlmostEqual(bbsr_px, bsm_px, places=4)
+
+        amer_px = opt.option_price(opt_type='a', call_put='p', px_method='richardson', step=800)
+        self.assertAlmostEqual(amer_px, bn.binomial_option('a', 'p', 100, 105, 0.3, 1, 0.05, 5000), places=3)
+
+    def test_bbsr_odd_steps(self):
+        bsm_px = bsm.euro_option('p', 100, 100, 0.2, 1, 0.05)
+        for step in [100, 101, 200, 201]:
+            bbsr_px = bn.binomial_option('e', 'p', 100, 100, 0.2, 1, 0.05, step, method='bbsr')
+            self.assertLess(abs(bbsr_px - bsm_px), 1e-4)
+        with self.assertRaises(ValueError):
+            bn.binomial_option('e', 'p', 100, 100, 0.2, 1, 0.05, 2, method='bbsr')
 
 
 if __name__ == '__main__':
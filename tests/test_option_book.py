@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import option_book as ob
+from derpy import option_bsm as bsm
+import numpy as np
+import unittest
+
+
+class TestOptionBook(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(2)
+        self.underlying = np.array(['AAA', 'BBB', 'CCC'])[rng.randint(0, 3, 300)]
+        self.call_put = np.where(rng.rand(300) < 0.5, 'c', 'p')
+        self.strike = rng.uniform(80, 120, 300)
+        self.mat = rng.uniform(0.1, 2, 300)
+        self.vol = rng.uniform(0.1, 0.4, 300)
+        self.qty = rng.randint(-10, 10, 300)
+        self.spots = {'AAA': 100.0, 'BBB': 95.0, 'CCC': 110.0}
+        self.book = ob.OptionBook(self.underlying, self.call_put, self.strike, self.mat, self.vol, self.qty,
+                                  self.spots, interest_rate=0.03, div_yield=0.01, multiplier=100)
+
+    def expected(self, spots):
+        stock_price = np.array([spots[label] for label in self.underlying])
+        line = bsm.greeks(self.call_put, stock_price, self.strike, self.vol, self.mat, 0.03, 0.01)
+        return dict((name, np.array([np.sum((line[name] * self.qty * 100)[self.underlying == label])
+                                     for label in ['AAA', 'BBB', 'CCC']])) for name in ob.BOOK_GREEKS)
+
+    def test_greeks(self):
+        expected = self.expected(self.spots)
+        greeks = self.book.greeks()
+        for name in ob.BOOK_GREEKS:
+            np.testing.assert_allclose(greeks[name], expected[name], rtol=1e-10)
+            self.assertAlmostEqual(self.book.total()[name], expected[name].sum(),
+                                   delta=1e-8 * np.abs(expected[name]).sum())
+
+    def test_update_spots(self):
+        greeks = self.book.update_spots({'BBB': 97.5})
+        spots = dict(self.spots, BBB=97.5)
+        expected = self.expected(spots)
+        for name in ob.BOOK_GREEKS:
+            np.testing.assert_allclose(greeks[name], expected[name], rtol=1e-10)
+
+        greeks = self.book.update_spots(np.array([101.0, 96.0, 111.0]))
+        expected = self.expected({'AAA': 101.0, 'BBB': 96.0, 'CCC': 111.0})
+        np.testing.assert_allclose(greeks['delta'], expected['delta'], rtol=1e-10)
+
+    def test_unknown_underlying(self):
+        with self.assertRaises(KeyError):
+            self.book.update_spots({'ZZZ': 1.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
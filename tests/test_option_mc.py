@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import option_bsm as bsm
+from derpy import option_mc as mc
+import unittest
+
+
+class TestMonteCarlo(unittest.TestCase):
+    args = dict(stock_price=100, volatility=0.2, time_to_maturity=1.0, interest_rate=0.05, div_yield=0.01)
+
+    def test_european_matches_bsm(self):
+        expected = bsm.euro_option('p', 100, 95, 0.2, 1.0, 0.05, 0.01)
+        price, std_err = mc.mc_price(mc.european_payoff('p', 95), n_paths=100000, seed=42, antithetic=True,
+                                     **self.args)
+        self.assertLess(abs(price - expected), 4 * std_err)
+
+        cv_price, cv_std_err = mc.mc_price(mc.european_payoff('c', 95), n_paths=100000, seed=42,
+                                           control_variate=True, control_strike=100, **self.args)
+        self.assertLess(abs(cv_price - bsm.euro_option('c', 100, 95, 0.2, 1.0, 0.05, 0.01)), 4 * cv_std_err)
+        self.assertLess(cv_std_err, std_err)
+
+    def test_reproducible_across_batches(self):
+        payoff = mc.asian_payoff('c', 100)
+        first = mc.mc_price(payoff, n_paths=20000, n_steps=12, seed=7, batch_size=1000, **self.args)
+        second = mc.mc_price(payoff, n_paths=20000, n_steps=12, seed=7, **self.args)
+        self.assertAlmostEqual(first[0], second[0], places=10)
+        self.assertAlmostEqual(first[1], second[1], places=10)
+
+    def test_barrier_parity(self):
+        kwargs = dict(n_paths=50000, n_steps=50, seed=3)
+        knock_out = mc.mc_price(mc.barrier_payoff('c', 100, 90, 'down-and-out'), **dict(self.args, **kwargs))
+        knock_in = mc.mc_price(mc.barrier_payoff('c', 100, 90, 'down-and-in'), **dict(self.args, **kwargs))
+        vanilla = mc.mc_price(mc.european_payoff('c', 100), **dict(self.args, **kwargs))
+        self.assertAlmostEqual(knock_out[0] + knock_in[0], vanilla[0], places=10)
+
+    def test_lookback(self):
+        floating = mc.mc_price(mc.lookback_payoff('c'), n_paths=20000, n_steps=50, seed=5, **self.args)
+        vanilla = mc.mc_price(mc.european_payoff('c', 100), n_paths=20000, n_steps=50, seed=5, **self.args)
+        self.assertGreater(floating[0], vanilla[0])
+
+    def test_bad_inputs(self):
+        with self.assertRaises(ValueError):
+            mc.barrier_payoff('c', 100, 90, 'sideways')
+        with self.assertRaises(ValueError):
+            mc.mc_price(mc.european_payoff('c', 100), n_paths=1001, antithetic=True, **self.args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+from derpy import option
+from derpy import option_binomial as bn
+from derpy import option_bsm as bsm
+from derpy import option_pde as pde
+import unittest
+
+
+class TestOptionPde(unittest.TestCase):
+
+    def test_european_matches_bsm(self):
+        for call_put in ('c', 'p'):
+            result = pde.pde_option('e', call_put, 100, 95, 0.25, 1.0, 0.05, 0.02, greeks=True)
+            expected = bsm.greeks(call_put, 100, 95, 0.25, 1.0, 0.05, 0.02)
+            self.assertAlmostEqual(result['price'], expected['price'], places=3)
+            self.assertAlmostEqual(result['delta'], expected['delta'], places=3)
+            self.assertAlmostEqual(result['gamma'], expected['gamma'], places=4)
+            self.assertAlmostEqual(result['theta'], expected['theta'], places=1)
+
+    def test_american_put_matches_binomial(self):
+        amer_px = pde.pde_option('a', 'p', 100, 105, 0.3, 1, 0.05)
+        self.assertAlmostEqual(amer_px, 12.570629556181348, places=2)
+        self.assertGreater(amer_px, bsm.euro_option('p', 100, 105, 0.3, 1, 0.05))
+
+        # an American call without dividends is never exercised early
+        call_px = pde.pde_option('a', 'c', 100, 105, 0.3, 1, 0.05)
+        self.assertAlmostEqual(call_px, bsm.euro_option('c', 100, 105, 0.3, 1, 0.05), places=2)
+
+    def test_strike_strip(self):
+        strikes = np.array([80., 95., 100., 110., 125.])
+        call_put = ['p', 'c', 'p', 'c', 'p']
+        strip = pde.pde_option('a', call_put, 100, strikes, 0.3, 1, 0.05, 0.03, n_space=1600)
+        self.assertEqual(strip.shape, strikes.shape)
+        for i in range(strikes.size):
+            single = pde.pde_option('a', call_put[i], 100, strikes[i], 0.3, 1, 0.05, 0.03, n_space=1600)
+            self.assertAlmostEqual(strip[i], single, places=2)
+
+    def test_option_pde_method(self):
+        opt = option.Option(strike=105, underlying=100, time_to_mat=1, volatility=0.3, interest_rate=0.05)
+        amer_px = opt.option_price(opt_type='a', call_put='p', px_method='pde')
+        euro_px = opt.option_price(opt_type='e', call_put='p', px_method='pde', step=400)
+        self.assertAlmostEqual(amer_px, bn.binomial_option('a', 'p', 100, 105, 0.3, 1, 0.05, 5000), places=2)
+        self.assertAlmostEqual(euro_px, bsm.euro_option('p', 100, 105, 0.3, 1, 0.05), places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
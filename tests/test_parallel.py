@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import bond as bd
+from derpy import option_binomial as bn
+from derpy import parallel as pl
+import numpy as np
+import unittest
+
+
+def scaled_product(left, right, scale=1.0):
+    return left * right * scale, left > right
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_chunk_slices(self):
+        self.assertEqual(pl.chunk_slices(5, 2), [slice(0, 2), slice(2, 4), slice(4, 5)])
+        self.assertEqual(pl.chunk_slices(5), [slice(0, 5)])
+
+    def test_process_map_in_order(self):
+        rng = np.random.RandomState(0)
+        left, right = rng.rand(101), rng.rand(101)
+        product, greater = pl.process_map(scaled_product, [left, right], chunk_size=10, n_workers=2, scale=3.0)
+        np.testing.assert_array_equal(product, left * right * 3.0)
+        np.testing.assert_array_equal(greater, left > right)
+
+    def test_binomial_batch_workers(self):
+        strikes = np.linspace(80, 120, 40)
+        serial = bn.binomial_option_batch('american', 'p', 100, strikes, 0.25, 1.0, 0.03, step=200)
+        sharded = bn.binomial_option_batch('american', 'p', 100, strikes, 0.25, 1.0, 0.03, step=200,
+                                           chunk_size=7, n_workers=2)
+        np.testing.assert_array_equal(sharded, serial)
+
+    def test_bond_ytm_batch_workers(self):
+        prices = np.linspace(90, 110, 30)
+        serial = bd.bond_ytm_batch(prices, 100, 7.5, 4.0, 2)
+        sharded = bd.bond_ytm_batch(prices, 100, 7.5, 4.0, 2, chunk_size=4, n_workers=2)
+        for expected, result in zip(serial, sharded):
+            np.testing.assert_array_equal(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ from __future__ import division
 from __future__ import print_function
 
 from derpy import portfolio as pt
+import numpy as np
 import pandas as pd
 import unittest
 
@@ -24,6 +25,94 @@ class TestQuickFolio(unittest.TestCase):
 
         self.assertAlmostEqual(port.sec_names, securities)
 
+    def test_portfolio_cache(self):
+        securities = ['AAA', 'BBB']
+        df_positions = pd.DataFrame(data=[[11., 10.], [12., 10.], [12., 9.]], columns=securities)
+        df_prices = pd.DataFrame(data=[[10., 10.], [11., 10.], [11., 12.]], columns=securities)
+        port = pt.Portfolio(names=securities, positions=df_positions, prices=df_prices)
+
+        port.sec_weights()
+        returns = port.portfolio_returns()
+        info = port.cache_info()
+        # values, row sums, weights and returns each computed exactly once
+        self.assertEqual(info.misses, 4)
+        self.assertEqual(info.currsize, 4)
+        port.portfolio_returns()
+        self.assertGreater(port.cache_info().hits, info.hits)
+
+        port.update(prices=pd.DataFrame(data=[[20.]], columns=['AAA'], index=[2]))
+        self.assertEqual(port.cache_info().currsize, 0)
+        self.assertAlmostEqual(port.portfolio_returns()['value'].iloc[-1], 12 * 20 + 9 * 12)
+        self.assertAlmostEqual(returns['value'].iloc[-1], 12 * 11 + 9 * 12)
+
+        port.positions = df_positions * 2
+        self.assertAlmostEqual(port.portfolio_value()['value'].iloc[0], 2 * (11 * 10 + 10 * 10))
+
+    def test_portfolio_cache_results_are_copies(self):
+        securities = ['AAA', 'BBB']
+        df_positions = pd.DataFrame(data=[[11., 10.], [12., 10.]], columns=securities)
+        df_prices = pd.DataFrame(data=[[10., 10.], [11., 10.]], columns=securities)
+        port = pt.Portfolio(names=securities, positions=df_positions, prices=df_prices)
+
+        weights = port.sec_weights().copy()
+        returns = port.portfolio_returns().copy()
+        values = port.sec_values()
+        values['AAA'] = 0.
+        values.iloc[1, 1] = 0.
+        mutated_weights = port.sec_weights()
+        mutated_weights['AAA'] = 0.
+        mutated_returns = port.portfolio_returns()
+        mutated_returns['value'] = 0.
+
+        self.assertEqual(port.sec_values()['AAA'].tolist(), [110., 132.])
+        self.assertEqual(port.sec_values()['BBB'].tolist(), [100., 100.])
+        pd.testing.assert_frame_equal(port.sec_weights(), weights)
+        pd.testing.assert_frame_equal(port.portfolio_returns(), returns)
+        self.assertAlmostEqual(port.portfolio_value()['value'].iloc[0], 11 * 10 + 10 * 10)
+
+    def test_incremental_portfolio(self):
+        securities = ['AAA', 'BBB', 'CCC']
+        rng = np.random.RandomState(7)
+        df_positions = pd.DataFrame(data=rng.randint(1, 20, (30, 3)).astype(float), columns=securities)
+        df_prices = pd.DataFrame(data=10 * np.exp(np.cumsum(rng.normal(0, 0.02, (30, 3)), axis=0)),
+                                 columns=securities)
+        port = pt.Portfolio(names=securities, positions=df_positions, prices=df_prices)
+        inc = pt.IncrementalPortfolio.from_portfolio(port, windows=(5, 10))
+
+        expected = port.portfolio_returns()
+        np.testing.assert_allclose(inc.portfolio_returns().values, expected.values, rtol=1e-12)
+        self.assertAlmostEqual(inc.rolling_vol(10), np.std(expected['log_ret'].values[-10:], ddof=1))
+        values = expected['value'].values[-5:]
+        self.assertAlmostEqual(inc.drawdown(5), values[-1] / values.max() - 1)
+        self.assertAlmostEqual(inc.max_drawdown(5), np.min(values / np.maximum.accumulate(values) - 1))
+
+        # a tick only touches the current bar
+        inc.update_tick('BBB', price=25.0)
+        self.assertAlmostEqual(inc.value, np.dot(inc.positions, inc.prices))
+        self.assertAlmostEqual(inc.simple_ret, inc.value / expected['value'].values[-2] - 1)
+        self.assertAlmostEqual(inc.sec_weights().sum(), 1.0)
+        self.assertEqual(len(inc.portfolio_returns()), 30)
+
+    def test_incremental_portfolio_bounds(self):
+        securities = ['AAA', 'BBB']
+        inc = pt.IncrementalPortfolio(securities, windows=(3,), history=4)
+        for bar in range(10):
+            inc.append([10., 5.], [100. + bar, 50.], date=bar)
+        returns = inc.portfolio_returns()
+        self.assertEqual(list(returns.index), [6, 7, 8, 9])
+        self.assertAlmostEqual(returns['value'].iloc[-1], 10 * 109 + 5 * 50)
+
+        # the running value is re-summed every RESUM_TICKS ticks
+        rng = np.random.RandomState(3)
+        for price in 100 * np.exp(rng.normal(0, 0.01, pt.RESUM_TICKS)):
+            inc.update_tick('AAA', price=price)
+        self.assertEqual(inc.value, inc.values.sum())
+
+        silent = pt.IncrementalPortfolio(securities, history=0)
+        silent.append([1., 1.], [2., 3.])
+        self.assertEqual(silent.value, 5.)
+        self.assertTrue(silent.portfolio_returns().empty)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import portfolio as pt
+from derpy import portfolio_array as pa
+import numpy as np
+import pandas as pd
+import unittest
+
+
+class TestArrayPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        securities = ['AAA', 'BBB', 'CCC']
+        rng = np.random.RandomState(3)
+        dates = pd.date_range('2018-07-02', periods=20)
+        positions = pd.DataFrame(data=rng.randint(1, 20, (20, 3)).astype(float), columns=securities, index=dates)
+        prices = pd.DataFrame(data=10 * np.exp(np.cumsum(rng.normal(0, 0.02, (20, 3)), axis=0)),
+                              columns=securities, index=dates)
+        self.port = pt.Portfolio(names=securities, positions=positions, prices=prices)
+        self.array_port = pa.ArrayPortfolio.from_portfolio(self.port)
+
+    def test_matches_pandas(self):
+        pd.testing.assert_frame_equal(self.array_port.to_frame('sec_weights'), self.port.sec_weights(),
+                                      check_freq=False)
+        pd.testing.assert_frame_equal(self.array_port.to_frame('portfolio_returns'), self.port.portfolio_returns(),
+                                      check_freq=False)
+
+    def test_out_buffers_and_update(self):
+        returns = np.empty((20, 3))
+        result = self.array_port.portfolio_returns(out=returns)
+        self.assertIs(result, returns)
+
+        self.array_port.update(-1, prices=[1., 2., 3.])
+        self.array_port.portfolio_returns(out=returns)
+        self.assertAlmostEqual(returns[-1, 0], np.dot(self.array_port.positions[-1], [1., 2., 3.]))
+        self.assertAlmostEqual(returns[-1, 1], returns[-1, 0] / returns[-2, 0] - 1)
+
+    def test_bad_shapes(self):
+        with self.assertRaises(ValueError):
+            pa.ArrayPortfolio(['AAA'], np.ones((2, 2)), np.ones((2, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import portfolio as pt
+from derpy import portfolio_store as ps
+import numpy as np
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+
+
+class TestPortfolioStore(unittest.TestCase):
+
+    def setUp(self):
+        securities = ['AAA', 'BBB', 'CCC', 'DDD']
+        rng = np.random.RandomState(5)
+        dates = pd.date_range('2018-07-02', periods=50)
+        positions = pd.DataFrame(data=rng.randint(1, 20, (50, 4)).astype(float), columns=securities, index=dates)
+        prices = pd.DataFrame(data=10 * np.exp(np.cumsum(rng.normal(0, 0.02, (50, 4)), axis=0)),
+                              columns=securities, index=dates)
+        self.port = pt.Portfolio(names=securities, positions=positions, prices=prices)
+        self.path = tempfile.mkdtemp()
+        ps.PortfolioStore.from_portfolio(self.path, self.port)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_open(self):
+        store = ps.PortfolioStore(self.path)
+        self.assertEqual(store.shape, (50, 4))
+        self.assertEqual(store.sec_names, ['AAA', 'BBB', 'CCC', 'DDD'])
+        self.assertIsInstance(store.prices, np.memmap)
+        np.testing.assert_array_equal(store.prices, self.port.prices.values)
+
+    def test_chunked_compute(self):
+        store = ps.PortfolioStore(self.path)
+        results = store.compute(chunk_size=7, n_threads=2)
+        # chunk boundaries leave no trace in the returns
+        np.testing.assert_array_equal(results['portfolio_returns'], store.array_portfolio().portfolio_returns())
+        np.testing.assert_allclose(store.load_result('sec_weights'), self.port.sec_weights().values, rtol=1e-14)
+        np.testing.assert_allclose(store.load_result('portfolio_returns')[1:, 2],
+                                   self.port.portfolio_returns()['log_ret'].values[1:], rtol=1e-10)
+
+    def test_bad_output(self):
+        with self.assertRaises(ValueError):
+            ps.PortfolioStore(self.path).compute(outputs=('sec_prices',))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import portfolio as pt
+from derpy import portfolio_stream as pst
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+
+
+class TestPortfolioStream(unittest.TestCase):
+
+    def setUp(self):
+        self.securities = ['AAA', 'BBB', 'CCC']
+        rng = np.random.RandomState(11)
+        dates = pd.date_range('2018-07-02', periods=40)
+        self.positions = pd.DataFrame(data=rng.randint(1, 20, (40, 3)).astype(float), columns=self.securities,
+                                      index=dates)
+        self.prices = pd.DataFrame(data=10 * np.exp(np.cumsum(rng.normal(0, 0.02, (40, 3)), axis=0)),
+                                   columns=self.securities, index=dates)
+        self.expected = pt.Portfolio(self.securities, self.positions, self.prices).portfolio_returns()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_csv_chunks(self):
+        positions_path, prices_path = os.path.join(self.path, 'pos.csv'), os.path.join(self.path, 'px.csv')
+        self.positions.to_csv(positions_path)
+        self.prices.to_csv(prices_path)
+
+        blocks = list(pst.portfolio_returns_stream(pst.read_csv_chunks(positions_path, prices_path, chunk_size=9,
+                                                                       parse_dates=True)))
+        self.assertEqual(len(blocks), 5)
+        # compared against the same csv read whole, as csv parsing is not round trip exact
+        expected = pt.Portfolio(self.securities,
+                                pd.read_csv(positions_path, index_col=0, parse_dates=True),
+                                pd.read_csv(prices_path, index_col=0, parse_dates=True)).portfolio_returns()
+        pd.testing.assert_frame_equal(pd.concat(blocks), expected, check_exact=True, check_freq=False)
+
+    def test_npy_chunks(self):
+        positions_path, prices_path = os.path.join(self.path, 'pos.npy'), os.path.join(self.path, 'px.npy')
+        np.save(positions_path, self.positions.values)
+        np.save(prices_path, self.prices.values)
+
+        chunks = pst.read_npy_chunks(positions_path, prices_path, self.securities,
+                                     dates=self.positions.index.values, chunk_size=16)
+        pd.testing.assert_frame_equal(pst.portfolio_returns(chunks), self.expected, check_exact=True,
+                                      check_freq=False)
+
+    def test_empty_chunks(self):
+        # empty chunks, leading and between dates, must not drop the carried value
+        splits = [(0, 0), (0, 10), (10, 10), (10, 25), (25, 25), (25, 40)]
+        chunks = [(self.positions.iloc[start:end], self.prices.iloc[start:end]) for start, end in splits]
+        pd.testing.assert_frame_equal(pst.portfolio_returns(chunks), self.expected, check_exact=True,
+                                      check_freq=False)
+
+    def test_mismatched_sources(self):
+        chunks = [(self.positions.iloc[:5], self.prices.iloc[1:6])]
+        with self.assertRaises(ValueError):
+            pst.portfolio_returns(chunks)
+
+
+if __name__ == '__main__':
+    unittest.main()
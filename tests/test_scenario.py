@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from derpy import bond as bd
+from derpy import bond_book as bb
+from derpy import option_book as ob
+from derpy import option_bsm as bsm
+from derpy import scenario as sc
+import numpy as np
+import unittest
+
+
+class TestScenario(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(4)
+        self.underlying = np.array(['AAA', 'BBB'])[rng.randint(0, 2, 100)]
+        self.call_put = np.where(rng.rand(100) < 0.5, 'c', 'p')
+        self.strike = rng.uniform(80, 120, 100)
+        self.mat = rng.uniform(0.1, 2, 100)
+        self.vol = rng.uniform(0.1, 0.4, 100)
+        self.qty = rng.randint(-10, 10, 100)
+        self.option_book = ob.OptionBook(self.underlying, self.call_put, self.strike, self.mat, self.vol, self.qty,
+                                         {'AAA': 100.0, 'BBB': 90.0}, interest_rate=0.02, div_yield=0.01)
+        self.bond_book = bb.BondBook(coupon_rate=[2.0, 4.5, 6.0], coupon_freq=2, maturity=[2.0, 10.0, 25.5],
+                                     face_value=100, price=[99.0, 101.5, 104.0])
+        self.spot_shocks = np.linspace(-0.2, 0.2, 5)
+        self.vol_shocks = np.array([-0.05, 0.0, 0.05])
+        self.rate_shocks = np.array([-0.01, 0.0, 0.01])
+
+    def test_option_cube(self):
+        cube = sc.scenario_pnl(self.option_book, self.bond_book, self.spot_shocks, self.vol_shocks,
+                               self.rate_shocks, chunk_size=17, n_threads=2)
+        self.assertEqual(cube.pnl.shape, (5, 3, 3, 3))
+        np.testing.assert_allclose(cube.sel(spot=0.0, vol=0.0, rate=0.0), 0, atol=1e-8)
+
+        spot = np.where(self.underlying == 'AAA', 100.0, 90.0)
+        base = bsm.euro_option_batch(self.call_put, spot, self.strike, self.vol, self.mat, 0.02, 0.01)
+        shocked = bsm.euro_option_batch(self.call_put, spot * 0.9, self.strike, self.vol + 0.05, self.mat,
+                                        0.01, 0.01)
+        expected = np.sum(((shocked - base) * self.qty)[self.underlying == 'BBB'])
+        self.assertAlmostEqual(cube.sel(spot=-0.1, vol=0.05, rate=-0.01, position='BBB'), expected, places=8)
+
+    def test_bond_cube(self):
+        cube = sc.scenario_pnl(bond_book=self.bond_book, rate_shocks=self.rate_shocks, bond_quantity=10)
+        ytm = bd.bond_ytm(self.bond_book.price, 100, self.bond_book.maturity, self.bond_book.coupon_rate)
+        expected = 10 * np.sum(bd.bond_price(100, self.bond_book.maturity, (ytm + 0.01) * 100,
+                                             self.bond_book.coupon_rate) - self.bond_book.price)
+        self.assertAlmostEqual(cube.sel(spot=0.0, vol=0.0, rate=0.01, position=sc.BOND_LABEL), expected, places=6)
+        self.assertEqual(cube.to_frame().shape, (3, 1))
+
+    def test_bond_pnl_leaves_book_unchanged(self):
+        before = self.bond_book.to_records().copy()
+        sc.bond_pnl(self.bond_book, self.rate_shocks)
+        for name in bb.BondBook.COLUMNS:
+            np.testing.assert_array_equal(self.bond_book.to_records()[name], before[name])
+        self.assertFalse(self.bond_book.ytm_converged.any())
+
+        # a bond whose yield cannot be solved makes the book P&L NaN rather than dropping it
+        self.bond_book.price[1] = -1.0
+        self.assertTrue(np.isnan(sc.bond_pnl(self.bond_book, self.rate_shocks)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+
+import numpy as np
+from derpy import schedule as sc
+import unittest
+
+
+class TestSchedule(unittest.TestCase):
+
+    def test_forward_schedule(self):
+        times, coupons = sc.coupon_schedule(3.3, 2)
+        np.testing.assert_allclose(times, [0.5, 1., 1.5, 2., 2.5, 3.])
+        np.testing.assert_allclose(coupons, 0.5)
+        self.assertFalse(times.flags.writeable)
+        self.assertFalse(coupons.flags.writeable)
+        # maturities inside the same period share one schedule
+        self.assertIs(sc.coupon_schedule(3.3, 2), sc.coupon_schedule(3.4, 2.))
+
+    def test_backward_schedule(self):
+        times, coupons = sc.coupon_schedule(1.25, 2, 'backward')
+        np.testing.assert_allclose(times, [0.25, 0.75, 1.25])
+        np.testing.assert_allclose(coupons, [0.25, 0.5, 0.5])
+
+        times, coupons = sc.coupon_schedule(0.1 * 3, 10, 'backward')
+        np.testing.assert_allclose(times, [0.1, 0.2, 0.3])
+        np.testing.assert_allclose(coupons, 0.1)
+
+        with self.assertRaises(ValueError):
+            sc.coupon_schedule(1., 2, 'modified following')
+
+    def test_lru_eviction(self):
+        cache = sc.ScheduleCache(maxsize=2)
+        first = cache.schedule(1., 2)
+        cache.schedule(2., 2)
+        self.assertIs(cache.schedule(1., 2), first)
+        cache.schedule(3., 2)
+        self.assertEqual(cache.cache_info(), sc.CacheInfo(hits=1, misses=3, maxsize=2, currsize=2))
+
+        # 2y was the least recently used, so it was evicted and 1y kept
+        self.assertIs(cache.schedule(1., 2), first)
+        cache.schedule(2., 2)
+        self.assertEqual(cache.cache_info().misses, 4)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_misses_share_one_schedule(self):
+        cache = sc.ScheduleCache()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def lookup():
+            barrier.wait()
+            results.append(cache.schedule(10, 2))
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertIs(cache.schedule(10, 2), results[0])
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+from scipy.stats import norm
+from derpy import special
+import unittest
+
+
+class TestSpecial(unittest.TestCase):
+
+    def test_matches_scipy_stats(self):
+        x = np.concatenate([np.linspace(-37., 9., 461), [0., -0.5, 1e-300]])
+        np.testing.assert_allclose(special.norm_cdf(x), norm.cdf(x), rtol=1e-14, atol=0)
+        np.testing.assert_allclose(special.norm_pdf(x), norm.pdf(x), rtol=1e-14, atol=0)
+        # the scalar path keeps relative precision deep into the lower tail
+        scalar_cdf = [special.norm_cdf(float(value)) for value in x]
+        scalar_pdf = [special.norm_pdf(float(value)) for value in x]
+        np.testing.assert_allclose(scalar_cdf, norm.cdf(x), rtol=1e-12, atol=0)
+        np.testing.assert_allclose(scalar_pdf, norm.pdf(x), rtol=1e-12, atol=0)
+
+    def test_scalar_and_array_types(self):
+        self.assertIsInstance(special.norm_cdf(0.3), float)
+        self.assertIsInstance(special.norm_pdf(0.3), float)
+        self.assertEqual(special.norm_cdf(np.zeros((2, 3))).shape, (2, 3))
+        self.assertEqual(special.norm_pdf([0., 1.]).shape, (2,))
+        self.assertAlmostEqual(special.norm_cdf(1), 0.8413447460685429)
+
+
+if __name__ == '__main__':
+    unittest.main()
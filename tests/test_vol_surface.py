@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+from derpy import option
+from derpy import option_bsm as bsm
+from derpy.vol_surface import VolSurface
+import unittest
+
+
+def smile(expiry, strike, spot=100.):
+    return 0.2 + 0.1 * np.log(strike / spot) ** 2 / expiry ** 0.5 - 0.02 * expiry
+
+
+class TestVolSurface(unittest.TestCase):
+
+    def setUp(self):
+        expiries = np.array([0.25, 0.5, 1.0, 2.0])
+        strikes = np.linspace(70., 130., 13)
+        self.expiry, self.strike = [a.ravel() for a in np.meshgrid(expiries, strikes, indexing='ij')]
+        self.vols = smile(self.expiry, self.strike)
+        self.surface = VolSurface(self.expiry, self.strike, self.vols, 100., 0.03, 0.01)
+
+    def test_reprices_quotes(self):
+        np.testing.assert_allclose(self.surface.vol(self.expiry, self.strike), self.vols, rtol=1e-12)
+        self.assertIsInstance(self.surface.vol(0.5, 100.), float)
+
+    def test_interpolation(self):
+        # between quoted strikes the spline follows the smooth smile
+        strikes = np.linspace(72., 128., 57)
+        np.testing.assert_allclose(self.surface.vol(1.0, strikes), smile(1.0, strikes), atol=2e-4)
+
+        # linear in total variance between expiries, at constant log-moneyness
+        log_forward = np.log(100.) + 0.02 * np.array([0.5, 0.75, 1.0])
+        strike = np.exp(log_forward + 0.05)
+        variance = self.surface.total_variance([0.5, 0.75, 1.0], strike)
+        self.assertAlmostEqual(variance[1], (variance[0] + variance[2]) / 2, places=12)
+
+        # flat vol outside the quoted expiries and strikes
+        self.assertAlmostEqual(self.surface.vol(3.0, 100.), self.surface.vol(2.0, 100. * np.exp(-0.02)), places=12)
+        self.assertAlmostEqual(self.surface.vol(1.0, 10.), self.surface.vol(1.0, 70.), places=12)
+
+    def test_from_prices(self):
+        call_put = np.where(self.strike < 100, 'p', 'c')
+        prices = bsm.euro_option_batch(call_put, 100., self.strike, self.vols, self.expiry, 0.03, 0.01)
+        surface = VolSurface.from_prices(call_put, prices, self.expiry, self.strike, 100., 0.03, 0.01)
+        np.testing.assert_allclose(surface.vol(self.expiry, self.strike), self.vols, rtol=1e-8)
+
+    def test_only_changed_slices_rebuild(self):
+        self.surface.vol(self.expiry, self.strike)
+        short, long_ = self.surface.slice(0.25), self.surface.slice(2.0)
+        self.surface.set_quotes(2.0, [90., 100., 110.], [0.3, 0.25, 0.3])
+        self.assertIs(self.surface.slice(0.25), short)
+        self.assertIsNot(self.surface.slice(2.0), long_)
+        self.assertAlmostEqual(self.surface.vol(2.0, 100.), 0.25, places=12)
+
+        self.surface.set_quotes(1.5, 100., 0.5)
+        self.assertEqual(list(self.surface.expiries), [0.25, 0.5, 1.0, 1.5, 2.0])
+        self.assertAlmostEqual(self.surface.vol(1.5, 80.), 0.5)
+        self.surface.remove_expiry(1.5)
+        with self.assertRaises(KeyError):
+            self.surface.slice(1.5)
+
+    def test_pricers_take_surface(self):
+        strikes = np.array([80., 100., 120.])
+        expected = bsm.euro_option_batch('c', 100., strikes, self.surface.vol(0.75, strikes), 0.75, 0.03, 0.01)
+        np.testing.assert_allclose(bsm.euro_option_batch('c', 100., strikes, self.surface, 0.75, 0.03, 0.01),
+                                   expected)
+        np.testing.assert_allclose(bsm.greeks('c', 100., strikes, self.surface, 0.75, 0.03, 0.01)['price'],
+                                   expected)
+
+        opt = option.Option(strike=120., underlying=100., time_to_mat=0.75, volatility=self.surface,
+                            interest_rate=0.03)
+        self.assertAlmostEqual(opt.volatility, self.surface.vol(0.75, 120.))
+        self.assertAlmostEqual(opt.option_price(opt_type='e', call_put='c', px_method='bsm'),
+                               bsm.euro_option('c', 100., 120., self.surface.vol(0.75, 120.), 0.75, 0.03))
+
+
+if __name__ == '__main__':
+    unittest.main()
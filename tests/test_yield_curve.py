@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# future proof py2 vs py3
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+from derpy import bond as bd
+from derpy import option
+from derpy import option_bsm as bsm
+from derpy.schedule import coupon_schedule
+from derpy.yield_curve import YieldCurve
+import unittest
+
+
+class TestYieldCurve(unittest.TestCase):
+
+    def test_interpolation(self):
+        curve = YieldCurve.from_zero_rates([1., 2., 5.], [0.02, 0.03, 0.035])
+        np.testing.assert_allclose(curve.zero_rate([1., 2., 5.]), [0.02, 0.03, 0.035])
+        # flat forwards between knots, and beyond the last knot
+        self.assertAlmostEqual(curve.forward_rate(2.5, 3.), curve.forward_rate(2., 5.))
+        self.assertAlmostEqual(curve.forward_rate(6., 8.), curve.forward_rate(2., 5.))
+        self.assertAlmostEqual(curve.zero_rate(0.5), 0.02)
+        self.assertAlmostEqual(curve.zero_rate(0.), 0.02)
+        self.assertEqual(curve.discount(np.ones((3, 4))).shape, (3, 4))
+
+    def test_bootstrap_reprices_instruments(self):
+        deposits = [(0.25, 0.021), (0.5, 0.022)]
+        swaps = [(2., 0.026, 2), (5., 0.031, 2)]
+        bonds = [(1., 2.5, 2, 100.4, 100.), (10., 4., 2, 104.2, 100.)]
+        curve = YieldCurve.bootstrap(deposits, swaps, bonds)
+        np.testing.assert_allclose(curve.times, [0.25, 0.5, 1., 2., 5., 10.])
+
+        for mat, rate in deposits:
+            self.assertAlmostEqual(curve.discount(mat), 1 / (1 + rate * mat), places=14)
+        for mat, rate, freq in swaps:
+            pay_times = coupon_schedule(mat, freq).times
+            self.assertAlmostEqual(rate / freq * curve.discount(pay_times).sum() + curve.discount(mat), 1.,
+                                   places=12)
+        for mat, cpn_rate, freq, price, face_value in bonds:
+            self.assertAlmostEqual(curve.bond_price(face_value, mat, cpn_rate, freq), price, places=10)
+
+        with self.assertRaises(ValueError):
+            YieldCurve.bootstrap(deposits=[(1., 0.02)], swaps=[(1., 0.02, 2)])
+
+    def test_flat_curve_matches_yield_pricing(self):
+        # a flat yield y compounded cpn_freq times a year is a continuous zero rate cpn_freq * log(1 + y / cpn_freq)
+        curve = YieldCurve.from_zero_rates([30.], [2 * np.log1p(0.055 / 2)])
+        maturity = np.array([0.4, 1.5, 3.25, 10., 29.9])
+        cpn_rate = np.array([0., 5.25, 3., 6.5, 2.])
+        np.testing.assert_allclose(bd.bond_price(100., maturity, curve, cpn_rate, 2),
+                                   bd.bond_price(100., maturity, 5.5, cpn_rate, 2), rtol=1e-13)
+
+        bond = bd.Bond(cpn_rate=5.25, cpn_freq=2, maturity=1.5, face_value=100.)
+        self.assertAlmostEqual(bond.calc_px(curve), bd.bond_price(100., 1.5, 5.5, 5.25, 2))
+
+    def test_pricers_take_curve(self):
+        curve = YieldCurve.from_zero_rates([0.5, 1., 2.], [0.01, 0.03, 0.04])
+        mats = np.array([0.25, 0.75, 1.5])
+        np.testing.assert_allclose(bsm.euro_option_batch('c', 100., 105., 0.2, mats, curve),
+                                   bsm.euro_option_batch('c', 100., 105., 0.2, mats, curve.zero_rate(mats)))
+        self.assertAlmostEqual(bsm.greeks('p', 100., 105., 0.2, 1.5, curve)['price'],
+                               bsm.euro_option('p', 100., 105., 0.2, 1.5, curve.zero_rate(1.5)))
+
+        opt = option.Option(strike=105., underlying=100., time_to_mat=1.5, volatility=0.2, interest_rate=curve)
+        self.assertAlmostEqual(opt.option_price(opt_type='e', call_put='p', px_method='bsm'),
+                               bsm.euro_option('p', 100., 105., 0.2, 1.5, curve))
+
+
+if __name__ == '__main__':
+    unittest.main()